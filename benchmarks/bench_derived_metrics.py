@@ -0,0 +1,33 @@
+"""Times the conversion of derived metrics with many referenced metrics
+
+Run from the repo root with `python -m benchmarks.bench_derived_metrics`. The time per
+reference should stay flat as the number of references in the expression grows.
+"""
+import time
+
+from metricflow_to_zenlytic.metricflow_to_zenlytic import convert_mf_metric_to_zenlytic_measure
+
+REFERENCES = [100, 200, 400, 800]
+
+
+def derived_metric(n_references: int):
+    metrics = [{"name": f"metric_{idx}", "alias": f"m{idx}"} for idx in range(n_references)]
+    return {
+        "name": "derived",
+        "type": "derived",
+        "type_params": {"expr": " + ".join(metric["alias"] for metric in metrics), "metrics": metrics},
+    }
+
+
+def main():
+    print(f"{'references':>11} {'time (ms)':>10} {'us/reference':>13}")
+    for n_references in REFERENCES:
+        mf_metric = derived_metric(n_references)
+        start = time.perf_counter()
+        convert_mf_metric_to_zenlytic_measure(mf_metric, {})
+        elapsed = time.perf_counter() - start
+        print(f"{n_references:>11} {elapsed * 1e3:>10.2f} {elapsed / n_references * 1e6:>13.2f}")
+
+
+if __name__ == "__main__":
+    main()
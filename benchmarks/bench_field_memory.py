@@ -0,0 +1,51 @@
+"""Compares the memory held by converted views as slotted fields and as plain dicts
+
+Run from the repo root with `python -m benchmarks.bench_field_memory`. The benchmark project
+from benchmarks.generate is loaded and converted, then the memory the views take is measured
+with tracemalloc, once as the fields conversion returns and once rendered to dicts with to_dict.
+"""
+import gc
+import tempfile
+import tracemalloc
+
+from metricflow_to_zenlytic.metricflow_to_zenlytic import (
+    YamlLoaders,
+    iter_mf_project_to_zenlytic_views,
+    load_mf_project,
+)
+
+from .generate import DEFAULT_METRIC_MIX, write_mf_project
+
+MODELS = 200
+MEASURES_PER_MODEL = 25
+
+
+def main():
+    with tempfile.TemporaryDirectory() as metricflow_folder:
+        write_mf_project(
+            metricflow_folder, MODELS, MEASURES_PER_MODEL, metric_mix=DEFAULT_METRIC_MIX, filter_fraction=0.25
+        )
+        mf_project = load_mf_project(metricflow_folder, loader=YamlLoaders.c_safe)
+
+    gc.collect()
+    tracemalloc.start()
+    try:
+        views = list(iter_mf_project_to_zenlytic_views(mf_project))
+        gc.collect()
+        field_bytes = tracemalloc.get_traced_memory()[0]
+        n_fields = sum(len(view["fields"]) + len(view["identifiers"]) for view in views)
+
+        # The dicts share their values with the fields, so the fields are dropped before measuring
+        views = [view.to_dict() for view in views]
+        gc.collect()
+        dict_bytes = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+
+    print(f"{len(views)} views with {n_fields} fields")
+    print(f"{'fields':>7}: {field_bytes / 2**20:.1f} MB")
+    print(f"{'dicts':>7}: {dict_bytes / 2**20:.1f} MB ({dict_bytes / field_bytes:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
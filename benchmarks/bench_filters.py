@@ -0,0 +1,61 @@
+"""Microbenchmarks for translating MetricFlow filters to Zenlytic SQL
+
+Run from the repo root with `python -m benchmarks.bench_filters`. Compound filters with an
+increasing number of clauses are translated with the previous findall/replace implementation,
+with the single pass translator, and with the translator when the translation is memoized.
+"""
+import re
+import time
+
+from metricflow_to_zenlytic.metricflow_to_zenlytic import _extract_filter_sql
+
+CLAUSES = [10, 100, 1000]
+REPEATS = 20
+
+
+def _legacy_extract_filter_sql(filter_string):
+    matches = re.findall(r"{{\s*Dimension\('(.+?)'\)\s*}}\s*([=><!]+)\s*(.+?)\s*(and|or|$)", filter_string)
+    for match in matches:
+        column_name = match[0].replace("__", ".")
+        filter_string = filter_string.replace(f"Dimension('{match[0]}')", "${" + column_name + "}")
+    time_dim_matches = re.findall(
+        r"""TimeDimension\(\s*['"]([^'"]+)['"]\s*,\s*['"]([^'"]+)['"]\s*\)""", filter_string
+    )
+    for match in time_dim_matches:
+        column_name = match[0].replace("__", ".")
+        time_grain = match[1].replace("day", "date")
+        replacement = "${" + f"{column_name}_{time_grain}" + "}"
+        filter_string = filter_string.replace(f"TimeDimension('{match[0]}', '{match[1]}')", replacement)
+    return filter_string.replace("{{", "").replace("}}", "")
+
+
+def compound_filter(n_clauses: int):
+    clauses = []
+    for idx in range(n_clauses):
+        if idx % 2:
+            clauses.append(f"{{{{ TimeDimension('order__created_at_{idx}', 'month') }}}} = '2024-01-01'")
+        else:
+            clauses.append(f"{{{{ Dimension('order__status_{idx}') }}}} = 'value_{idx}'")
+    return " and ".join(clauses)
+
+
+def _time(function, filter_string: str):
+    start = time.perf_counter()
+    for _ in range(REPEATS):
+        function(filter_string)
+    return (time.perf_counter() - start) / REPEATS * 1e3
+
+
+def main():
+    print(f"{'clauses':>8} {'legacy (ms)':>12} {'single pass (ms)':>17} {'memoized (ms)':>14}")
+    for n_clauses in CLAUSES:
+        filter_string = compound_filter(n_clauses)
+        legacy = _time(_legacy_extract_filter_sql, filter_string)
+        single_pass = _time(_extract_filter_sql.__wrapped__, filter_string)
+        _extract_filter_sql(filter_string)
+        memoized = _time(_extract_filter_sql, filter_string)
+        print(f"{n_clauses:>8} {legacy:>12.3f} {single_pass:>17.3f} {memoized:>14.4f}")
+
+
+if __name__ == "__main__":
+    main()
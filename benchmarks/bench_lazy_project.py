@@ -0,0 +1,42 @@
+"""Times converting a single view of a 2,000 file project with LazyProject
+
+Run from the repo root with `python -m benchmarks.bench_lazy_project`. The project is generated
+with benchmarks.generate. Indexing scans every file once, after that each view only parses the
+files it depends on. Loading the whole project with load_mf_project is timed for comparison.
+"""
+import tempfile
+import time
+
+from metricflow_to_zenlytic.lazy import LazyProject
+from metricflow_to_zenlytic.metricflow_to_zenlytic import YamlLoaders, load_mf_project
+
+from .generate import DEFAULT_METRIC_MIX, write_mf_project
+
+FILES = 2000
+MEASURES_PER_MODEL = 10
+
+
+def main():
+    with tempfile.TemporaryDirectory() as metricflow_folder:
+        write_mf_project(
+            metricflow_folder, FILES, MEASURES_PER_MODEL, metric_mix=DEFAULT_METRIC_MIX, filter_fraction=0.25
+        )
+        project = LazyProject(metricflow_folder)
+
+        start = time.perf_counter()
+        project.semantic_model_names()
+        print(f"{'index':>22}: {time.perf_counter() - start:.3f}s")
+
+        for view_name in ["model_1000", "model_1001"]:
+            start = time.perf_counter()
+            project.convert_view(view_name)
+            print(f"{'convert ' + view_name:>22}: {time.perf_counter() - start:.3f}s")
+
+        for loader in [YamlLoaders.round_trip, YamlLoaders.c_safe]:
+            start = time.perf_counter()
+            load_mf_project(metricflow_folder, loader=loader)
+            print(f"{'load_mf_project ' + loader:>22}: {time.perf_counter() - start:.3f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""Times load_mf_project and convert_mf_project_to_zenlytic_project on generated projects
+of increasing size
+
+Run from the repo root with `python -m benchmarks.bench_metric_assignment`. The time per
+measure should stay flat as the project grows for the full load, the metric-to-view
+assignment step on its own and the conversion.
+"""
+import tempfile
+import time
+
+from metricflow_to_zenlytic.metricflow_to_zenlytic import (
+    _assign_metrics_to_semantic_models,
+    convert_mf_project_to_zenlytic_project,
+    load_mf_project,
+)
+
+from .generate import write_mf_project
+
+MEASURES_PER_MODEL = 50
+TOTAL_MEASURES = [1250, 2500, 5000, 10000]
+
+
+def _time_assignment(semantic_models: dict):
+    metrics, measure_owners = [], {}
+    for model_name, semantic_model in semantic_models.items():
+        metrics.extend(semantic_model["metrics"])
+        semantic_model["metrics"] = []
+        for measure in semantic_model["measures"]:
+            measure_owners[measure["name"]] = model_name
+
+    start = time.perf_counter()
+    _assign_metrics_to_semantic_models(semantic_models, metrics, measure_owners)
+    return time.perf_counter() - start
+
+
+def main():
+    print(
+        f"{'measures':>10} {'load (s)':>10} {'load us/measure':>16} "
+        f"{'assign us/metric':>17} {'convert us/measure':>19}"
+    )
+    for total_measures in TOTAL_MEASURES:
+        with tempfile.TemporaryDirectory() as directory:
+            write_mf_project(directory, total_measures // MEASURES_PER_MODEL, MEASURES_PER_MODEL)
+
+            start = time.perf_counter()
+            semantic_models = load_mf_project(directory)
+            load_time = time.perf_counter() - start
+
+        assign_time = _time_assignment(semantic_models)
+
+        start = time.perf_counter()
+        convert_mf_project_to_zenlytic_project(semantic_models)
+        convert_time = time.perf_counter() - start
+
+        print(
+            f"{total_measures:>10} {load_time:>10.2f} {load_time / total_measures * 1e6:>16.1f} "
+            f"{assign_time / total_measures * 1e6:>17.2f} {convert_time / total_measures * 1e6:>19.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+"""Compares serial and parallel conversion and writing of a 500 view project
+
+Run from the repo root with `python -m benchmarks.bench_parallel_views`. The project is
+generated with benchmarks.generate and loaded once, then converted and written with
+write_mf_project_to_zenlytic for each number of workers. Parallel runs only pay off with
+more than one CPU.
+"""
+import os
+import tempfile
+import time
+
+from metricflow_to_zenlytic.metricflow_to_zenlytic import load_mf_project, write_mf_project_to_zenlytic
+
+from .generate import DEFAULT_METRIC_MIX, write_mf_project
+
+VIEWS = 500
+MEASURES_PER_MODEL = 20
+
+
+def main():
+    workers_to_try = sorted({1, 2, 4, os.cpu_count() or 1})
+    with tempfile.TemporaryDirectory() as metricflow_folder, tempfile.TemporaryDirectory() as out_directory:
+        write_mf_project(
+            metricflow_folder, VIEWS, MEASURES_PER_MODEL, metric_mix=DEFAULT_METRIC_MIX, filter_fraction=0.25
+        )
+        mf_project = load_mf_project(metricflow_folder, loader="csafe")
+
+        print(f"Converting and writing {VIEWS} views on {os.cpu_count()} CPUs")
+        baseline = None
+        for workers in workers_to_try:
+            start = time.perf_counter()
+            write_mf_project_to_zenlytic(
+                mf_project, "bench_model", "bench_connection", out_directory, workers
+            )
+            elapsed = time.perf_counter() - start
+
+            baseline = baseline or elapsed
+            print(f"{workers:>3} workers: {elapsed:.2f}s ({baseline / elapsed:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
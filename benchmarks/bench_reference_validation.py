@@ -0,0 +1,45 @@
+"""Times validating the references in converted views
+
+Run from the repo root with `python -m benchmarks.bench_reference_validation`. A project of
+1,000 semantic models from benchmarks.generate is loaded and converted, then the ${...}
+references in all of its views are validated.
+"""
+import tempfile
+import time
+
+from metricflow_to_zenlytic.metricflow_to_zenlytic import (
+    YamlLoaders,
+    iter_mf_project_to_zenlytic_views,
+    load_mf_project,
+)
+from metricflow_to_zenlytic.validation import validate_references, view_references
+
+from .generate import DEFAULT_METRIC_MIX, write_mf_project
+
+MODELS = 1000
+MEASURES_PER_MODEL = 20
+
+
+def main():
+    with tempfile.TemporaryDirectory() as metricflow_folder:
+        write_mf_project(
+            metricflow_folder, MODELS, MEASURES_PER_MODEL, metric_mix=DEFAULT_METRIC_MIX, filter_fraction=0.25
+        )
+        mf_project = load_mf_project(metricflow_folder, loader=YamlLoaders.c_safe)
+
+    start = time.perf_counter()
+    views = list(iter_mf_project_to_zenlytic_views(mf_project))
+    convert_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    issues = validate_references(views)
+    validate_seconds = time.perf_counter() - start
+
+    n_references = sum(len(view_references(view)[3]) for view in views)
+    print(f"{len(views)} views, {n_references} references, {len(issues)} issues")
+    print(f"convert:  {convert_seconds:.2f}s")
+    print(f"validate: {validate_seconds:.3f}s ({validate_seconds / convert_seconds:.1%} of converting)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+"""Compares the YAML dumpers of dump_yaml_to_file
+
+Run from the repo root with `python -m benchmarks.bench_yaml_dumpers`. The benchmark project
+from benchmarks.generate is loaded with the round-trip loader and converted, then every view is
+dumped with each dumper without writing it to disk.
+"""
+import tempfile
+import time
+import warnings
+
+from metricflow_to_zenlytic.metricflow_to_zenlytic import (
+    YamlDumpers,
+    dump_yaml_to_file,
+    iter_mf_project_to_zenlytic_views,
+    load_mf_project,
+)
+
+from .generate import DEFAULT_METRIC_MIX, write_mf_project
+
+MODELS = 100
+MEASURES_PER_MODEL = 20
+
+
+def main():
+    with tempfile.TemporaryDirectory() as metricflow_folder:
+        write_mf_project(
+            metricflow_folder, MODELS, MEASURES_PER_MODEL, metric_mix=DEFAULT_METRIC_MIX, filter_fraction=0.25
+        )
+        mf_project = load_mf_project(metricflow_folder)
+    views = list(iter_mf_project_to_zenlytic_views(mf_project))
+
+    print(f"Dumping {len(views)} views")
+    baseline = None
+    for dumper in reversed(YamlDumpers.all()):
+        with warnings.catch_warnings():
+            # The legacy ruamel.yaml.dump API warns on every call
+            warnings.simplefilter("ignore", PendingDeprecationWarning)
+            start = time.perf_counter()
+            for view in views:
+                dump_yaml_to_file(view, dumper=dumper)
+            elapsed = time.perf_counter() - start
+
+        baseline = baseline or elapsed
+        print(f"{dumper:>8}: {elapsed:.2f}s ({baseline / elapsed:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+"""Compares the YAML loader backends of convert_yml_to_dict
+
+Run from the repo root with `python -m benchmarks.bench_yaml_loaders`. The files in
+tests/examples/metricflow are copied 100 times and every copy is parsed with each loader.
+"""
+import os
+import shutil
+import tempfile
+import time
+
+from metricflow_to_zenlytic.metricflow_to_zenlytic import YamlLoaders, convert_yml_to_dict
+
+FIXTURES = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "tests", "examples", "metricflow"
+)
+COPIES = 100
+
+
+def main():
+    with tempfile.TemporaryDirectory() as directory:
+        paths = []
+        for copy_idx in range(COPIES):
+            for file_name in sorted(os.listdir(FIXTURES)):
+                path = os.path.join(directory, f"{copy_idx}_{file_name}")
+                shutil.copyfile(os.path.join(FIXTURES, file_name), path)
+                paths.append(path)
+
+        print(f"Parsing {len(paths)} files")
+        baseline = None
+        for loader in YamlLoaders.all():
+            start = time.perf_counter()
+            for path in paths:
+                convert_yml_to_dict(path, loader)
+            elapsed = time.perf_counter() - start
+
+            baseline = baseline or elapsed
+            print(f"{loader:>8}: {elapsed:.2f}s ({baseline / elapsed:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
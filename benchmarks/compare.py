@@ -0,0 +1,48 @@
+"""Compares benchmark results saved by benchmarks.run
+
+    python -m benchmarks.compare baseline.json candidate.json
+
+Prints the time and peak memory of each phase in both runs, and the candidate's change
+relative to the baseline.
+"""
+import json
+import sys
+
+
+def compare(baseline: dict, candidate: dict):
+    if baseline["config"] != candidate["config"]:
+        print("Warning: the runs were made with different configurations")
+
+    print(f"baseline:  {baseline.get('label') or baseline['timestamp']}")
+    print(f"candidate: {candidate.get('label') or candidate['timestamp']}")
+    print(f"{'phase':>8} {'seconds':>21} {'change':>8} {'peak MB':>17} {'change':>8}")
+    for phase, base in baseline["phases"].items():
+        new = candidate["phases"].get(phase)
+        if new is None:
+            continue
+        base_mb, new_mb = base["peak_memory_bytes"] / 2**20, new["peak_memory_bytes"] / 2**20
+        print(
+            f"{phase:>8} {base['seconds']:>10.3f} {new['seconds']:>10.3f} "
+            f"{_change(base['seconds'], new['seconds']):>8} "
+            f"{base_mb:>8.1f} {new_mb:>8.1f} {_change(base_mb, new_mb):>8}"
+        )
+
+
+def _change(base: float, new: float):
+    if not base:
+        return "n/a"
+    return f"{(new - base) / base:+.0%}"
+
+
+def main():
+    if len(sys.argv) != 3:
+        sys.exit(__doc__)
+    with open(sys.argv[1]) as f:
+        baseline = json.load(f)
+    with open(sys.argv[2]) as f:
+        candidate = json.load(f)
+    compare(baseline, candidate)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+import os
+import random
+
+import ruamel.yaml
+
+# Fraction of the metrics of each type, one metric is generated per measure
+DEFAULT_METRIC_MIX = {"simple": 0.5, "ratio": 0.2, "derived": 0.2, "cumulative": 0.1}
+
+
+def generate_mf_project(
+    n_models: int,
+    measures_per_model: int,
+    metric_mix: dict = None,
+    filter_fraction: float = 0.0,
+    seed: int = 0,
+):
+    """Returns a list of (file_name, yaml_dict) pairs making up a synthetic MetricFlow project
+    with one semantic model per file and one metric on top of every measure.
+
+    metric_mix gives the fraction of simple, ratio, derived and cumulative metrics, by default
+    only simple metrics are generated. filter_fraction is the fraction of simple, ratio and
+    derived metrics that get a Dimension or TimeDimension filter.
+    """
+    metric_mix = metric_mix or {"simple": 1.0}
+    rng = random.Random(seed)
+    metric_types, weights = zip(*metric_mix.items())
+
+    files = []
+    for model_idx in range(n_models):
+        model_name = f"model_{model_idx}"
+        measure_names = [f"{model_name}_measure_{measure_idx}" for measure_idx in range(measures_per_model)]
+        measures, metrics = [], []
+        for measure_idx, measure_name in enumerate(measure_names):
+            measures.append({"name": measure_name, "agg": "sum", "expr": f"column_{measure_idx}"})
+
+            metric_type = rng.choices(metric_types, weights)[0]
+            other_measure = measure_names[(measure_idx + 1) % measures_per_model]
+            metric_filter = _filter(rng, model_name) if rng.random() < filter_fraction else None
+            metrics.append(
+                _metric(f"{measure_name}_metric", metric_type, measure_name, other_measure, metric_filter)
+            )
+
+        semantic_model = {
+            "name": model_name,
+            "model": f"ref('{model_name}')",
+            "defaults": {"agg_time_dimension": "created_at"},
+            "entities": [{"name": f"{model_name}_id", "type": "primary"}],
+            "dimensions": [
+                {"name": "created_at", "type": "time", "type_params": {"time_granularity": "day"}},
+                {"name": "status", "type": "categorical"},
+            ],
+            "measures": measures,
+        }
+        files.append((f"{model_name}.yml", {"semantic_models": [semantic_model], "metrics": metrics}))
+    return files
+
+
+def _metric(name: str, metric_type: str, measure_name: str, other_measure: str, metric_filter: str):
+    metric = {"name": name, "type": metric_type, "label": name.replace("_", " ").title()}
+    if metric_type in {"simple", "cumulative"}:
+        metric["type_params"] = {"measure": measure_name}
+        if metric_filter and metric_type == "simple":
+            metric["filter"] = metric_filter
+    elif metric_type == "ratio":
+        numerator = {"name": measure_name, "filter": metric_filter} if metric_filter else measure_name
+        metric["type_params"] = {"numerator": numerator, "denominator": other_measure}
+    elif metric_type == "derived":
+        first = {"name": measure_name, "alias": "current"}
+        if metric_filter:
+            first["filter"] = metric_filter
+        metric["type_params"] = {
+            "expr": "(current - previous) / previous",
+            "metrics": [first, {"name": other_measure, "alias": "previous"}],
+        }
+    return metric
+
+
+def _filter(rng: random.Random, model_name: str):
+    if rng.random() < 0.5:
+        return f"{{{{ Dimension('{model_name}__status') }}}} = 'complete'"
+    return f"{{{{ TimeDimension('{model_name}__created_at', 'month') }}}} >= '2024-01-01'"
+
+
+def write_mf_project(directory: str, n_models: int, measures_per_model: int, **kwargs):
+    """Writes the project from generate_mf_project to directory, kwargs are passed on to it"""
+    yaml = ruamel.yaml.YAML(typ="safe", pure=True)
+    yaml.default_flow_style = False
+    os.makedirs(directory, exist_ok=True)
+    for file_name, yaml_dict in generate_mf_project(n_models, measures_per_model, **kwargs):
+        with open(os.path.join(directory, file_name), "w") as f:
+            yaml.dump(yaml_dict, f)
+    return directory
@@ -0,0 +1,173 @@
+"""Benchmark suite for the load, convert and dump phases of a conversion
+
+Run from the repo root, e.g.
+
+    python -m benchmarks.run --models 200 --measures-per-model 25 --output results.json
+
+A MetricFlow project is generated with benchmarks.generate, then each phase is timed
+separately (best of --repeat runs) and its peak memory is measured in an extra run with
+tracemalloc. The results are printed and, with --output, saved as JSON so they can be
+compared across versions with `python -m benchmarks.compare`.
+"""
+import argparse
+import json
+import platform
+import subprocess
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+from metricflow_to_zenlytic.metricflow_to_zenlytic import (
+    convert_mf_project_to_zenlytic_project,
+    load_mf_project,
+    zenlytic_views_to_yaml,
+)
+
+from .generate import DEFAULT_METRIC_MIX, write_mf_project
+
+PHASES = ["load", "convert", "dump"]
+
+
+def run_phases(metricflow_folder: str, out_directory: str, load_options: dict = None):
+    """Returns (phase name, function) pairs, calling the functions in order runs the conversion"""
+    state = {}
+
+    def load():
+        state["project"] = load_mf_project(metricflow_folder, **(load_options or {}))
+
+    def convert():
+        state["models"], state["views"] = convert_mf_project_to_zenlytic_project(
+            state["project"], "bench_model", "bench_connection"
+        )
+
+    def dump():
+        zenlytic_views_to_yaml(state["models"], state["views"], out_directory, return_yaml=False)
+
+    return list(zip(PHASES, [load, convert, dump]))
+
+
+def time_phases(metricflow_folder: str, out_directory: str, repeat: int, load_options: dict = None):
+    seconds = {phase: float("inf") for phase in PHASES}
+    for _ in range(repeat):
+        for phase, function in run_phases(metricflow_folder, out_directory, load_options):
+            start = time.perf_counter()
+            function()
+            seconds[phase] = min(seconds[phase], time.perf_counter() - start)
+    return seconds
+
+
+def measure_peak_memory(metricflow_folder: str, out_directory: str, load_options: dict = None):
+    """Peak memory allocated during each phase, including what earlier phases still hold.
+    Python 3.8 can not reset the peak, so tracing is restarted for each phase and only what the
+    phase allocates is counted
+    """
+    peaks = {}
+    tracemalloc.start()
+    try:
+        for phase, function in run_phases(metricflow_folder, out_directory, load_options):
+            if hasattr(tracemalloc, "reset_peak"):
+                tracemalloc.reset_peak()
+            else:
+                tracemalloc.stop()
+                tracemalloc.start()
+            function()
+            peaks[phase] = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return peaks
+
+
+def _git_commit():
+    try:
+        result = subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True)
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return result.stdout.strip()
+
+
+def run_benchmark(
+    models: int,
+    measures_per_model: int,
+    metric_mix: dict,
+    filter_fraction: float,
+    repeat: int,
+    label: str = None,
+    load_options: dict = None,
+):
+    with tempfile.TemporaryDirectory() as metricflow_folder, tempfile.TemporaryDirectory() as out_directory:
+        write_mf_project(
+            metricflow_folder,
+            models,
+            measures_per_model,
+            metric_mix=metric_mix,
+            filter_fraction=filter_fraction,
+        )
+        seconds = time_phases(metricflow_folder, out_directory, repeat, load_options)
+        peaks = measure_peak_memory(metricflow_folder, out_directory, load_options)
+
+    return {
+        "label": label,
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "git_commit": _git_commit(),
+        "python": platform.python_version(),
+        "config": {
+            "models": models,
+            "measures_per_model": measures_per_model,
+            "metric_mix": metric_mix,
+            "filter_fraction": filter_fraction,
+            "repeat": repeat,
+            "load_options": load_options or {},
+        },
+        "phases": {phase: {"seconds": seconds[phase], "peak_memory_bytes": peaks[phase]} for phase in PHASES},
+    }
+
+
+def print_results(results: dict):
+    config = results["config"]
+    print(f"{config['models']} semantic models, {config['measures_per_model']} measures per model")
+    print(f"{'phase':>8} {'seconds':>10} {'peak MB':>10}")
+    for phase, result in results["phases"].items():
+        print(f"{phase:>8} {result['seconds']:>10.3f} {result['peak_memory_bytes'] / 2**20:>10.1f}")
+
+
+def _metric_mix(value: str):
+    """Parses simple=0.5,ratio=0.2,... into a dict"""
+    metric_mix = {}
+    for item in value.split(","):
+        metric_type, fraction = item.split("=")
+        metric_mix[metric_type.strip()] = float(fraction)
+    return metric_mix
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--models", type=int, default=100, help="Number of semantic models")
+    parser.add_argument("--measures-per-model", type=int, default=20)
+    parser.add_argument(
+        "--metric-mix",
+        type=_metric_mix,
+        default=DEFAULT_METRIC_MIX,
+        help="Fraction of each metric type, like simple=0.5,ratio=0.2,derived=0.2,cumulative=0.1",
+    )
+    parser.add_argument(
+        "--filter-fraction", type=float, default=0.25, help="Fraction of metrics with a filter"
+    )
+    parser.add_argument("--repeat", type=int, default=3, help="Runs to take the best time of")
+    parser.add_argument("--label", default=None, help="Name for this run, like the version being benchmarked")
+    parser.add_argument("--output", default=None, help="Path to save the results to as JSON")
+    args = parser.parse_args()
+
+    results = run_benchmark(
+        args.models, args.measures_per_model, args.metric_mix, args.filter_fraction, args.repeat, args.label
+    )
+    print_results(results)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
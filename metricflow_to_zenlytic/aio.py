@@ -0,0 +1,163 @@
+import asyncio
+from functools import partial
+from itertools import chain
+
+from .metricflow_to_zenlytic import (
+    YamlDumpers,
+    YamlLoaders,
+    _add_to_write_summary,
+    _build_mf_project,
+    _chunksize,
+    _make_zenlytic_directories,
+    _new_write_summary,
+    _parse_mf_text,
+    _project_measure_registry,
+    _project_metric_graph,
+    _remove_orphaned_views,
+    convert_mf_view_to_zenlytic_view,
+    create_zenlytic_model,
+    dump_yaml_to_file,
+    read_mf_project_files,
+    write_zenlytic_file,
+    zenlytic_file_path,
+)
+
+# How many files are read, parsed, dumped or written at once by default
+DEFAULT_CONCURRENCY = 16
+
+
+async def load_mf_project(
+    models_folder: str,
+    loader: str = YamlLoaders.round_trip,
+    include: list = None,
+    exclude: list = None,
+    semantic_only: bool = False,
+    executor=None,
+    concurrency: int = DEFAULT_CONCURRENCY,
+):
+    """Async version of load_mf_project that does not block the event loop. The files are read
+    from the loop's default executor and parsed in executor, at most concurrency of them at once.
+    executor defaults to the loop's default executor, pass a ProcessPoolExecutor to parse the
+    files in parallel. The result is the same as load_mf_project's
+    """
+    loop = asyncio.get_running_loop()
+    paths = await loop.run_in_executor(
+        None, read_mf_project_files, models_folder, include, exclude, semantic_only
+    )
+
+    async def parse_file(path: str):
+        text = await loop.run_in_executor(None, _read_text, path)
+        return await loop.run_in_executor(executor, _parse_mf_text, path, text, loader)
+
+    return _build_mf_project(await _gather_bounded(parse_file, paths, concurrency))
+
+
+async def convert_mf_project_to_zenlytic_project(
+    mf_project: dict,
+    project_name: str = "mf_project_name",
+    connection_name: str = "mf_connection_name",
+    executor=None,
+    concurrency: int = DEFAULT_CONCURRENCY,
+):
+    """Async version of convert_mf_project_to_zenlytic_project. The views are converted in chunks
+    in executor, at most concurrency chunks at once, and returned in the order of mf_project
+    """
+    loop = asyncio.get_running_loop()
+    model = create_zenlytic_model(project_name, connection_name)
+    convert_views = partial(
+        _convert_mf_views,
+        model["name"],
+        _project_measure_registry(mf_project),
+        _project_metric_graph(mf_project),
+    )
+    semantic_models = list(mf_project.values())
+    size = _chunksize(len(semantic_models), concurrency)
+    chunks = [semantic_models[i : i + size] for i in range(0, len(semantic_models), size)]
+
+    async def convert_chunk(chunk: list):
+        return await loop.run_in_executor(executor, convert_views, chunk)
+
+    views = await _gather_bounded(convert_chunk, chunks, concurrency)
+    return [model], list(chain.from_iterable(views))
+
+
+async def zenlytic_views_to_yaml(
+    zenlytic_models,
+    zenlytic_views,
+    directory: str = None,
+    write_to_file=True,
+    return_yaml=True,
+    dumper: str = YamlDumpers.fast,
+    skip_unchanged: bool = False,
+    remove_orphans: bool = False,
+    summary: dict = None,
+    executor=None,
+    concurrency: int = DEFAULT_CONCURRENCY,
+):
+    """Async version of zenlytic_views_to_yaml. Each file is dumped in executor and written from
+    the loop's default executor, at most concurrency files at once. The files written, the summary
+    and the YAML strings returned are the same as zenlytic_views_to_yaml's
+    """
+    loop = asyncio.get_running_loop()
+    summary = _new_write_summary() if summary is None else summary
+    if write_to_file:
+        await loop.run_in_executor(None, _make_zenlytic_directories, directory)
+    elif not return_yaml:
+        return None
+
+    async def dump_file(zenlytic_file):
+        path = zenlytic_file_path(zenlytic_file, directory) if write_to_file else None
+        yaml_string = await loop.run_in_executor(
+            executor, partial(dump_yaml_to_file, zenlytic_file, dumper=dumper)
+        )
+        written = None
+        if path is not None:
+            written = await loop.run_in_executor(None, write_zenlytic_file, path, yaml_string, skip_unchanged)
+        return path, yaml_string, written
+
+    files = await _gather_bounded(dump_file, list(chain(zenlytic_models, zenlytic_views)), concurrency)
+    for path, _, written in files:
+        if path is not None:
+            _add_to_write_summary(summary, path, written)
+
+    if write_to_file and remove_orphans:
+        await loop.run_in_executor(None, _remove_orphaned_views, directory, summary)
+    return [yaml_string for _, yaml_string, _ in files] if return_yaml else None
+
+
+async def _gather_bounded(function, items: list, concurrency: int):
+    """Awaits function(item) for each item, at most concurrency at a time, and returns the results
+    in the order of items. When a call fails or the caller is cancelled, the calls that have not
+    started are cancelled before the error is raised. Calls already running in an executor can not
+    be interrupted, they finish in the background and their results are dropped
+    """
+    if concurrency < 1:
+        raise ValueError(f"concurrency must be at least 1, got {concurrency}")
+
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def run(item):
+        async with semaphore:
+            return await function(item)
+
+    tasks = [asyncio.ensure_future(run(item)) for item in items]
+    try:
+        return await asyncio.gather(*tasks)
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+def _read_text(path: str):
+    with open(path, "r") as f:
+        return f.read()
+
+
+def _convert_mf_views(project_name: str, all_measures: dict, metric_graph, semantic_models: list):
+    return [
+        convert_mf_view_to_zenlytic_view(
+            semantic_model, project_name, all_measures, metric_graph=metric_graph
+        )
+        for semantic_model in semantic_models
+    ]
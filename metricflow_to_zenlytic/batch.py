@@ -0,0 +1,138 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from .metricflow_to_zenlytic import (
+    YamlLoaders,
+    _init_worker,
+    convert_yml_to_dict,
+    find_semantic_manifest,
+    load_mf_manifest,
+    load_mf_project,
+    write_mf_project_to_zenlytic,
+)
+
+# Keys each project in a batch manifest must have, and the options it can override
+BATCH_PROJECT_KEYS = ["metricflow_folder", "model_name", "connection_name", "out_directory"]
+BATCH_PROJECT_OPTIONS = ["name", "loader", "include", "exclude", "semantic_only", "manifest"]
+
+
+def read_batch_manifest(path: str):
+    """Returns the projects listed in a batch manifest, a YAML file like
+
+        projects:
+          - metricflow_folder: business_units/sales
+            model_name: sales
+            connection_name: sales_warehouse
+            out_directory: zenlytic/sales
+            # Optional, defaults to the model name
+            name: sales
+
+    Relative folders are resolved from the manifest's directory. A project can also set the
+    loader, include, exclude, semantic_only and manifest options of convert for itself.
+    """
+    manifest = convert_yml_to_dict(path, YamlLoaders.safe)
+    if not isinstance(manifest, dict) or not isinstance(manifest.get("projects"), list):
+        raise ValueError(f"The batch manifest {path} must have a top level projects list")
+
+    base_directory = os.path.dirname(os.path.abspath(path))
+    projects, names = [], set()
+    for position, project in enumerate(manifest["projects"]):
+        if not isinstance(project, dict):
+            raise ValueError(f"Project {position} in the batch manifest {path} is not a mapping")
+        missing = [key for key in BATCH_PROJECT_KEYS if key not in project]
+        if missing:
+            raise ValueError(
+                f"Project {position} in the batch manifest {path} is missing {', '.join(missing)}"
+            )
+        unknown = set(project) - set(BATCH_PROJECT_KEYS) - set(BATCH_PROJECT_OPTIONS)
+        if unknown:
+            unknown = ", ".join(sorted(unknown))
+            raise ValueError(f"Project {position} in the batch manifest {path} has unknown keys {unknown}")
+
+        project = {"name": project["model_name"], **project}
+        if project["name"] in names:
+            raise ValueError(f"The project name {project['name']} is used twice in the batch manifest {path}")
+        names.add(project["name"])
+        for key in ["metricflow_folder", "out_directory"]:
+            project[key] = os.path.join(base_directory, project[key])
+        projects.append(project)
+    return projects
+
+
+def iter_convert_projects(projects: list, workers: int = None, **options):
+    """Converts each project from read_batch_manifest and yields a result for it, in the order of
+    projects. The result has the project's "name", the "seconds" its conversion took, the
+    "written", "skipped" and "removed" paths (see write_mf_project_to_zenlytic) and the "error"
+    it failed with, which is None when it succeeded. A project that fails does not stop the others.
+
+    options are the defaults for the projects' loader, include, exclude, semantic_only and manifest
+    options, and skip_unchanged and remove_orphans for writing them.
+
+    When workers is more than 1 the projects are converted in a pool of that many processes,
+    started once for the whole batch, with each project converted in a single process.
+    """
+    if not workers or workers <= 1 or len(projects) <= 1:
+        for project in projects:
+            yield convert_batch_project(project, **options)
+        return
+
+    with ProcessPoolExecutor(workers, initializer=_init_worker) as pool:
+        conversions = [pool.submit(convert_batch_project, project, **options) for project in projects]
+        for project, conversion in zip(projects, conversions):
+            try:
+                yield conversion.result()
+            except Exception as e:
+                # The worker process itself failed, for example it was killed
+                yield _batch_result(project, 0.0, error=e)
+
+
+def convert_batch_project(
+    project: dict,
+    loader: str = YamlLoaders.round_trip,
+    include: list = None,
+    exclude: list = None,
+    semantic_only: bool = False,
+    manifest: bool = True,
+    skip_unchanged: bool = False,
+    remove_orphans: bool = False,
+):
+    """Converts one project from read_batch_manifest and returns its result, see iter_convert_projects"""
+    options = {
+        "loader": loader,
+        "include": include,
+        "exclude": exclude,
+        "semantic_only": semantic_only,
+        "manifest": manifest,
+        **{key: project[key] for key in BATCH_PROJECT_OPTIONS if key in project and key != "name"},
+    }
+    start = time.perf_counter()
+    try:
+        manifest_path = (
+            find_semantic_manifest(project["metricflow_folder"]) if options.pop("manifest") else None
+        )
+        if manifest_path:
+            mf_project = load_mf_manifest(manifest_path)
+        else:
+            mf_project = load_mf_project(project["metricflow_folder"], **options)
+        summary = write_mf_project_to_zenlytic(
+            mf_project,
+            project["model_name"],
+            project["connection_name"],
+            project["out_directory"],
+            skip_unchanged=skip_unchanged,
+            remove_orphans=remove_orphans,
+        )
+    except Exception as e:
+        return _batch_result(project, time.perf_counter() - start, error=e)
+    return _batch_result(project, time.perf_counter() - start, summary)
+
+
+def _batch_result(project: dict, seconds: float, summary: dict = None, error: Exception = None):
+    summary = summary or {"written": [], "skipped": [], "removed": []}
+    return {
+        "name": project["name"],
+        "seconds": seconds,
+        **summary,
+        "error": None if error is None else f"{type(error).__name__}: {error}",
+    }
@@ -1,10 +1,29 @@
+import cProfile
+import os
+import sys
+from contextlib import ExitStack
+
 import click
 
+from .batch import iter_convert_projects, read_batch_manifest
+from .delta import format_delta, project_delta, read_converted_project, read_zenlytic_project
+from .incremental import DEFAULT_CACHE_DIRECTORY, IncrementalProject
 from .metricflow_to_zenlytic import (
-    convert_mf_project_to_zenlytic_project,
+    YamlLoaders,
+    find_semantic_manifest,
+    load_mf_manifest,
     load_mf_project,
-    zenlytic_views_to_yaml,
+    write_mf_project_to_zenlytic,
+)
+from .profiling import ConversionProfiler
+from .server import (
+    DEFAULT_SERVER_PORT,
+    SERVER_URL_ENVIRONMENT_VARIABLE,
+    ConversionServer,
+    request_from_server,
 )
+from .validation import format_reference_issues
+from .watch import watch_mf_project
 
 
 def echo(text: str, color: str = None, bold: bool = True):
@@ -14,6 +33,54 @@ def echo(text: str, color: str = None, bold: bool = True):
         click.echo(text)
 
 
+def file_options(function):
+    """Options for how the files in the MetricFlow folder are selected and parsed"""
+    options = [
+        click.option(
+            "--loader",
+            default=YamlLoaders.round_trip,
+            type=click.Choice(YamlLoaders.all()),
+            help="YAML loader to parse files with. The safe loaders are faster",
+        ),
+        click.option(
+            "--include",
+            multiple=True,
+            help="Glob pattern for the files to read, by name or path in the MetricFlow folder. "
+            "Can be repeated",
+        ),
+        click.option(
+            "--exclude",
+            multiple=True,
+            help="Glob pattern for files or directories to skip, by name or path in the MetricFlow folder. "
+            "Can be repeated",
+        ),
+        click.option(
+            "--semantic-only",
+            is_flag=True,
+            default=False,
+            help="Skip files with no top level semantic_models or metrics key without parsing them",
+        ),
+    ]
+    for option in reversed(options):
+        function = option(function)
+    return function
+
+
+def name_options(function):
+    """Options for the names written to the Zenlytic model"""
+    options = [
+        click.option(
+            "--model-name", default="my_model", help="Name of the Zenlytic model the views belong to"
+        ),
+        click.option(
+            "--connection-name", default="my_company", help="Name of the connection the Zenlytic model uses"
+        ),
+    ]
+    for option in reversed(options):
+        function = option(function)
+    return function
+
+
 @click.group()
 @click.version_option()
 def cli_group():
@@ -22,9 +89,406 @@ def cli_group():
 
 @cli_group.command()
 @click.option("--out-directory", default=None, help="Where to save the Zenlytic project to")
+@name_options
+@click.option(
+    "--jobs",
+    "-j",
+    default=1,
+    type=click.IntRange(min=1),
+    help="Number of processes to parse files and convert views with",
+)
+@file_options
+@click.option(
+    "--manifest/--no-manifest",
+    default=True,
+    help="Load target/semantic_manifest.json instead of the YAML files when it is newer than all of them",
+)
+@click.option(
+    "--incremental",
+    is_flag=True,
+    default=False,
+    help="Only re-parse changed files and rewrite views whose inputs changed since the last run",
+)
+@click.option(
+    "--cache-dir",
+    default=None,
+    help=f"Where --incremental keeps its cache. Defaults to {DEFAULT_CACHE_DIRECTORY} "
+    "in the MetricFlow folder",
+)
+@click.option(
+    "--skip-unchanged",
+    is_flag=True,
+    default=False,
+    help="Leave files that already hold the converted YAML untouched and replace the others atomically",
+)
+@click.option(
+    "--remove-orphans",
+    is_flag=True,
+    default=False,
+    help="Delete view files (*_view.yml) of semantic models that are no longer in the project",
+)
+@click.option(
+    "--validate",
+    is_flag=True,
+    default=False,
+    help="Check that the ${...} references in the converted views resolve, and fail when any do not",
+)
+@click.option(
+    "--profile",
+    is_flag=True,
+    default=False,
+    help="Print the time, call count and peak memory of each phase and the slowest files and views",
+)
+@click.option("--profile-trace", default=None, help="Path to save a JSON trace of each phase to")
+@click.option("--cprofile", default=None, help="Path to save cProfile stats of the conversion to")
+@click.option(
+    "--server-url",
+    default=None,
+    envvar=SERVER_URL_ENVIRONMENT_VARIABLE,
+    help="URL of a running `serve` process to convert with, like http://127.0.0.1:8765. "
+    "The conversion runs in this process when no server is listening there",
+)
+@click.option(
+    "--delta-output",
+    default=None,
+    help="Path to save a JSON patch of the fields, identifiers and views that changed "
+    "since the project was last written to the out directory",
+)
 @click.argument("metricflow_folder")
-def convert(metricflow_folder, out_directory):
+def convert(
+    metricflow_folder,
+    out_directory,
+    model_name,
+    connection_name,
+    jobs,
+    loader,
+    include,
+    exclude,
+    semantic_only,
+    manifest,
+    incremental,
+    cache_dir,
+    skip_unchanged,
+    remove_orphans,
+    validate,
+    profile,
+    profile_trace,
+    cprofile,
+    server_url,
+    delta_output,
+):
     """Convert a MetricFlow project to a Zenlytic project"""
-    metricflow_project = load_mf_project(metricflow_folder)
-    models, views = convert_mf_project_to_zenlytic_project(metricflow_project, "my_model", "my_company")
-    zenlytic_views_to_yaml(models, views, out_directory)
+    if validate and incremental:
+        raise click.UsageError(
+            "--validate needs every view converted, so it can not be used with --incremental"
+        )
+
+    # The files are read before they are overwritten, to compare the new ones with them.
+    # Only the files the converter writes are compared, hand-written views are not part of the delta
+    skipped_files = []
+    previous_project = (
+        read_zenlytic_project(out_directory, converted_only=True, skipped=skipped_files)
+        if delta_output
+        else None
+    )
+    with ExitStack() as stack:
+        profiler = stack.enter_context(ConversionProfiler()) if profile or profile_trace else None
+        cprofiler = stack.enter_context(cProfile.Profile()) if cprofile else None
+        summary = _convert(
+            metricflow_folder,
+            out_directory,
+            model_name,
+            connection_name,
+            jobs,
+            loader,
+            include,
+            exclude,
+            semantic_only,
+            manifest,
+            incremental,
+            cache_dir,
+            skip_unchanged,
+            remove_orphans,
+            validate,
+            # Profiling, validating and converting in several processes run the conversion in this process
+            None if profile or profile_trace or cprofile or validate or jobs > 1 else server_url,
+        )
+
+    if cprofiler:
+        cprofiler.dump_stats(cprofile)
+    if profile:
+        echo(profiler.report())
+    if profile_trace:
+        profiler.write_trace(profile_trace)
+    if delta_output:
+        _write_delta(previous_project, summary, delta_output, skipped_files)
+
+
+def _convert(
+    metricflow_folder,
+    out_directory,
+    model_name,
+    connection_name,
+    jobs,
+    loader,
+    include,
+    exclude,
+    semantic_only,
+    manifest,
+    incremental,
+    cache_dir,
+    skip_unchanged,
+    remove_orphans,
+    validate=False,
+    server_url=None,
+):
+    file_options = {"include": list(include), "exclude": list(exclude), "semantic_only": semantic_only}
+    if incremental:
+        cache_dir = cache_dir or os.path.join(metricflow_folder, DEFAULT_CACHE_DIRECTORY)
+        project = IncrementalProject(
+            metricflow_folder, cache_dir=cache_dir, loader=loader, workers=jobs, **file_options
+        )
+        summary = project.convert(
+            model_name,
+            connection_name,
+            out_directory,
+            remove_orphans=remove_orphans,
+            skip_unchanged=skip_unchanged,
+        )
+        _echo_write_summary(summary)
+        return summary
+
+    manifest_path = find_semantic_manifest(metricflow_folder) if manifest else None
+    if manifest_path:
+        echo(f"Loading the project from {manifest_path}")
+        metricflow_project = load_mf_manifest(manifest_path)
+    elif server_url and (
+        summary := _convert_with_server(
+            server_url,
+            metricflow_folder,
+            out_directory,
+            model_name,
+            connection_name,
+            loader,
+            file_options,
+            remove_orphans,
+            skip_unchanged,
+        )
+    ):
+        return summary
+    else:
+        metricflow_project = load_mf_project(metricflow_folder, workers=jobs, loader=loader, **file_options)
+    summary = write_mf_project_to_zenlytic(
+        metricflow_project,
+        model_name,
+        connection_name,
+        out_directory,
+        workers=jobs,
+        skip_unchanged=skip_unchanged,
+        remove_orphans=remove_orphans,
+        validate=validate,
+    )
+    _echo_write_summary(summary)
+    if validate:
+        _echo_validation_issues(summary["issues"])
+    return summary
+
+
+def _convert_with_server(
+    server_url,
+    metricflow_folder,
+    out_directory,
+    model_name,
+    connection_name,
+    loader,
+    file_options,
+    remove_orphans,
+    skip_unchanged,
+):
+    """Converts the project with the server at server_url and returns the summary of the files
+    it wrote, or None when it is not running
+    """
+    request = {
+        "metricflow_folder": os.path.abspath(metricflow_folder),
+        "out_directory": os.path.abspath(out_directory or "."),
+        "model_name": model_name,
+        "connection_name": connection_name,
+        "loader": loader,
+        "remove_orphans": remove_orphans,
+        "skip_unchanged": skip_unchanged,
+        **file_options,
+    }
+    summary = request_from_server(server_url, "/convert", request)
+    if summary is None:
+        echo(f"No conversion server is listening at {server_url}, converting in this process")
+        return None
+    _echo_write_summary(summary)
+    return summary
+
+
+def _write_delta(previous_project: dict, summary: dict, path: str, skipped_files: list):
+    converted_project = read_converted_project(summary, previous_project, skipped_files)
+    for skipped_path in sorted(set(skipped_files)):
+        echo(
+            f"Warning: {skipped_path} is not a Zenlytic model or view, leaving it out of the delta", "yellow"
+        )
+    patch = project_delta(previous_project.values(), converted_project.values())
+    with open(path, "w") as f:
+        f.write(format_delta(patch))
+    echo(f"Saved {len(patch)} changes to {path}")
+
+
+def _echo_validation_issues(issues: list):
+    if not issues:
+        echo("All references resolve", color="green")
+        return
+    echo(format_reference_issues(issues))
+    echo(f"Found {len(issues)} broken references", color="red")
+    sys.exit(1)
+
+
+def _echo_write_summary(summary: dict):
+    echo(
+        f"Wrote {len(summary['written'])} files, {len(summary['skipped'])} unchanged, "
+        f"{len(summary['removed'])} removed"
+    )
+
+
+@cli_group.command()
+@click.option("--out-directory", default=None, help="Where to save the Zenlytic project to")
+@name_options
+@file_options
+@click.option("--interval", default=0.5, type=float, help="Seconds between checks for changed files")
+@click.option(
+    "--debounce",
+    default=0.5,
+    type=float,
+    help="Seconds without further changes to wait for before rebuilding",
+)
+@click.argument("metricflow_folder")
+def watch(
+    metricflow_folder,
+    out_directory,
+    model_name,
+    connection_name,
+    loader,
+    include,
+    exclude,
+    semantic_only,
+    interval,
+    debounce,
+):
+    """Convert a MetricFlow project, then reconvert the affected views whenever its files change"""
+    project = IncrementalProject(
+        metricflow_folder,
+        loader=loader,
+        include=list(include),
+        exclude=list(exclude),
+        semantic_only=semantic_only,
+    )
+
+    def on_rebuild(summary: dict):
+        echo(f"Wrote {len(summary['written'])} files, {len(summary['skipped'])} unchanged", color="green")
+
+    def on_error(error: Exception):
+        echo(f"Conversion failed: {error}", color="red")
+
+    echo(f"Watching {metricflow_folder} for changes, press Ctrl+C to stop")
+    try:
+        watch_mf_project(
+            project,
+            model_name,
+            connection_name,
+            out_directory,
+            interval=interval,
+            debounce=debounce,
+            on_rebuild=on_rebuild,
+            on_error=on_error,
+        )
+    except KeyboardInterrupt:
+        pass
+
+
+@cli_group.command()
+@click.option("--port", default=DEFAULT_SERVER_PORT, type=int, help="Port to listen on, on 127.0.0.1")
+def serve(port):
+    """Run a local server that keeps MetricFlow projects in memory between conversions.
+
+    Point convert at it with --server-url or the METRICFLOW_TO_ZENLYTIC_SERVER_URL environment
+    variable. Each conversion then only parses the files that changed since the last one.
+    """
+    server = ConversionServer(port)
+    echo(f"Serving conversions at {server.url}, press Ctrl+C to stop")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+@cli_group.command("convert-many")
+@click.option(
+    "--jobs",
+    "-j",
+    default=1,
+    type=click.IntRange(min=1),
+    help="Number of processes to convert projects in, each project is converted in one of them",
+)
+@file_options
+@click.option(
+    "--manifest/--no-manifest",
+    default=True,
+    help="Load each project's target/semantic_manifest.json when it is newer than all of its YAML files",
+)
+@click.option(
+    "--skip-unchanged",
+    is_flag=True,
+    default=False,
+    help="Leave files that already hold the converted YAML untouched and replace the others atomically",
+)
+@click.option(
+    "--remove-orphans",
+    is_flag=True,
+    default=False,
+    help="Delete view files (*_view.yml) of semantic models that are no longer in their project",
+)
+@click.argument("batch_manifest")
+def convert_many(
+    batch_manifest, jobs, loader, include, exclude, semantic_only, manifest, skip_unchanged, remove_orphans
+):
+    """Convert every MetricFlow project listed in a batch manifest to a Zenlytic project.
+
+    The manifest is a YAML file with a projects list, each with a metricflow_folder, model_name,
+    connection_name and out_directory. A project that fails to convert does not stop the others,
+    and the command exits with an error when any of them failed.
+    """
+    projects = read_batch_manifest(batch_manifest)
+    results = iter_convert_projects(
+        projects,
+        workers=jobs,
+        loader=loader,
+        include=list(include),
+        exclude=list(exclude),
+        semantic_only=semantic_only,
+        manifest=manifest,
+        skip_unchanged=skip_unchanged,
+        remove_orphans=remove_orphans,
+    )
+
+    failed = []
+    for result in results:
+        if result["error"]:
+            failed.append(result["name"])
+            echo(f"{result['name']} failed after {result['seconds']:.2f}s: {result['error']}", color="red")
+        else:
+            echo(
+                f"{result['name']}: wrote {len(result['written'])} files, "
+                f"{len(result['skipped'])} unchanged, {len(result['removed'])} removed "
+                f"in {result['seconds']:.2f}s"
+            )
+
+    echo(f"Converted {len(projects) - len(failed)} of {len(projects)} projects")
+    if failed:
+        echo(f"Failed: {', '.join(failed)}", color="red")
+        sys.exit(1)
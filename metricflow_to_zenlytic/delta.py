@@ -0,0 +1,203 @@
+import hashlib
+import json
+import os
+from collections.abc import Mapping
+from fnmatch import fnmatch
+
+import ruamel.yaml
+
+from .metricflow_to_zenlytic import YamlLoaders, convert_yml_to_dict
+
+# Names of the files the converter writes in each directory of a Zenlytic project
+CONVERTED_FILE_PATTERNS = {"models": "*_model.yml", "views": "*_view.yml"}
+# Keys of a view holding lists of named items, which are compared item by item
+NAMED_LIST_KEYS = ("fields", "identifiers")
+DELTA_OPERATIONS = ["add", "remove", "replace"]
+
+
+def read_zenlytic_project(
+    directory: str = None, paths: list = None, converted_only: bool = False, skipped: list = None
+):
+    """Returns the models and views of the Zenlytic project in directory as {absolute path: document},
+    or the files at paths when they are given. A directory that does not exist is an empty project.
+
+    With converted_only, only the files named like the converter writes them (see
+    CONVERTED_FILE_PATTERNS) are read, so hand-written views are left out. Files that are not
+    a model or view with a type and a name are left out too, and added to skipped when it is given
+    """
+    if paths is None:
+        paths = []
+        for sub_directory, pattern in CONVERTED_FILE_PATTERNS.items():
+            folder = os.path.join(directory or ".", sub_directory)
+            if os.path.isdir(folder):
+                pattern = pattern if converted_only else "*.yml"
+                names = sorted(name for name in os.listdir(folder) if fnmatch(name, pattern))
+                paths.extend(os.path.join(folder, name) for name in names)
+
+    project = {}
+    for path in paths:
+        try:
+            document = convert_yml_to_dict(path, YamlLoaders.c_safe)
+        except ruamel.yaml.YAMLError:
+            document = None
+        if isinstance(document, dict) and "type" in document and "name" in document:
+            project[os.path.abspath(path)] = document
+        elif skipped is not None:
+            skipped.append(os.path.abspath(path))
+    return project
+
+
+def read_converted_project(summary: dict, previous: dict = None, skipped: list = None):
+    """Returns the files a conversion wrote or skipped as {absolute path: document}, from its summary.
+    Skipped files did not change, so they are taken from previous (what read_zenlytic_project
+    returned before the conversion) instead of being read again when it has them. Files that are
+    not a model or view are added to skipped, like in read_zenlytic_project
+    """
+    previous = previous or {}
+    skipped_paths = {os.path.abspath(path) for path in summary["skipped"]}
+    paths = [os.path.abspath(path) for path in summary["written"] + summary["skipped"]]
+    project = {path: previous[path] for path in paths if path in skipped_paths and path in previous}
+    to_read = [path for path in paths if path not in project]
+    project.update(read_zenlytic_project(paths=to_read, skipped=skipped))
+    return {path: project[path] for path in paths if path in project}
+
+
+def project_delta(old_documents, new_documents):
+    """Returns the changes from the old to the new Zenlytic models and views as a JSON patch,
+    a list of {"op", "path", "value"} operations where op is one of DELTA_OPERATIONS.
+
+    Models and views are matched by name, and so are the fields and identifiers in a view, so the
+    paths name what changed instead of giving its position, like /views/orders/fields/revenue or
+    /views/orders/description ("~" and "/" in names are escaped as in JSON pointers). A view that
+    was added or removed is one operation, as is each added, removed or modified field, identifier
+    or other key of a view, and each model that changed. Items moving within a list are not changes.
+
+    Each side is hashed once per item and compared by hash, so computing the delta is linear in
+    the size of the projects
+    """
+    old_documents, new_documents = _by_name(old_documents), _by_name(new_documents)
+    patch = []
+    for key, old in old_documents.items():
+        path = _pointer(f"/{key[0]}s", key[1])
+        if key not in new_documents:
+            patch.append({"op": "remove", "path": path})
+        elif key[0] == "view":
+            _add_view_delta(patch, path, old, new_documents[key])
+        elif _digest(old) != _digest(new_documents[key]):
+            patch.append({"op": "replace", "path": path, "value": new_documents[key]})
+
+    for key, new in new_documents.items():
+        if key not in old_documents:
+            patch.append({"op": "add", "path": _pointer(f"/{key[0]}s", key[1]), "value": new})
+    return patch
+
+
+def _add_view_delta(patch: list, path: str, old: dict, new: dict):
+    for key in list(old) + [key for key in new if key not in old]:
+        key_path = _pointer(path, key)
+        if key not in new:
+            patch.append({"op": "remove", "path": key_path})
+        elif key not in old:
+            patch.append({"op": "add", "path": key_path, "value": new[key]})
+        elif key in NAMED_LIST_KEYS:
+            _add_named_list_delta(patch, key_path, old[key], new[key])
+        elif _digest(old[key]) != _digest(new[key]):
+            patch.append({"op": "replace", "path": key_path, "value": new[key]})
+
+
+def _add_named_list_delta(patch: list, path: str, old_items: list, new_items: list):
+    old_digests = {name: _digest(item) for name, item in _named_items(old_items, path).items()}
+    new_items = _named_items(new_items, path)
+    for name, old_digest in old_digests.items():
+        if name not in new_items:
+            patch.append({"op": "remove", "path": _pointer(path, name)})
+        elif _digest(new_items[name]) != old_digest:
+            patch.append({"op": "replace", "path": _pointer(path, name), "value": new_items[name]})
+
+    for name, item in new_items.items():
+        if name not in old_digests:
+            patch.append({"op": "add", "path": _pointer(path, name), "value": item})
+
+
+def apply_delta(documents, patch: list):
+    """Returns the Zenlytic models and views after applying a patch from project_delta to them.
+    Documents keep their order, with added ones at the end, and so do the items in their lists
+    """
+    documents = _by_name(documents)
+    for operation in patch:
+        op, path = operation.get("op"), operation.get("path", "")
+        if op not in DELTA_OPERATIONS:
+            raise ValueError(f"Unknown delta operation {op}, choose one of {DELTA_OPERATIONS}")
+
+        parts = [part.replace("~1", "/").replace("~0", "~") for part in path.split("/")[1:]]
+        if len(parts) < 2 or parts[0] not in {"models", "views"} or (parts[0] == "models" and len(parts) > 2):
+            raise ValueError(f"Can not apply the delta to the path {path}")
+
+        key = (parts[0][:-1], parts[1])
+        if len(parts) == 2:
+            _apply(documents, key, op, operation.get("value"), path)
+        elif key not in documents:
+            raise ValueError(f"Can not apply the delta to {path}, there is no {key[0]} named {key[1]}")
+        elif len(parts) == 3:
+            _apply(documents[key], parts[2], op, operation.get("value"), path)
+        elif len(parts) == 4 and parts[2] in NAMED_LIST_KEYS:
+            items = _named_items(documents[key].get(parts[2], []), path)
+            _apply(items, parts[3], op, operation.get("value"), path)
+            documents[key][parts[2]] = list(items.values())
+        else:
+            raise ValueError(f"Can not apply the delta to the path {path}")
+    return list(documents.values())
+
+
+def _apply(container: dict, key, op: str, value, path: str):
+    if (op == "add") == (key in container):
+        raise ValueError(f"Can not {op} {path}, it {'already exists' if op == 'add' else 'does not exist'}")
+    if op == "remove":
+        del container[key]
+    else:
+        container[key] = _plain(value)
+
+
+def format_delta(patch: list):
+    """Returns the patch as compact JSON"""
+    return json.dumps(patch, separators=(",", ":"))
+
+
+def _by_name(documents):
+    """Returns {(type, name): document} for the models and views, with keys the YAML dumper skips dropped"""
+    by_name = {}
+    for document in documents:
+        if "type" not in document or "name" not in document:
+            raise ValueError(f"Models and views need a type and a name, got {dict(document)}")
+        key = (document["type"], document["name"])
+        if key in by_name:
+            raise ValueError(f"There is more than one {key[0]} named {key[1]}")
+        by_name[key] = {k: _plain(v) for k, v in document.items() if not k.startswith("_")}
+    return by_name
+
+
+def _named_items(items: list, path: str):
+    named = {}
+    for item in items:
+        if item["name"] in named:
+            raise ValueError(f"There is more than one item named {item['name']} in {path}")
+        named[item["name"]] = item
+    return named
+
+
+def _plain(value):
+    """Returns value with fields and other mappings as dicts and tuples as lists, like JSON"""
+    if isinstance(value, Mapping):
+        return {key: _plain(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_plain(item) for item in value]
+    return value
+
+
+def _digest(value):
+    text = json.dumps(value, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.blake2b(text.encode(), digest_size=16).digest()
+
+
+def _pointer(path: str, name: str):
+    return f"{path}/{str(name).replace('~', '~0').replace('/', '~1')}"
@@ -0,0 +1,144 @@
+from collections.abc import MutableMapping
+
+# Every distinct order of keys is stored once and shared by the fields built with it
+_KEY_ORDERS = {}
+
+
+class ZenlyticField(MutableMapping):
+    """A Zenlytic view or field, stored in slots instead of a dict.
+
+    Fields behave like the dicts they replace (they compare equal to a dict with the same items,
+    and keys keep the order they were set in) but only use a slot per known key, and keys outside
+    of them, like ones set from meta.zenlytic, go to a small dict of extras. Fields are built in
+    place with item assignment and update, and rendered to plain dicts with to_dict when they are
+    dumped, which also validates them.
+    """
+
+    __slots__ = ("_keys", "_extra")
+    # Keys stored in slots, and keys a valid field must have
+    _slot_keys = frozenset()
+    required_keys = ()
+
+    def __init__(self, *args, **kwargs):
+        self._keys = ()
+        self._extra = None
+        self.update(*args, **kwargs)
+
+    def __getitem__(self, key):
+        if key in self._slot_keys:
+            try:
+                return getattr(self, key)
+            except AttributeError:
+                raise KeyError(key) from None
+        if self._extra is None:
+            raise KeyError(key)
+        return self._extra[key]
+
+    def __setitem__(self, key, value):
+        if key not in self._keys:
+            keys = self._keys + (key,)
+            self._keys = _KEY_ORDERS.setdefault(keys, keys)
+        if key in self._slot_keys:
+            setattr(self, key, value)
+        else:
+            if self._extra is None:
+                self._extra = {}
+            self._extra[key] = value
+
+    def __delitem__(self, key):
+        if key not in self._keys:
+            raise KeyError(key)
+        keys = tuple(k for k in self._keys if k != key)
+        self._keys = _KEY_ORDERS.setdefault(keys, keys)
+        if key in self._slot_keys:
+            delattr(self, key)
+        else:
+            del self._extra[key]
+
+    def __contains__(self, key):
+        return key in self._keys
+
+    def get(self, key, default=None):
+        # Mapping.get goes through __getitem__ and catches the KeyError, which is slow for missing keys
+        if key not in self._keys:
+            return default
+        return getattr(self, key) if key in self._slot_keys else self._extra[key]
+
+    def __iter__(self):
+        return iter(self._keys)
+
+    def __len__(self):
+        return len(self._keys)
+
+    def __repr__(self):
+        return f"{type(self).__name__}({dict(self.items())})"
+
+    def validate(self):
+        missing = [key for key in self.required_keys if key not in self._keys]
+        if missing:
+            raise ValueError(f"{type(self).__name__} {self.get('name')} is missing {', '.join(missing)}")
+
+    def to_dict(self):
+        """Returns the field as a plain dict, with nested fields rendered too"""
+        self.validate()
+        return {key: _render(self[key]) for key in self._keys}
+
+
+def _render(value):
+    if isinstance(value, ZenlyticField):
+        return value.to_dict()
+    if isinstance(value, list):
+        return [_render(item) for item in value]
+    return value
+
+
+# Keys shared by dimensions, dimension groups and measures
+_COMMON_KEYS = ("name", "sql", "field_type", "type", "label", "description", "hidden")
+
+
+class Dimension(ZenlyticField):
+    __slots__ = _COMMON_KEYS
+    _slot_keys = frozenset(__slots__)
+    required_keys = ("name", "sql", "field_type", "type")
+
+
+class DimensionGroup(Dimension):
+    __slots__ = ("timeframes",)
+    _slot_keys = frozenset(_COMMON_KEYS + __slots__)
+    required_keys = ("name", "sql", "field_type", "type", "timeframes")
+
+
+class Measure(ZenlyticField):
+    """A measure, converted from a MetricFlow measure or metric"""
+
+    __slots__ = _COMMON_KEYS + ("canon_date", "measure")
+    _slot_keys = frozenset(__slots__)
+    required_keys = ("name", "field_type", "type")
+
+    def validate(self):
+        super().validate()
+        if "sql" not in self._keys and "measure" not in self._keys:
+            raise ValueError(f"Measure {self['name']} needs either sql or a measure")
+
+
+class Identifier(ZenlyticField):
+    __slots__ = ("name", "type", "sql")
+    _slot_keys = frozenset(__slots__)
+    required_keys = ("name", "type", "sql")
+
+
+class View(ZenlyticField):
+    __slots__ = (
+        "version",
+        "type",
+        "model_name",
+        "fields",
+        "identifiers",
+        "original_file_path",
+        "name",
+        "sql_table_name",
+        "description",
+        "default_date",
+    )
+    _slot_keys = frozenset(__slots__)
+    required_keys = ("version", "type", "model_name", "name", "fields", "identifiers")
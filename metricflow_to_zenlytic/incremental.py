@@ -0,0 +1,308 @@
+import hashlib
+import json
+import os
+
+from ruamel.yaml import scalarstring
+
+from .metricflow_to_zenlytic import (
+    YamlLoaders,
+    _add_semantic_model,
+    _assign_metrics_to_semantic_models,
+    _make_zenlytic_directories,
+    _metric_input_names,
+    _parse_mf_files,
+    _project_measure_registry,
+    _project_metric_graph,
+    _remove_orphaned_views,
+    convert_mf_view_to_zenlytic_view,
+    create_zenlytic_model,
+    dump_yaml_to_file,
+    read_mf_project_files,
+    write_zenlytic_file,
+    zenlytic_file_path,
+)
+
+# Bump this when the parsed or converted output changes, so old caches are not reused
+CACHE_VERSION = 5
+DEFAULT_CACHE_DIRECTORY = ".zenlytic_cache"
+# String subclasses the round-trip loader uses for formatting, which the cache keeps by name
+_SCALAR_STRING_TYPES = {
+    cls.__name__: cls
+    for cls in [
+        scalarstring.LiteralScalarString,
+        scalarstring.FoldedScalarString,
+        scalarstring.SingleQuotedScalarString,
+        scalarstring.DoubleQuotedScalarString,
+        scalarstring.PlainScalarString,
+    ]
+}
+
+
+class IncrementalProject:
+    """Converts a MetricFlow project, re-parsing only the files whose content changed and
+    rewriting only the views whose inputs changed since the last conversion.
+
+    Parsed files are kept in memory and, when cache_dir is given, on disk keyed by the hash of
+    their content. A view's inputs are its semantic model, its metrics and the measures those
+    metrics reference, so a view is also rewritten when a measure it uses from another
+    semantic model changes, and the metrics its derived metrics reference. Files that are not
+    rewritten are not touched at all.
+
+    The on-disk cache holds the parsed files as JSON, so a cache committed to the project can not
+    run code, and cache entries that can not be read are parsed again.
+    """
+
+    def __init__(
+        self,
+        models_folder: str,
+        cache_dir: str = None,
+        loader: str = YamlLoaders.round_trip,
+        workers: int = None,
+        include: list = None,
+        exclude: list = None,
+        semantic_only: bool = False,
+    ):
+        self.models_folder = models_folder
+        self.cache_dir = cache_dir
+        self.loader = loader
+        self.workers = workers
+        self.include = include
+        self.exclude = exclude
+        self.semantic_only = semantic_only
+        # path -> (content hash, (semantic_models, metrics))
+        self._parsed_files = {}
+        # path -> ((mtime, size), content hash), so unchanged files are not read again to hash them
+        self._file_stats = {}
+        # output path -> fingerprint of the inputs it was written from
+        self._outputs = {}
+        self._load_state()
+
+    def load(self):
+        """Returns the semantic_models dict for the project, like load_mf_project"""
+        paths = read_mf_project_files(self.models_folder, self.include, self.exclude, self.semantic_only)
+        content_hashes = {path: self._content_hash(path) for path in paths}
+
+        changed_paths = []
+        for path in paths:
+            cached = self._parsed_files.get(path)
+            if cached is not None and cached[0] == content_hashes[path]:
+                continue
+            parsed = self._read_parsed_file(content_hashes[path])
+            if parsed is None:
+                changed_paths.append(path)
+            else:
+                self._parsed_files[path] = (content_hashes[path], parsed)
+
+        for path, parsed in zip(changed_paths, _parse_mf_files(changed_paths, self.workers, self.loader)):
+            self._parsed_files[path] = (content_hashes[path], parsed)
+            self._write_parsed_file(content_hashes[path], parsed)
+
+        # Files that were deleted since the last load
+        for path in set(self._parsed_files) - set(paths):
+            del self._parsed_files[path]
+            self._file_stats.pop(path, None)
+
+        semantic_models, metrics, measure_owners = {}, [], {}
+        for path in paths:
+            file_semantic_models, file_metrics = self._parsed_files[path][1]
+            metrics.extend(file_metrics)
+            for semantic_model in file_semantic_models:
+                _add_semantic_model(semantic_models, measure_owners, semantic_model)
+
+        _assign_metrics_to_semantic_models(semantic_models, metrics, measure_owners)
+        return semantic_models
+
+    def convert(
+        self,
+        project_name: str = "mf_project_name",
+        connection_name: str = "mf_connection_name",
+        directory: str = None,
+        remove_orphans: bool = False,
+        skip_unchanged: bool = False,
+    ):
+        """Loads the project and writes the Zenlytic model and views whose inputs changed to directory.
+        Returns a dict with the paths that were "written", "skipped" and "removed". With
+        remove_orphans, view files named like converted views (*_view.yml) for semantic models
+        that are no longer in the project are deleted. With skip_unchanged, views that are
+        converted again but already hold the same YAML are left untouched and the others are
+        replaced atomically, see write_zenlytic_file
+        """
+        semantic_models = self.load()
+        all_measures = _project_measure_registry(semantic_models)
+        metric_graph = _project_metric_graph(semantic_models)
+
+        _make_zenlytic_directories(directory)
+        summary = {"written": [], "skipped": [], "removed": []}
+
+        model = create_zenlytic_model(project_name, connection_name)
+        self._write_if_changed(model, zenlytic_file_path(model, directory), model, summary, skip_unchanged)
+
+        for name, semantic_model in semantic_models.items():
+            path = zenlytic_file_path({"name": name, "type": "view"}, directory)
+            inputs = [
+                project_name,
+                semantic_model,
+                _referenced_measures(semantic_model, all_measures, metric_graph),
+                _referenced_metrics(semantic_model, metric_graph),
+            ]
+            if self._is_unchanged(path, inputs):
+                summary["skipped"].append(path)
+                continue
+
+            view = convert_mf_view_to_zenlytic_view(
+                semantic_model, project_name, all_measures, metric_graph=metric_graph
+            )
+            self._write_if_changed(view, path, inputs, summary, skip_unchanged)
+
+        if remove_orphans:
+            _remove_orphaned_views(directory, summary)
+        self._save_state()
+        return summary
+
+    def _write_if_changed(
+        self, zenlytic_file: dict, path: str, inputs, summary: dict, skip_unchanged: bool = False
+    ):
+        if self._is_unchanged(path, inputs):
+            summary["skipped"].append(path)
+            return
+
+        written = write_zenlytic_file(path, dump_yaml_to_file(zenlytic_file), skip_unchanged)
+        self._outputs[path] = fingerprint(inputs)
+        summary["written" if written else "skipped"].append(path)
+
+    def _is_unchanged(self, path: str, inputs):
+        return self._outputs.get(path) == fingerprint(inputs) and os.path.exists(path)
+
+    def _content_hash(self, path: str):
+        stat = os.stat(path)
+        file_stat = (stat.st_mtime_ns, stat.st_size)
+        cached = self._file_stats.get(path)
+        if cached is not None and cached[0] == file_stat:
+            return cached[1]
+
+        with open(path, "rb") as f:
+            content_hash = hashlib.sha256(f.read())
+        # The same content parses differently with different loaders
+        content_hash.update(f"{CACHE_VERSION}:{self.loader}".encode())
+        self._file_stats[path] = (file_stat, content_hash.hexdigest())
+        return content_hash.hexdigest()
+
+    def _parsed_file_path(self, content_hash: str):
+        return os.path.join(self.cache_dir, "parsed", f"{content_hash}.json")
+
+    def _read_parsed_file(self, content_hash: str):
+        if not self.cache_dir or not os.path.exists(self._parsed_file_path(content_hash)):
+            return None
+        try:
+            with open(self._parsed_file_path(content_hash), "r") as f:
+                semantic_models, metrics = _from_json(json.load(f))
+        except (OSError, ValueError, TypeError, KeyError):
+            # A damaged or foreign cache entry is a miss, the file is parsed again
+            return None
+        if not isinstance(semantic_models, list) or not isinstance(metrics, list):
+            return None
+        return semantic_models, metrics
+
+    def _write_parsed_file(self, content_hash: str, parsed: tuple):
+        if not self.cache_dir:
+            return
+        try:
+            content = json.dumps(_to_json(parsed))
+        except (TypeError, ValueError):
+            # Values JSON can not hold, like dates, are not cached and the file is parsed every time
+            return
+        os.makedirs(os.path.join(self.cache_dir, "parsed"), exist_ok=True)
+        with open(self._parsed_file_path(content_hash), "w") as f:
+            f.write(content)
+
+    def _state_path(self):
+        return os.path.join(self.cache_dir, "state.json")
+
+    def _load_state(self):
+        if not self.cache_dir or not os.path.exists(self._state_path()):
+            return
+        with open(self._state_path(), "r") as f:
+            state = json.load(f)
+        if state.get("version") == CACHE_VERSION:
+            self._outputs = state["outputs"]
+
+    def _save_state(self):
+        if not self.cache_dir:
+            return
+        os.makedirs(self.cache_dir, exist_ok=True)
+        with open(self._state_path(), "w") as f:
+            json.dump({"version": CACHE_VERSION, "outputs": self._outputs}, f, indent=2)
+
+        # Drop parsed files that no longer match any file in the project
+        parsed_directory = os.path.join(self.cache_dir, "parsed")
+        in_use = {f"{content_hash}.json" for content_hash, _ in self._parsed_files.values()}
+        for file_name in os.listdir(parsed_directory) if os.path.isdir(parsed_directory) else []:
+            if file_name not in in_use:
+                os.remove(os.path.join(parsed_directory, file_name))
+
+
+def fingerprint(value):
+    """A stable hash of parsed YAML values. String subclasses the round-trip loader uses
+    for formatting (like block strings) are hashed with their type, since they dump differently
+    """
+    return hashlib.sha256(repr(_canonical(value)).encode()).hexdigest()
+
+
+def _canonical(value):
+    if isinstance(value, dict):
+        return ("dict", tuple((key, _canonical(item)) for key, item in value.items()))
+    if isinstance(value, (list, tuple)):
+        return ("list", tuple(_canonical(item) for item in value))
+    if isinstance(value, str) and type(value) is not str:
+        return (type(value).__name__, str(value))
+    return value
+
+
+def _to_json(value):
+    """Returns parsed YAML as JSON values. Mappings with keys that are not strings, or with a key
+    _from_json reads as a tag, become {"__mapping__": [[key, value], ...]}, and the round-trip
+    loader's string subclasses become {"__string__": type name, "value": string}
+    """
+    if isinstance(value, dict):
+        if (
+            all(type(key) is str for key in value)
+            and "__mapping__" not in value
+            and "__string__" not in value
+        ):
+            return {key: _to_json(item) for key, item in value.items()}
+        return {"__mapping__": [[_to_json(key), _to_json(item)] for key, item in value.items()]}
+    if isinstance(value, (list, tuple)):
+        return [_to_json(item) for item in value]
+    if isinstance(value, str) and type(value) is not str:
+        return {"__string__": type(value).__name__, "value": str(value)}
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    raise TypeError(f"Can not cache a value of type {type(value).__name__}")
+
+
+def _from_json(value):
+    if isinstance(value, dict):
+        if "__mapping__" in value:
+            return {_from_json(key): _from_json(item) for key, item in value["__mapping__"]}
+        if "__string__" in value:
+            return _SCALAR_STRING_TYPES.get(value["__string__"], str)(value["value"])
+        return {key: _from_json(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_from_json(item) for item in value]
+    return value
+
+
+def _referenced_measures(semantic_model: dict, all_measures: dict, metric_graph):
+    """Returns the measures the semantic model's metrics reference, wherever they are defined.
+    That includes the measures simple metrics used by derived metrics are built on, since a
+    filtered input of a derived metric embeds the measure's sql
+    """
+    names = [name for metric in semantic_model.get("metrics", []) for name in _metric_input_names(metric)]
+    names += [metric_graph.measure_name(name) for name in names]
+    return [all_measures[name] for name in names if name in all_measures]
+
+
+def _referenced_metrics(semantic_model: dict, metric_graph):
+    """Returns the metrics the semantic model's metrics reference, wherever they are placed"""
+    names = [name for metric in semantic_model.get("metrics", []) for name in _metric_input_names(metric)]
+    return [metric_graph.metrics[name] for name in names if name in metric_graph.metrics]
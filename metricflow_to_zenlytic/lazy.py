@@ -0,0 +1,292 @@
+import os
+from itertools import chain
+
+from .metricflow_to_zenlytic import (
+    MetricGraph,
+    YamlLoaders,
+    _add_to_measure_registry,
+    _metric_input_names,
+    _metric_placement_name,
+    _parse_mf_file,
+    convert_mf_view_to_zenlytic_view,
+    read_mf_project_files,
+)
+
+
+class LazyProject:
+    """A MetricFlow project that only parses the files needed for the semantic models asked for.
+
+    On first use every file is scanned line by line (without parsing the YAML) for the names of
+    its semantic models, their measures, and its metrics with the measure each metric is placed
+    by. Asking for a semantic model then parses only its file, the files defining its metrics
+    and the files defining the measures those metrics use. Files the scan can not follow, like
+    ones using flow collections or anchors, are parsed when the project is indexed.
+
+    The results match load_mf_project and convert_mf_project_to_zenlytic_project. Keep the
+    project around and call refresh after files change, only the changed files are scanned again.
+    """
+
+    def __init__(
+        self,
+        models_folder: str,
+        loader: str = YamlLoaders.round_trip,
+        include: list = None,
+        exclude: list = None,
+        semantic_only: bool = False,
+    ):
+        self.models_folder = models_folder
+        self.loader = loader
+        self.include = include
+        self.exclude = exclude
+        self.semantic_only = semantic_only
+        # path -> (semantic_models, metrics), like _parse_mf_file
+        self._parsed_files = {}
+        # path -> ((mtime, size), scanned (semantic_models, metrics))
+        self._scanned_files = {}
+        self._index = None
+
+    def refresh(self):
+        """Re-scans the files that were added or changed since the project was indexed"""
+        self._index = None
+
+    def semantic_model_names(self):
+        """Returns the names of the semantic models in the project, in the order load_mf_project has them"""
+        return list(self._get_index()["semantic_models"])
+
+    def get_semantic_model(self, name: str):
+        """Returns the semantic model with its metrics attached, like load_mf_project(...)[name]"""
+        index = self._get_index()
+        if name not in index["semantic_models"]:
+            raise ValueError(f"Could not find semantic model {name} in {self.models_folder}")
+
+        path = index["semantic_models"][name]
+        semantic_model = next(sm for sm in reversed(self._parse(path)[0]) if sm["name"] == name)
+
+        metrics = []
+        for metric_path, position, metric_name in index["placed_metrics"].get(name, []):
+            metric = self._parse(metric_path)[1][position]
+            if metric["name"] != metric_name:
+                raise ValueError(f"The file {metric_path} changed since the project was indexed")
+            metrics.append(metric)
+        return {**semantic_model, "metrics": metrics}
+
+    def convert_view(self, name: str, project_name: str = "mf_project_name"):
+        """Returns the Zenlytic view for the semantic model, parsing only the files it depends on"""
+        semantic_model = self.get_semantic_model(name)
+        metric_graph = self._metric_graph_for(semantic_model)
+        return convert_mf_view_to_zenlytic_view(
+            semantic_model,
+            project_name,
+            self._measures_for(semantic_model, metric_graph),
+            metric_graph=metric_graph,
+        )
+
+    def _metric_graph_for(self, semantic_model: dict):
+        """A MetricGraph of the metrics the semantic model's metrics reference"""
+        metric_locations = self._get_index()["metric_locations"]
+        referenced = {}
+        for metric in semantic_model["metrics"]:
+            for input_name in _metric_input_names(metric):
+                if input_name in metric_locations and input_name not in referenced:
+                    path, position = metric_locations[input_name]
+                    referenced[input_name] = self._parse(path)[1][position]
+        return MetricGraph(referenced.values())
+
+    def _measures_for(self, semantic_model: dict, metric_graph: MetricGraph):
+        """The measure registry for the measures the semantic model's metrics reference"""
+        index = self._get_index()
+        owners = {}
+        for metric in semantic_model["metrics"]:
+            for input_name in _metric_input_names(metric):
+                for measure_name in [input_name, metric_graph.measure_name(input_name)]:
+                    if measure_name in index["measure_owners"]:
+                        owners.setdefault(index["measure_owners"][measure_name], None)
+
+        all_measures = {}
+        for owner in owners:
+            for owner_model in self._parse(index["semantic_models"][owner])[0]:
+                if owner_model["name"] == owner:
+                    _add_to_measure_registry(all_measures, owner_model.get("measures", []))
+        return all_measures
+
+    def _parse(self, path: str):
+        if path not in self._parsed_files:
+            self._parsed_files[path] = _parse_mf_file(path, self.loader)
+        return self._parsed_files[path]
+
+    def _get_index(self):
+        if self._index is None:
+            self._index = self._build_index()
+        return self._index
+
+    def _build_index(self):
+        # semantic model name -> path, measure name -> semantic model name,
+        # semantic model name -> [(path, position in the file's metrics, metric name)],
+        # metric name -> (path, position in the file's metrics)
+        semantic_models, measure_owners, placed_metrics, metric_locations = {}, {}, {}, {}
+        metrics = []
+        paths = read_mf_project_files(self.models_folder, self.include, self.exclude, self.semantic_only)
+        for path in set(self._scanned_files) - set(paths):
+            del self._scanned_files[path]
+            self._parsed_files.pop(path, None)
+
+        for path in paths:
+            file_semantic_models, file_metrics = self._scan(path)
+            for semantic_model in file_semantic_models:
+                model_name = semantic_model["name"]
+                semantic_models[model_name] = path
+                for measure in semantic_model.get("measures", []):
+                    owner = measure_owners.setdefault(measure["name"], model_name)
+                    if owner != model_name:
+                        raise ValueError(
+                            f"Measure {measure['name']} is defined in both the {owner} and {model_name} "
+                            "semantic models. Measure names must be unique across the project"
+                        )
+            metrics.extend((path, position, metric) for position, metric in enumerate(file_metrics))
+
+        owners = MetricGraph(metric for _, _, metric in metrics).place(measure_owners)
+        for path, position, metric in metrics:
+            metric_locations.setdefault(metric["name"], (path, position))
+            if (owner := owners.get(metric["name"])) is not None:
+                placed_metrics.setdefault(owner, []).append((path, position, metric["name"]))
+
+        return {
+            "semantic_models": semantic_models,
+            "measure_owners": measure_owners,
+            "placed_metrics": placed_metrics,
+            "metric_locations": metric_locations,
+        }
+
+    def _scan(self, path: str):
+        stat = os.stat(path)
+        file_stat = (stat.st_mtime_ns, stat.st_size)
+        cached = self._scanned_files.get(path)
+        if cached is not None and cached[0] == file_stat:
+            return cached[1]
+
+        self._parsed_files.pop(path, None)
+        with open(path, "r") as f:
+            scanned = scan_mf_file(f.read())
+        if scanned is None:
+            scanned = self._parse(path)
+        self._scanned_files[path] = (file_stat, scanned)
+        return scanned
+
+
+def scan_mf_file(text: str):
+    """Returns the (semantic_models, metrics) in the text of a MetricFlow file, without parsing it
+    as YAML. Only the fields needed to index the project are kept: the name and measure names of
+    each semantic model, and the name, type and inputs of each metric.
+
+    Returns None when the file uses YAML the scan does not follow (flow collections, anchors,
+    aliases, tags, merge or complex keys) where those fields are, or when a semantic model or
+    metric is missing a field the index needs.
+    """
+    semantic_models, metrics = {}, {}
+    # (indent, key) for each mapping key and list item the current line is nested in,
+    # list items are numbered so each gets its own record
+    stack = []
+    item_count = 0
+
+    for line in text.splitlines():
+        stripped = line.lstrip(" ")
+        if not stripped or stripped[0] == "#":
+            continue
+        indent = len(line) - len(stripped)
+
+        while stripped[0] == "-" and (len(stripped) == 1 or stripped[1] == " "):
+            while stack and (
+                stack[-1][0] > indent or (stack[-1][0] == indent and stack[-1][1].__class__ is int)
+            ):
+                stack.pop()
+            item_count += 1
+            stack.append((indent, item_count))
+            in_section = stack[0][1] in _SECTIONS
+            if in_section and len(stack) == 2:
+                (semantic_models if stack[0][1] == "semantic_models" else metrics)[item_count] = _new_record(
+                    stack[0][1]
+                )
+            rest = stripped[1:].lstrip(" ")
+            if not rest:
+                break
+            if in_section and rest[0] in _UNSCANNABLE_STARTS:
+                return None
+            indent += len(stripped) - len(rest)
+            stripped = rest
+        else:
+            colon = stripped.find(":")
+            if colon < 1 or (len(stripped) > colon + 1 and stripped[colon + 1] != " "):
+                # Not a key, like a line of a multi-line string or a document marker
+                if stripped.startswith("? "):
+                    return None
+                continue
+
+            key = stripped[:colon].rstrip()
+            while stack and stack[-1][0] >= indent:
+                stack.pop()
+            stack.append((indent, key))
+            if stack[0][1] not in _SECTIONS:
+                continue
+            value = stripped[colon + 1 :].lstrip(" ")
+            if key == "<<" or (value and value[0] in _UNSCANNABLE_STARTS and value[:2] not in {"[]", "{}"}):
+                return None
+            if key not in _INDEXED_KEYS or len(stack) < 3 or stack[1][1].__class__ is not int:
+                continue
+            _index_field(semantic_models, metrics, [entry[1] for entry in stack], _scalar(value))
+
+    metrics = list(metrics.values())
+    try:
+        for metric in metrics:
+            _metric_placement_name(metric)
+    except (KeyError, IndexError):
+        return None
+    if any("name" not in item for item in chain(semantic_models.values(), metrics)):
+        return None
+    return list(semantic_models.values()), metrics
+
+
+_SECTIONS = {"semantic_models", "metrics"}
+# Flow collections, anchors, aliases and tags
+_UNSCANNABLE_STARTS = "{[&*!"
+_INDEXED_KEYS = {"name", "type", "measure", "numerator", "denominator"}
+
+
+def _index_field(semantic_models: dict, metrics: dict, path: list, value: str):
+    """Records the value of the key at the end of path in the semantic model or metric it is in"""
+    key = path[-1]
+    if path[0] == "semantic_models":
+        semantic_model = semantic_models[path[1]]
+        if len(path) == 3 and key == "name":
+            semantic_model["name"] = value
+        elif len(path) == 5 and path[2] == "measures" and key == "name":
+            semantic_model["measures"].append({"name": value})
+        return
+
+    metric = metrics[path[1]]
+    type_params = metric["type_params"]
+    if len(path) == 3 and key in {"name", "type"}:
+        metric[key] = value
+    elif len(path) < 4 or path[2] != "type_params":
+        return
+    elif len(path) == 4 and key in {"measure", "numerator", "denominator"}:
+        # A nested mapping with a name and a filter when there is no value
+        type_params[key] = value if value is not None else {}
+    elif len(path) == 5 and key == "name" and isinstance(type_params.get(path[3]), dict):
+        type_params[path[3]]["name"] = value
+    elif len(path) == 6 and path[3] == "metrics" and key == "name":
+        type_params.setdefault("metrics", []).append({"name": value})
+
+
+def _new_record(section: str):
+    return {"measures": []} if section == "semantic_models" else {"type_params": {}}
+
+
+def _scalar(value: str):
+    """The plain or quoted scalar at the start of value, without a trailing comment"""
+    value = value.strip()
+    if not value or value[0] == "#":
+        return None
+    if value[0] in {"'", '"'}:
+        end = value.find(value[0], 1)
+        return value[1:end] if end > 0 else value[1:]
+    return value.split(" #", 1)[0].rstrip()
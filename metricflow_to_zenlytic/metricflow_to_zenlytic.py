@@ -1,67 +1,609 @@
 import ruamel.yaml
-from glob import glob
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from fnmatch import fnmatch
+import hashlib
+import json
 import os
 import re
-
+import shutil
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from functools import lru_cache, partial
+from itertools import chain
+from typing import Union
+
+from .fields import Dimension, DimensionGroup, Identifier, Measure, View, ZenlyticField
 from .metricflow_types import MetricflowMetricTypes
+from .validation import ReferenceValidator, view_references
+from .yaml_emitter import emit_yaml
 
 
 class ZenlyticUnsupportedError(Exception):
     pass
 
 
+class YamlLoaders:
+    # Keeps comments and formatting, like multi-line strings written back as blocks
+    round_trip = "rt"
+    safe = "safe"
+    # The safe loader backed by libyaml
+    c_safe = "csafe"
+
+    @classmethod
+    def all(cls):
+        return [cls.round_trip, cls.safe, cls.c_safe]
+
+
+_yaml_loaders = threading.local()
+
+
+class YamlDumpers:
+    # Writes the YAML directly, falling back to ruamel for values it does not handle
+    fast = "fast"
+    # ruamel's round-trip dumper
+    round_trip = "rt"
+
+    @classmethod
+    def all(cls):
+        return [cls.fast, cls.round_trip]
+
+
+DEFAULT_INCLUDE_PATTERNS = ["*.yml", "*.yaml"]
+# dbt's build output, logs and installed packages, skipped at the top of the project only,
+# since folders deeper in the project can have the same names
+DBT_DIRECTORIES = {"target", "dbt_packages", "dbt_modules", "logs"}
+# Virtual environments and caches, skipped at any depth
+EXCLUDED_DIRECTORIES = {"venv", "node_modules", "__pycache__"}
+_SEMANTIC_KEYS_PATTERN = re.compile(r"^(semantic_models|metrics)\s*:", re.MULTILINE)
+
+# Called with a dict for the start and end of each phase of a conversion, see subscribe_to_timings
+_timing_subscribers = []
+TIMED_PHASES = ["discover", "parse", "assign", "convert", "dump", "write"]
+# Set in each worker process by _init_view_worker, so the measures are sent to a worker once
+_view_worker_state = {}
+
+
+def subscribe_to_timings(callback):
+    """Calls callback with a dict at the start and end of each phase of a conversion in this process.
+    The dict has the "event" ("start" or "end"), the "phase" (one of TIMED_PHASES), the "item" it
+    ran on (the file path or view name, None when the phase ran on the whole project) and the
+    "start" time from time.perf_counter. End events also have the "seconds" it took.
+    When files are parsed in several processes the whole parse is a single event
+    """
+    _timing_subscribers.append(callback)
+
+
+def unsubscribe_from_timings(callback):
+    _timing_subscribers.remove(callback)
+
+
+@contextmanager
+def _timed(phase: str, item: str = None):
+    if not _timing_subscribers:
+        yield
+        return
+
+    start = time.perf_counter()
+    _publish_timing({"event": "start", "phase": phase, "item": item, "start": start})
+    try:
+        yield
+    finally:
+        seconds = time.perf_counter() - start
+        _publish_timing({"event": "end", "phase": phase, "item": item, "start": start, "seconds": seconds})
+
+
+def _publish_timing(event: dict):
+    for callback in list(_timing_subscribers):
+        callback(event)
+
+
 def convert_mf_project_to_zenlytic_project(
-    mf_project: dict, project_name: str = "mf_project_name", connection_name: str = "mf_connection_name"
+    mf_project: dict,
+    project_name: str = "mf_project_name",
+    connection_name: str = "mf_connection_name",
+    workers: int = None,
 ):
     """mf_project is a dict with keys for each semantic model
-    and the dims, measures, and metrics associated with it
+    and the dims, measures, and metrics associated with it.
+    When workers is more than 1 the views are converted in a pool of that many processes
     """
-    all_measures = []
+    model = create_zenlytic_model(project_name, connection_name)
+    views = list(iter_mf_project_to_zenlytic_views(mf_project, model["name"], workers))
+    return [model], views
+
+
+def iter_mf_project_to_zenlytic_views(
+    mf_project: dict, project_name: str = "mf_project_name", workers: int = None
+):
+    """Yields the Zenlytic view for each semantic model in mf_project, converting one at a time.
+    Pass it to zenlytic_views_to_yaml with return_yaml=False to write each view as soon as it
+    is converted, without holding every view in memory.
+
+    When workers is more than 1 the views are converted in a pool of that many processes.
+    They are still yielded in the order of mf_project, and the first view that fails to convert
+    raises its error, as it would when converting serially
+    """
+    all_measures = _project_measure_registry(mf_project)
+    metric_graph = _project_metric_graph(mf_project)
+    if not workers or workers <= 1 or len(mf_project) <= 1:
+        for semantic_model in mf_project.values():
+            yield convert_mf_view_to_zenlytic_view(
+                semantic_model, project_name, all_measures, metric_graph=metric_graph
+            )
+        return
+
+    initargs = (project_name, all_measures, metric_graph, None, False)
+    with ProcessPoolExecutor(workers, initializer=_init_view_worker, initargs=initargs) as pool:
+        chunksize = _chunksize(len(mf_project), workers)
+        views = pool.map(_convert_view_in_worker, mf_project.values(), chunksize=chunksize)
+        with _timed("convert"):
+            views = _collect_when_timed(views)
+        yield from views
+
+
+def write_mf_project_to_zenlytic(
+    mf_project: dict,
+    project_name: str = "mf_project_name",
+    connection_name: str = "mf_connection_name",
+    directory: str = None,
+    workers: int = None,
+    skip_unchanged: bool = False,
+    remove_orphans: bool = False,
+    validate: bool = False,
+):
+    """Converts mf_project and writes the Zenlytic model and views to directory, streaming
+    each view to disk as it is converted. Returns a dict with the paths that were "written",
+    "skipped" and "removed", skip_unchanged and remove_orphans work like in zenlytic_views_to_yaml.
+    With validate, the references in the views are checked as they are converted and the dict
+    also has the "issues" found, see ReferenceValidator.issues
+
+    When workers is more than 1 each view is converted and dumped to YAML in a pool of that many
+    processes, and the files are written from a pool of threads while the next views are
+    converted. The files written are the same as when converting serially
+    """
+    model = create_zenlytic_model(project_name, connection_name)
+    summary = _new_write_summary()
+    validator = ReferenceValidator() if validate else None
+    write_options = {"skip_unchanged": skip_unchanged, "remove_orphans": remove_orphans, "summary": summary}
+    if not workers or workers <= 1 or len(mf_project) <= 1:
+        views = iter_mf_project_to_zenlytic_views(mf_project, model["name"])
+        if validator:
+            views = _validated_views(views, validator, directory)
+        zenlytic_views_to_yaml([model], views, directory, return_yaml=False, **write_options)
+        return _add_validation_issues(summary, validator)
+
+    _make_zenlytic_directories(directory)
+    model_file = [(zenlytic_file_path(model, directory), dump_yaml_to_file(model))]
+    initargs = (
+        model["name"],
+        _project_measure_registry(mf_project),
+        _project_metric_graph(mf_project),
+        directory,
+        validate,
+    )
+    with ProcessPoolExecutor(workers, initializer=_init_view_worker, initargs=initargs) as pool:
+        chunksize = _chunksize(len(mf_project), workers)
+        view_files = pool.map(_convert_and_dump_view_in_worker, mf_project.values(), chunksize=chunksize)
+        if validator:
+            view_files = _validated_view_files(view_files, validator)
+        with _timed("convert"):
+            view_files = _collect_when_timed(view_files)
+        _write_yaml_files(chain(model_file, view_files), workers, False, skip_unchanged, summary)
+
+    if remove_orphans:
+        _remove_orphaned_views(directory, summary)
+    return _add_validation_issues(summary, validator)
+
+
+def _validated_views(views, validator: ReferenceValidator, directory: str = None):
+    for view in views:
+        validator.add_view(view, zenlytic_file_path(view, directory))
+        yield view
+
+
+def _validated_view_files(view_files, validator: ReferenceValidator):
+    """Adds the references sent back with each (path, YAML string, references) to the validator"""
+    for path, yaml_string, references in view_files:
+        validator.add_references(references, path)
+        yield path, yaml_string
+
+
+def _add_validation_issues(summary: dict, validator: ReferenceValidator = None):
+    if validator:
+        summary["issues"] = validator.issues()
+    return summary
+
+
+def _init_view_worker(
+    project_name: str, all_measures: dict, metric_graph, directory: str, validate: bool = False
+):
+    _init_worker()
+    _view_worker_state.update(
+        project_name=project_name,
+        all_measures=all_measures,
+        metric_graph=metric_graph,
+        directory=directory,
+        validate=validate,
+    )
+
+
+def _convert_view_in_worker(semantic_model: dict):
+    state = _view_worker_state
+    return convert_mf_view_to_zenlytic_view(
+        semantic_model, state["project_name"], state["all_measures"], metric_graph=state["metric_graph"]
+    )
+
+
+def _convert_and_dump_view_in_worker(semantic_model: dict):
+    view = _convert_view_in_worker(semantic_model)
+    path = zenlytic_file_path(view, _view_worker_state["directory"])
+    if _view_worker_state["validate"]:
+        # Only what validating needs is sent back, the view itself stays in the worker
+        return path, dump_yaml_to_file(view), view_references(view)
+    return path, dump_yaml_to_file(view)
+
+
+def _collect_when_timed(items):
+    """Returns the items of the iterator as a list while timings are subscribed to, and the iterator
+    otherwise. Views converted in a pool are then all converted inside the "convert" timing, so the
+    files written after it are not counted in it and their "write" timings do not nest in it.
+    Without subscribers the views stay lazy, and each file is written as soon as its view is converted
+    """
+    return list(items) if _timing_subscribers else items
+
+
+def _chunksize(n_items: int, workers: int):
+    # A few chunks per worker, so the pool stays balanced without a round trip per item
+    return max(1, n_items // (workers * 4))
+
+
+def create_zenlytic_model(project_name: str = "mf_project_name", connection_name: str = "mf_connection_name"):
+    return {"version": 1, "type": "model", "name": project_name, "connection": connection_name}
+
+
+def _project_measure_registry(mf_project: dict):
+    all_measures = {}
     for semantic_model in mf_project.values():
-        all_measures.extend(semantic_model.get("measures", []))
+        _add_to_measure_registry(all_measures, semantic_model.get("measures", []))
+    return all_measures
 
-    model = {"version": 1, "type": "model", "name": project_name, "connection": connection_name}
-    views = []
-    for _, semantic_model in mf_project.items():
-        views.append(convert_mf_view_to_zenlytic_view(semantic_model, model["name"], all_measures))
 
-    return [model], views
+def _project_metric_graph(mf_project: dict):
+    return MetricGraph(
+        metric for semantic_model in mf_project.values() for metric in semantic_model.get("metrics", [])
+    )
 
 
-def load_mf_project(models_folder: str):
-    semantic_models, metrics = {}, []
-    for fn in read_mf_project_files(models_folder):
-        mf_model_dict = convert_yml_to_dict(fn)
+def load_mf_project(
+    models_folder: str,
+    workers: int = None,
+    loader: str = YamlLoaders.round_trip,
+    include: list = None,
+    exclude: list = None,
+    semantic_only: bool = False,
+):
+    """Loads every semantic model in the MetricFlow project, with its metrics attached.
+    When workers is more than 1 the files are parsed in a pool of that many processes,
+    the result is the same as parsing them serially. loader is one of YamlLoaders.
+    include, exclude and semantic_only select the files to load, see read_mf_project_files
+    """
+    paths = read_mf_project_files(models_folder, include, exclude, semantic_only)
+    return _build_mf_project(_parse_mf_files(paths, workers, loader))
 
-        metrics.extend(mf_model_dict.get("metrics", []))
-        for semantic_model in mf_model_dict.get("semantic_models", []):
-            semantic_models[semantic_model["name"]] = semantic_model
-            # Empty list of metrics to be filled below
-            semantic_models[semantic_model["name"]]["metrics"] = []
 
-    # Assign metrics to the view they should logically live in
-    for metric in metrics:
-        type_params = metric["type_params"]
-        if metric["type"] in {MetricflowMetricTypes.simple, MetricflowMetricTypes.cumulative}:
-            metric_measure = type_params["measure"]
-        elif metric["type"] == MetricflowMetricTypes.ratio:
-            metric_measure = type_params["numerator"]
-        elif metric["type"] == MetricflowMetricTypes.derived:
-            metric_measure = type_params["metrics"][0]["name"]
-
-        for model_name, semantic_model in semantic_models.items():
-            for measure in semantic_model.get("measures", []):
-                if metric_measure == measure["name"]:
-                    semantic_models[model_name]["metrics"].append(metric)
-                    break
+def _build_mf_project(mf_files):
+    """Returns the semantic_models dict for the (semantic_models, metrics) parsed from each file"""
+    semantic_models, metrics, measure_owners = {}, [], {}
+    for file_semantic_models, file_metrics in mf_files:
+        metrics.extend(file_metrics)
+        for semantic_model in file_semantic_models:
+            _add_semantic_model(semantic_models, measure_owners, semantic_model)
 
+    _assign_metrics_to_semantic_models(semantic_models, metrics, measure_owners)
     return semantic_models
 
 
+def load_mf_manifest(manifest_path: str):
+    """Loads the semantic models and metrics dbt compiles into target/semantic_manifest.json.
+    Returns the same semantic_models dict as load_mf_project does for the YAML files
+    """
+    with _timed("parse", manifest_path), open(manifest_path, "r") as f:
+        manifest = json.load(f)
+
+    semantic_models, measure_owners = {}, {}
+    for semantic_model in manifest.get("semantic_models", []):
+        _add_semantic_model(semantic_models, measure_owners, _semantic_model_from_manifest(semantic_model))
+
+    metrics = [_metric_from_manifest(metric) for metric in manifest.get("metrics", [])]
+    _assign_metrics_to_semantic_models(semantic_models, metrics, measure_owners)
+    return semantic_models
+
+
+def find_semantic_manifest(models_folder: str):
+    """Returns the path to dbt's semantic manifest if it is at least as recent
+    as every MetricFlow file in the project, otherwise None
+    """
+    manifest_path = os.path.join(models_folder, "target", "semantic_manifest.json")
+    if not os.path.isfile(manifest_path):
+        return None
+
+    manifest_mtime = os.path.getmtime(manifest_path)
+    if any(os.path.getmtime(fn) > manifest_mtime for fn in read_mf_project_files(models_folder)):
+        return None
+    return manifest_path
+
+
+def _semantic_model_from_manifest(mf_semantic_model: dict):
+    """Reshapes a semantic model from the manifest into the form it has in the YAML files"""
+    semantic_model = _drop_nulls(mf_semantic_model)
+    node_relation = semantic_model.pop("node_relation", {})
+    semantic_model["model"] = f"ref('{node_relation.get('alias')}')"
+    if meta := semantic_model.pop("config", {}).get("meta"):
+        semantic_model["meta"] = meta
+
+    for dimension in semantic_model.get("dimensions", []):
+        if meta := dimension.pop("config", {}).get("meta"):
+            dimension["meta"] = meta
+    return semantic_model
+
+
+def _metric_from_manifest(mf_metric: dict):
+    """Reshapes a metric from the manifest into the form it has in the YAML files"""
+    metric = _drop_nulls(mf_metric)
+    type_params = metric["type_params"]
+    filters = [metric.pop("filter", None)]
+
+    # The manifest always gives the measure as an input with its own (optional) filter
+    if "measure" in type_params:
+        filters.append(type_params["measure"].get("filter"))
+        type_params["measure"] = type_params["measure"]["name"]
+
+    if filter_sql := _where_filters_to_sql(*filters):
+        metric["filter"] = filter_sql
+
+    metric_inputs = [type_params[key] for key in ["numerator", "denominator"] if key in type_params]
+    for metric_input in metric_inputs + type_params.get("metrics", []):
+        if "filter" in metric_input:
+            metric_input["filter"] = _where_filters_to_sql(metric_input["filter"])
+    return metric
+
+
+def _where_filters_to_sql(*where_filters: dict):
+    templates = []
+    for where_filter in where_filters:
+        if where_filter:
+            templates.extend(f["where_sql_template"] for f in where_filter.get("where_filters", []))
+
+    if len(templates) == 1:
+        return templates[0]
+    return " and ".join(f"({template})" for template in templates)
+
+
+def _drop_nulls(value):
+    if isinstance(value, dict):
+        return {k: _drop_nulls(v) for k, v in value.items() if v is not None}
+    if isinstance(value, list):
+        return [_drop_nulls(v) for v in value]
+    return value
+
+
+def _parse_mf_file(path: str, loader: str = YamlLoaders.round_trip):
+    with _timed("parse", path):
+        mf_model_dict = convert_yml_to_dict(path, loader) or {}
+    return mf_model_dict.get("semantic_models", []), mf_model_dict.get("metrics", [])
+
+
+def _parse_mf_text(path: str, text: str, loader: str = YamlLoaders.round_trip):
+    """Like _parse_mf_file, for the text already read from the file at path"""
+    with _timed("parse", path):
+        mf_model_dict = _get_yaml_loader(loader).load(text) or {}
+    return mf_model_dict.get("semantic_models", []), mf_model_dict.get("metrics", [])
+
+
+def _parse_mf_files(paths: list, workers: int = None, loader: str = YamlLoaders.round_trip):
+    """Returns the (semantic_models, metrics) defined in each file, in the same order as paths"""
+    parse_file = partial(_parse_mf_file, loader=loader)
+    if not workers or workers <= 1 or len(paths) <= 1:
+        return map(parse_file, paths)
+
+    with _timed("parse"), ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as executor:
+        return list(executor.map(parse_file, paths, chunksize=_chunksize(len(paths), workers)))
+
+
+def _init_worker():
+    # Forked workers inherit the parent's subscribers and tracing, which only report to the worker
+    _timing_subscribers.clear()
+    if tracemalloc.is_tracing():
+        tracemalloc.stop()
+
+
+def _add_semantic_model(semantic_models: dict, measure_owners: dict, semantic_model: dict):
+    """Adds the semantic model to the project and records which semantic model owns each of its
+    measures, so metric placement is a dict lookup instead of a scan over every measure
+    """
+    model_name = semantic_model["name"]
+    semantic_models[model_name] = semantic_model
+    # Empty list of metrics to be filled by _assign_metrics_to_semantic_models
+    semantic_models[model_name]["metrics"] = []
+
+    for measure in semantic_model.get("measures", []):
+        owner = measure_owners.setdefault(measure["name"], model_name)
+        if owner != model_name:
+            raise ValueError(
+                f"Measure {measure['name']} is defined in both the {owner} and {model_name} "
+                "semantic models. Measure names must be unique across the project"
+            )
+
+
+def _assign_metrics_to_semantic_models(semantic_models: dict, metrics: list, measure_owners: dict):
+    """Assign metrics to the view they should logically live in"""
+    with _timed("assign"):
+        _assign_metrics(semantic_models, metrics, measure_owners)
+
+
+def _assign_metrics(semantic_models: dict, metrics: list, measure_owners: dict):
+    owners = MetricGraph(metrics).place(measure_owners)
+    for metric in metrics:
+        if (owner := owners.get(metric["name"])) is not None:
+            semantic_models[owner]["metrics"].append(metric)
+
+
+def _metric_placement_name(mf_metric: dict):
+    """Returns the name of the measure whose semantic model the metric is placed in,
+    or None for metric types that are not placed
+    """
+    type_params = mf_metric["type_params"]
+    metric_type = mf_metric["type"].lower()
+    if metric_type in {MetricflowMetricTypes.simple, MetricflowMetricTypes.cumulative}:
+        metric_measure = type_params["measure"]
+    elif metric_type == MetricflowMetricTypes.ratio:
+        metric_measure = type_params["numerator"]
+    elif metric_type == MetricflowMetricTypes.derived:
+        metric_measure = type_params["metrics"][0]["name"]
+    else:
+        return None
+
+    # Inputs can be given as a plain name or as a dict with a name and a filter
+    if isinstance(metric_measure, dict):
+        metric_measure = metric_measure["name"]
+    return metric_measure
+
+
+def _metric_input_names(mf_metric: dict):
+    """Returns the names of the measures and metrics the metric takes as inputs"""
+    type_params = mf_metric.get("type_params", {})
+    metric_inputs = [type_params.get(key) for key in ["measure", "numerator", "denominator"]]
+    metric_inputs.extend(type_params.get("metrics", []))
+
+    names = []
+    for metric_input in metric_inputs:
+        if isinstance(metric_input, dict):
+            names.append(metric_input.get("name"))
+        elif metric_input is not None:
+            names.append(metric_input)
+    return names
+
+
+class MetricGraph:
+    """The metrics of a project and the metrics each derived metric references, built once per project.
+
+    Metrics are placed in topological order, so a derived metric is placed after the metrics it
+    references, and references are memoized, so a chain of derived metrics is resolved once
+    however many metrics depend on it. A cycle of references raises a ValueError.
+    """
+
+    def __init__(self, metrics):
+        self.metrics = {}
+        for metric in metrics:
+            # Keep the first definition of a metric, like the measure registry
+            self.metrics.setdefault(metric["name"], metric)
+        self._order = None
+        self._references = {}
+
+    def dependencies(self, metric_name: str):
+        """Returns the names of the metrics in the project the metric references"""
+        metric = self.metrics[metric_name]
+        if metric["type"].lower() != MetricflowMetricTypes.derived:
+            return []
+        referenced = (input_metric["name"] for input_metric in metric["type_params"].get("metrics", []))
+        return [name for name in referenced if name in self.metrics]
+
+    def topological_order(self):
+        """Returns the metric names with every metric after the metrics it references"""
+        if self._order is not None:
+            return self._order
+
+        # Iterative depth first search, so long chains of derived metrics can not hit the recursion limit
+        order, visiting, done = [], set(), set()
+        for root in self.metrics:
+            if root in done:
+                continue
+            visiting.add(root)
+            stack = [(root, iter(self.dependencies(root)))]
+            while stack:
+                metric_name, dependencies = stack[-1]
+                for dependency in dependencies:
+                    if dependency in visiting:
+                        cycle = [name for name, _ in stack]
+                        cycle = cycle[cycle.index(dependency) :] + [dependency]
+                        raise ValueError(
+                            f"Derived metrics reference each other in a cycle: {' -> '.join(cycle)}"
+                        )
+                    if dependency not in done:
+                        visiting.add(dependency)
+                        stack.append((dependency, iter(self.dependencies(dependency))))
+                        break
+                else:
+                    stack.pop()
+                    visiting.discard(metric_name)
+                    done.add(metric_name)
+                    order.append(metric_name)
+        self._order = order
+        return order
+
+    def place(self, measure_owners: dict):
+        """Returns the name of the semantic model each metric is placed in, by metric name.
+        A metric is placed with the measure it is built on. A derived metric whose first input
+        is another metric is placed with that metric, otherwise its first input is taken as a measure
+        """
+        owners = {}
+        for metric_name in self.topological_order():
+            metric = self.metrics[metric_name]
+            first_input = _metric_placement_name(metric)
+            if metric["type"].lower() == MetricflowMetricTypes.derived and first_input in self.metrics:
+                owner = owners.get(first_input)
+            else:
+                owner = measure_owners.get(first_input)
+            if owner is not None:
+                owners[metric_name] = owner
+        return owners
+
+    def measure_name(self, metric_name: str):
+        """The measure a simple metric without a filter is built on, or metric_name for other names"""
+        metric = self.metrics.get(metric_name)
+        if metric is None or metric["type"].lower() != MetricflowMetricTypes.simple or metric.get("filter"):
+            return metric_name
+        measure = metric["type_params"]["measure"]
+        return measure["name"] if isinstance(measure, dict) else measure
+
+    def reference(self, metric_name: str):
+        """The Zenlytic reference a derived metric uses for a metric it references. Simple metrics
+        without a filter and names that are not metrics in the project reference the measure,
+        other metrics reference the converted metric
+        """
+        if metric_name not in self._references:
+            metric = self.metrics.get(metric_name)
+            if metric is None or (
+                metric["type"].lower() == MetricflowMetricTypes.simple and not metric.get("filter")
+            ):
+                reference = "${_" + self.measure_name(metric_name) + "}"
+            else:
+                reference = "${" + metric_name + "}"
+            self._references[metric_name] = reference
+        return self._references[metric_name]
+
+
 def convert_mf_view_to_zenlytic_view(
-    mf_semantic_model: dict, model_name: str, all_measures: list, original_file_path: str = None
+    mf_semantic_model: dict,
+    model_name: str,
+    all_measures: Union[list, dict],
+    original_file_path: str = None,
+    metric_graph=None,
 ):
-    zenlytic_data = {"version": 1, "type": "view", "model_name": model_name, "fields": [], "identifiers": []}
+    """metric_graph is the MetricGraph of the project, used to resolve the metrics derived metrics reference.
+    Without it every reference is treated as a measure
+    """
+    with _timed("convert", mf_semantic_model["name"]):
+        return _convert_mf_view(mf_semantic_model, model_name, all_measures, original_file_path, metric_graph)
+
+
+def _convert_mf_view(
+    mf_semantic_model: dict, model_name: str, all_measures, original_file_path: str = None, metric_graph=None
+):
+    all_measures = _as_measure_registry(all_measures)
+    zenlytic_data = View(version=1, type="view", model_name=model_name, fields=[], identifiers=[])
 
     mf_metrics = mf_semantic_model.get("metrics", [])
 
@@ -98,7 +640,9 @@ def convert_mf_view_to_zenlytic_view(
 
     for metric in mf_metrics:
         try:
-            metric_dict, added_measures = convert_mf_metric_to_zenlytic_measure(metric, all_measures)
+            metric_dict, added_measures = convert_mf_metric_to_zenlytic_measure(
+                metric, all_measures, metric_graph
+            )
             zenlytic_data["fields"].append(metric_dict)
             zenlytic_data["fields"].extend(added_measures)
         except ZenlyticUnsupportedError:
@@ -114,19 +658,18 @@ def convert_mf_view_to_zenlytic_view(
 
 
 def convert_mf_dimension_to_zenlytic_dimension(mf_dimension: dict):
-    field_dict = {
-        "name": mf_dimension["name"],
-        "sql": mf_dimension["expr"] if "expr" in mf_dimension else mf_dimension["name"],
-    }
+    name = mf_dimension["name"]
+    sql = mf_dimension["expr"] if "expr" in mf_dimension else mf_dimension["name"]
 
     if mf_dimension["type"] == "time":
-        field_dict["field_type"] = "dimension_group"
-        field_dict["type"] = "time"
+        field_dict = DimensionGroup(name=name, sql=sql, field_type="dimension_group", type="time")
         field_dict["timeframes"] = ["raw", "date", "week", "month", "quarter", "year", "month_of_year"]
 
     elif mf_dimension["type"] == "categorical":
-        field_dict["field_type"] = "dimension"
-        field_dict["type"] = "string"
+        field_dict = Dimension(name=name, sql=sql, field_type="dimension", type="string")
+
+    else:
+        raise ZenlyticUnsupportedError(f"Dimension type {mf_dimension['type']} not supported")
 
     if description := mf_dimension.get("description"):
         field_dict["description"] = description
@@ -135,18 +678,18 @@ def convert_mf_dimension_to_zenlytic_dimension(mf_dimension: dict):
         field_dict["label"] = label
 
     if mf_dimension.get("meta") and isinstance(mf_dimension["meta"], dict):
-        field_dict = {**field_dict, **mf_dimension["meta"].get("zenlytic", {})}
+        field_dict.update(mf_dimension["meta"].get("zenlytic", {}))
 
     return field_dict
 
 
 def convert_mf_measure_to_zenlytic_measure(mf_measure: dict):
-    field_dict = {
-        "name": mf_measure["name"],
-        "sql": str(mf_measure["expr"]) if "expr" in mf_measure else mf_measure["name"],
-        "type": mf_measure["agg"],
-        "field_type": "measure",
-    }
+    field_dict = Measure(
+        name=mf_measure["name"],
+        sql=str(mf_measure["expr"]) if "expr" in mf_measure else mf_measure["name"],
+        type=mf_measure["agg"],
+        field_type="measure",
+    )
 
     if not mf_measure.get("create_metric", False):
         field_dict["hidden"] = True
@@ -169,7 +712,7 @@ def convert_mf_measure_to_zenlytic_measure(mf_measure: dict):
         field_dict["label"] = label
 
     if mf_measure.get("config", {}).get("meta") and isinstance(mf_measure["config"]["meta"], dict):
-        field_dict = {**field_dict, **mf_measure["config"]["meta"].get("zenlytic", {})}
+        field_dict.update(mf_measure["config"]["meta"].get("zenlytic", {}))
 
     return field_dict
 
@@ -184,22 +727,29 @@ def convert_mf_entity_to_zenlytic_identifier(mf_entity: dict):
     else:
         sql = "${" + mf_entity["name"] + "}"
 
-    return {
-        "name": mf_entity["name"],
-        "type": mf_entity["type"] if mf_entity["type"] != "unique" else "primary",
-        "sql": sql,
-    }
+    return Identifier(
+        name=mf_entity["name"],
+        type=mf_entity["type"] if mf_entity["type"] != "unique" else "primary",
+        sql=sql,
+    )
 
 
-def convert_mf_metric_to_zenlytic_measure(mf_metric: dict, measures: list) -> list:
+def convert_mf_metric_to_zenlytic_measure(
+    mf_metric: dict, measures: Union[list, dict], metric_graph: "MetricGraph" = None
+) -> list:
     """This returns a list because metrics with filters applied can
     result in an additional measure(s) being created
+
+    measures is either a list of MetricFlow measures or a measure registry
+    (a dict of measure name to measure, see _as_measure_registry).
+    metric_graph resolves the metrics a derived metric references, see MetricGraph.reference
     """
-    metric_dict = {
-        "name": mf_metric["name"],
-        "label": mf_metric.get("label", mf_metric["name"].replace("_", " ").title()),
-        "field_type": "measure",
-    }
+    measures = _as_measure_registry(measures)
+    metric_dict = Measure(
+        name=mf_metric["name"],
+        label=mf_metric.get("label", mf_metric["name"].replace("_", " ").title()),
+        field_type="measure",
+    )
 
     additional_measures = []
     if mf_metric["type"].lower() == "cumulative":
@@ -249,22 +799,24 @@ def convert_mf_metric_to_zenlytic_measure(mf_metric: dict, measures: list) -> li
 
     elif mf_metric["type"].lower() == "derived":
         metric_dict["type"] = "number"
-        expr = mf_metric["type_params"]["expr"]
         referenced_metrics = mf_metric["type_params"]["metrics"]
+        # Identifier in the expression -> the reference it is rewritten to
+        references = {}
         for metric in referenced_metrics:
             if "alias" in metric and "filter" not in metric:
-                expr = expr.replace(metric["alias"], "${_" + metric["name"] + "}")
+                references.setdefault(metric["alias"], _metric_reference(metric["name"], metric_graph))
             elif "alias" in metric and "filter" in metric:
-                associated_measure = _get_measure(metric["name"], measures)
+                measure_name = metric_graph.measure_name(metric["name"]) if metric_graph else metric["name"]
+                associated_measure = _get_measure(measure_name, measures)
                 measure_dict, added_measures = apply_filter_to_metric(
                     associated_measure, metric, new_measure_name=mf_metric["name"] + f"_{metric['alias']}"
                 )
                 additional_measures.extend(added_measures)
-                expr = expr.replace(metric["alias"], "${" + measure_dict["name"] + "}")
+                references.setdefault(metric["alias"], "${" + measure_dict["name"] + "}")
             else:
                 # If there is no alias and no filters we just need to add reference syntax
-                expr = expr.replace(metric["name"], "${_" + metric["name"] + "}")
-        metric_dict["sql"] = expr
+                references.setdefault(metric["name"], _metric_reference(metric["name"], metric_graph))
+        metric_dict["sql"] = _rewrite_expression_identifiers(mf_metric["type_params"]["expr"], references)
 
     else:
         raise ZenlyticUnsupportedError(f"Metric type {mf_metric['type']} not supported")
@@ -276,24 +828,57 @@ def convert_mf_metric_to_zenlytic_measure(mf_metric: dict, measures: list) -> li
         metric_dict["canon_date"] = mf_metric["agg_time_dimension"]
 
     if mf_metric.get("config", {}).get("meta") and isinstance(mf_metric["config"]["meta"], dict):
-        metric_dict = {**metric_dict, **mf_metric["config"]["meta"].get("zenlytic", {})}
+        metric_dict.update(mf_metric["config"]["meta"].get("zenlytic", {}))
 
     return metric_dict, additional_measures
 
 
-def _get_measure(measure_name: str, measures: list):
+# String literals and numbers are matched whole so identifiers are never rewritten inside them
+_EXPRESSION_TOKEN_PATTERN = re.compile(r"""'(?:[^']|'')*'|"(?:[^"]|"")*"|\d[\w.]*|[A-Za-z_]\w*""")
+
+
+def _metric_reference(metric_name: str, metric_graph: "MetricGraph" = None):
+    if metric_graph is None:
+        return "${_" + metric_name + "}"
+    return metric_graph.reference(metric_name)
+
+
+def _rewrite_expression_identifiers(expr: str, references: dict):
+    """Replaces each whole identifier in expr that is a key of references, in a single pass"""
+    return _EXPRESSION_TOKEN_PATTERN.sub(lambda match: references.get(match.group(0), match.group(0)), expr)
+
+
+def _get_measure(measure_name: str, measures: dict):
     try:
-        return next((m for m in measures if m["name"] == measure_name))
-    except StopIteration:
+        return measures[measure_name]
+    except KeyError:
         raise ValueError(f"Could not find associated measure {measure_name}")
 
 
+def _as_measure_registry(measures: Union[list, dict]):
+    """The measure registry is a dict of measure name to MetricFlow measure. Passing a list
+    of measures builds the registry from it, passing a registry returns it unchanged
+    """
+    if isinstance(measures, dict):
+        return measures
+    registry = {}
+    _add_to_measure_registry(registry, measures)
+    return registry
+
+
+def _add_to_measure_registry(registry: dict, measures: list):
+    for measure in measures:
+        # Keep the first definition of a measure, to match lookups by list order
+        registry.setdefault(measure["name"], measure)
+
+
 def apply_filter_to_metric(
     mf_measure: dict, mf_metric: dict, extra_metric_params: dict = {}, new_measure_name: str = None
 ):
-    measure_dict = convert_mf_measure_to_zenlytic_measure(mf_measure)
-    hidden = not mf_metric.get("config", {}).get("enabled", True)
-    metric_dict = {**measure_dict, **extra_metric_params, "hidden": hidden}
+    # The measure is converted fresh, so the metric is built on it in place
+    metric_dict = convert_mf_measure_to_zenlytic_measure(mf_measure)
+    metric_dict.update(extra_metric_params)
+    metric_dict["hidden"] = not mf_metric.get("config", {}).get("enabled", True)
 
     # If there's a filter, re-write the sql to include the filter
     additional_measures = []
@@ -310,42 +895,73 @@ def apply_filter_to_sql(sql, filter):
     return f"case when {filter_sql} then {sql} else null end"
 
 
+# One pattern for everything the filter translation rewrites, so a filter is translated in a single pass.
+# Each Dimension or TimeDimension is replaced where it occurs, and the Jinja braces are dropped
+_FILTER_TOKEN_PATTERN = re.compile(
+    r"""(?P<time_dimension>\bTimeDimension\(\s*(?P<q1>['"])(?P<time_dimension_name>[^'"]+)(?P=q1)\s*,"""
+    r"""\s*(?P<q2>['"])(?P<time_grain>[^'"]+)(?P=q2)\s*\))"""
+    r"""|(?P<dimension>\bDimension\(\s*(?P<q3>['"])(?P<dimension_name>[^'"]+)(?P=q3)\s*\))"""
+    r"""|{{|}}"""
+)
+
+
+@lru_cache(maxsize=4096)
 def _extract_filter_sql(filter_string):
     """A filter will look like
     "{{ Dimension('order__is_food_order') }} = True
     We want to turn it into a valid filter statement like ${order.is_food_order} = True
     We do NOT currently support Metric or Entity type filters
+
+    The same filters repeat across many metrics, so translations are memoized
     """
     if "Entity(" in filter_string:
         raise ZenlyticUnsupportedError("Entity type filters are not supported")
     if "Metric(" in filter_string:
         raise ZenlyticUnsupportedError("Metric type filters are not supported")
-    matches = re.findall(r"{{\s*Dimension\('(.+?)'\)\s*}}\s*([=><!]+)\s*(.+?)\s*(and|or|$)", filter_string)
-    for match in matches:
-        column_name = match[0].replace("__", ".")
-        replacement = "${" + column_name + "}"
-        filter_string = filter_string.replace(f"Dimension('{match[0]}')", replacement)
-    # First get the dimension name and grain
-    time_dim_matches = re.findall(
-        r"""TimeDimension\(\s*['"]([^'"]+)['"]\s*,\s*['"]([^'"]+)['"]\s*\)""", filter_string
-    )
-    for match in time_dim_matches:
-        column_name = match[0].replace("__", ".")
-        time_grain = match[1].replace("day", "date")
+    return _FILTER_TOKEN_PATTERN.sub(_translate_filter_token, filter_string)
 
-        replacement = "${" + f"{column_name}_{time_grain}" + "}"
-        filter_string = filter_string.replace(f"TimeDimension('{match[0]}', '{match[1]}')", replacement)
-    return filter_string.replace("{{", "").replace("}}", "")
 
+def _translate_filter_token(match: re.Match):
+    if match.group("time_dimension"):
+        column_name = match.group("time_dimension_name").replace("__", ".")
+        time_grain = match.group("time_grain")
+        # Zenlytic calls the day timeframe "date"
+        if time_grain == "day":
+            time_grain = "date"
+        return "${" + f"{column_name}_{time_grain}" + "}"
+    if match.group("dimension"):
+        return "${" + match.group("dimension_name").replace("__", ".") + "}"
+    # The Jinja braces around the Dimension or TimeDimension
+    return ""
 
-def convert_yml_to_dict(path):
-    yaml = ruamel.yaml.YAML(typ="rt")
-    yaml.version = (1, 1)
+
+def convert_yml_to_dict(path, loader: str = YamlLoaders.round_trip):
+    yaml = _get_yaml_loader(loader)
     with open(path, "r") as f:
         yaml_dict = yaml.load(f)
     return yaml_dict
 
 
+def _get_yaml_loader(loader: str):
+    """Returns the YAML instance for the loader, creating it on first use.
+    Instances are not thread safe, so each thread keeps its own
+    """
+    loaders = _yaml_loaders.__dict__
+    if loader not in loaders:
+        if loader == YamlLoaders.round_trip:
+            yaml = ruamel.yaml.YAML(typ="rt")
+        elif loader == YamlLoaders.safe:
+            yaml = ruamel.yaml.YAML(typ="safe", pure=True)
+        elif loader == YamlLoaders.c_safe:
+            # ruamel falls back to the pure python parser when libyaml is not available
+            yaml = ruamel.yaml.YAML(typ="safe", pure=False)
+        else:
+            raise ValueError(f"Unknown YAML loader {loader}, choose one of {YamlLoaders.all()}")
+        yaml.version = (1, 1)
+        loaders[loader] = yaml
+    return loaders[loader]
+
+
 def extract_inner_text(s):
     match = re.search(r"ref\('(.*)'\)", s)
     if match:
@@ -353,52 +969,287 @@ def extract_inner_text(s):
     return None
 
 
-def zenlytic_views_to_yaml(zenlytic_models, zenlytic_views, directory: str = None, write_to_file=True):
-    view_directory = os.path.join(directory, "views") if directory else "./views"
-    model_directory = os.path.join(directory, "models") if directory else "./models"
+def zenlytic_views_to_yaml(
+    zenlytic_models,
+    zenlytic_views,
+    directory: str = None,
+    write_to_file=True,
+    return_yaml=True,
+    workers: int = None,
+    dumper: str = YamlDumpers.fast,
+    skip_unchanged: bool = False,
+    remove_orphans: bool = False,
+    summary: dict = None,
+):
+    """Dumps each model and view to YAML once, writes it to directory when write_to_file is set
+    and returns the list of YAML strings. Pass return_yaml=False when you only need
+    the files on disk, the strings are then not kept and None is returned.
+
+    The models and views can be any iterables, like iter_mf_project_to_zenlytic_views.
+    Each file is written as soon as it is taken from the iterable.
 
-    if not os.path.exists(view_directory) and write_to_file:
-        os.makedirs(view_directory)
+    When workers is more than 1 the files are dumped in a pool of that many processes and
+    written from a pool of threads. The models and views are then all taken from the iterables
+    first, and the YAML strings are returned in the same order
 
-    if not os.path.exists(model_directory) and write_to_file:
-        os.makedirs(model_directory)
+    dumper is one of YamlDumpers, pass YamlDumpers.round_trip to dump the files with ruamel
+
+    With skip_unchanged, files that already hold the same YAML are left untouched and the
+    others are replaced atomically, see write_zenlytic_file. With remove_orphans, view files
+    named like converted views (*_view.yml) that were not written in this call are deleted.
+    Pass a dict as summary to have the "written", "skipped" and "removed" paths added to it
+    """
+    summary = _new_write_summary() if summary is None else summary
+    if write_to_file:
+        _make_zenlytic_directories(directory)
+
+    if workers and workers > 1:
+        zenlytic_files = list(chain(zenlytic_models, zenlytic_views))
+        paths = [
+            zenlytic_file_path(zenlytic_file, directory) if write_to_file else None
+            for zenlytic_file in zenlytic_files
+        ]
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as executor:
+            chunksize = _chunksize(len(zenlytic_files), workers)
+            yaml_strings = executor.map(
+                partial(dump_yaml_to_file, dumper=dumper), zenlytic_files, chunksize=chunksize
+            )
+            zenlytic_yaml = _write_yaml_files(
+                zip(paths, yaml_strings), workers, return_yaml, skip_unchanged, summary
+            )
+    else:
+        zenlytic_yaml = _dump_zenlytic_files(
+            chain(zenlytic_models, zenlytic_views),
+            directory,
+            write_to_file,
+            return_yaml,
+            dumper,
+            skip_unchanged,
+            summary,
+        )
+
+    if write_to_file and remove_orphans:
+        _remove_orphaned_views(directory, summary)
+    return zenlytic_yaml
+
+
+def _dump_zenlytic_files(
+    zenlytic_files,
+    directory: str,
+    write_to_file: bool,
+    return_yaml: bool,
+    dumper: str,
+    skip_unchanged: bool,
+    summary: dict,
+):
+    zenlytic_yaml = [] if return_yaml else None
+    for zenlytic_file in zenlytic_files:
+        if not write_to_file and not return_yaml:
+            break
 
-    zenlytic_yaml = []
-    for zenlytic_file in zenlytic_models + zenlytic_views:
+        yaml_string = dump_yaml_to_file(zenlytic_file, dumper=dumper)
         # write the yaml to views/model_name.yml
         if write_to_file:
-            if "original_file_path" in zenlytic_file:
-                file_path = zenlytic_file["original_file_path"]
-            else:
-                file_path = f"{zenlytic_file['name']}_{zenlytic_file['type']}.yml"
-
-            if zenlytic_file["type"] == "model":
-                write_to_path = os.path.join(model_directory, file_path)
-            else:
-                write_to_path = os.path.join(view_directory, file_path)
-            # write the yaml to views/model_name.yml
-            dump_yaml_to_file(zenlytic_file, write_to_path)
+            path = zenlytic_file_path(zenlytic_file, directory)
+            _add_to_write_summary(summary, path, write_zenlytic_file(path, yaml_string, skip_unchanged))
 
         # add the yaml string to views_yaml
-        zenlytic_yaml.append(dump_yaml_to_file(zenlytic_file))
+        if return_yaml:
+            zenlytic_yaml.append(yaml_string)
 
     return zenlytic_yaml
 
 
-def dump_yaml_to_file(data, path: str = None):
+def _write_yaml_files(
+    yaml_files,
+    workers: int,
+    return_yaml: bool = True,
+    skip_unchanged: bool = False,
+    summary: dict = None,
+):
+    """Writes each (path, YAML string) in yaml_files from a pool of threads as they are taken
+    from the iterable, skipping those without a path. Write errors are raised in the order of
+    the files, once all of them are written
+    """
+    zenlytic_yaml = [] if return_yaml else None
+    writes = []
+    with ThreadPoolExecutor(max_workers=workers) as writer:
+        for path, yaml_string in yaml_files:
+            if path is not None:
+                writes.append((path, writer.submit(write_zenlytic_file, path, yaml_string, skip_unchanged)))
+            if return_yaml:
+                zenlytic_yaml.append(yaml_string)
+
+    for path, write in writes:
+        written = write.result()
+        if summary is not None:
+            _add_to_write_summary(summary, path, written)
+    return zenlytic_yaml
+
+
+def write_zenlytic_file(path: str, text: str, skip_unchanged: bool = False):
+    """Writes text to path and returns whether the file was written.
+
+    With skip_unchanged the file is left untouched when it already holds text, which is checked
+    by comparing sizes and then hashes, and otherwise replaced atomically by writing a temporary
+    file next to it and renaming it over path, so readers never see a partly written file
+    """
+    if not skip_unchanged:
+        _write_text(path, text)
+        return True
+
+    content = text.encode()
+    with _timed("write", path):
+        if _file_holds(path, content):
+            return False
+        _replace_file(path, content)
+    return True
+
+
+def _file_holds(path: str, content: bytes):
+    try:
+        if os.stat(path).st_size != len(content):
+            return False
+        with open(path, "rb") as f:
+            return hashlib.sha256(f.read()).digest() == hashlib.sha256(content).digest()
+    except FileNotFoundError:
+        return False
+
+
+def _replace_file(path: str, content: bytes):
+    temp_path = os.path.join(
+        os.path.dirname(path), f".{os.path.basename(path)}.{os.getpid()}.{threading.get_ident()}.tmp"
+    )
+    # Created like open(path, "w") would create it, so the umask applies
+    fd = os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o666)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(content)
+        if os.path.exists(path):
+            shutil.copymode(path, temp_path)
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+
+def _remove_orphaned_views(directory: str, summary: dict):
+    """Deletes the view files named like converted views that are not in summary, and adds them to it"""
+    views_directory = os.path.join(directory or ".", "views")
+    kept = {os.path.abspath(path) for path in chain(summary["written"], summary["skipped"])}
+    for file_name in sorted(os.listdir(views_directory)):
+        path = os.path.join(views_directory, file_name)
+        if file_name.endswith("_view.yml") and os.path.abspath(path) not in kept and os.path.isfile(path):
+            os.remove(path)
+            summary["removed"].append(path)
+
+
+def _new_write_summary():
+    return {"written": [], "skipped": [], "removed": []}
+
+
+def _add_to_write_summary(summary: dict, path: str, written: bool):
+    summary["written" if written else "skipped"].append(path)
+
+
+def zenlytic_file_path(zenlytic_file: dict, directory: str = None):
+    """Returns where the model or view is written to in the Zenlytic project in directory"""
+    if "original_file_path" in zenlytic_file:
+        file_path = zenlytic_file["original_file_path"]
+    else:
+        file_path = f"{zenlytic_file['name']}_{zenlytic_file['type']}.yml"
+
+    sub_directory = "models" if zenlytic_file["type"] == "model" else "views"
+    return os.path.join(directory or ".", sub_directory, file_path)
+
+
+def _make_zenlytic_directories(directory: str = None):
+    for sub_directory in ["models", "views"]:
+        os.makedirs(os.path.join(directory or ".", sub_directory), exist_ok=True)
+
+
+def dump_yaml_to_file(data, path: str = None, dumper: str = YamlDumpers.fast):
+    if isinstance(data, ZenlyticField):
+        data = data.to_dict()
     filtered_data = {k: v for k, v in data.items() if not k.startswith("_")}
+    with _timed("dump", data.get("name")):
+        yaml_string = _dump_yaml(filtered_data, dumper)
     if path is None:
-        return ruamel.yaml.dump(filtered_data, Dumper=ruamel.yaml.RoundTripDumper)
-    else:
-        with open(path, "w") as f:
-            ruamel.yaml.dump(filtered_data, f, Dumper=ruamel.yaml.RoundTripDumper)
+        return yaml_string
+    _write_text(path, yaml_string)
+
+
+def _dump_yaml(data: dict, dumper: str):
+    if dumper == YamlDumpers.fast:
+        try:
+            return emit_yaml(data)
+        except TypeError:
+            pass
+    elif dumper != YamlDumpers.round_trip:
+        raise ValueError(f"Unknown YAML dumper {dumper}, choose one of {YamlDumpers.all()}")
+    return ruamel.yaml.dump(data, Dumper=ruamel.yaml.RoundTripDumper)
+
+
+def _write_text(path: str, text: str):
+    with _timed("write", path), open(path, "w") as f:
+        f.write(text)
 
 
-def read_mf_project_files(models_folder: str):
-    """Returns a list of all the yml files in the Metricflow project.
+def read_mf_project_files(
+    models_folder: str, include: list = None, exclude: list = None, semantic_only: bool = False
+):
+    """Returns a sorted list of all the yml files in the Metricflow project.
+    dbt's build, log and package directories at the top of the project (DBT_DIRECTORIES),
+    EXCLUDED_DIRECTORIES and hidden files and directories are skipped. A skipped directory
+    is still read when an include pattern starts with its path, like target/*.yml
     Args:
         models_folder (str): The path to the models folder (usually project_name/models)
+        include (list): Glob patterns a file must match, by name or by path relative to
+            models_folder. Defaults to *.yml and *.yaml
+        exclude (list): Glob patterns for files and directories to skip, by name or by path
+            relative to models_folder
+        semantic_only (bool): Skip files with no top level semantic_models or metrics key,
+            without parsing them
     """
-    yml_files = glob(f"{models_folder}**/*.yml", recursive=True)
-    yaml_files = glob(f"{models_folder}**/*.yaml", recursive=True)
-    return yml_files + yaml_files
+    with _timed("discover", models_folder):
+        return _read_mf_project_files(models_folder, include, exclude, semantic_only)
+
+
+def _read_mf_project_files(models_folder: str, include: list, exclude: list, semantic_only: bool):
+    include = include or DEFAULT_INCLUDE_PATTERNS
+    exclude = exclude or []
+    mf_files = []
+
+    def walk(directory: str):
+        with os.scandir(directory) as entries:
+            entries = sorted(entries, key=lambda entry: entry.name)
+
+        for entry in entries:
+            relative_path = os.path.relpath(entry.path, models_folder).replace(os.sep, "/")
+            if entry.name.startswith(".") or _matches_any(entry.name, relative_path, exclude):
+                continue
+            if entry.is_dir(follow_symlinks=False):
+                if not _is_excluded_directory(entry.name, relative_path) or any(
+                    pattern.startswith(relative_path + "/") for pattern in include
+                ):
+                    walk(entry.path)
+            elif _matches_any(entry.name, relative_path, include):
+                if not semantic_only or _has_semantic_keys(entry.path):
+                    mf_files.append(entry.path)
+
+    walk(models_folder)
+    return mf_files
+
+
+def _is_excluded_directory(name: str, relative_path: str):
+    return name in EXCLUDED_DIRECTORIES or ("/" not in relative_path and name in DBT_DIRECTORIES)
+
+
+def _matches_any(name: str, relative_path: str, patterns: list):
+    return any(fnmatch(name, pattern) or fnmatch(relative_path, pattern) for pattern in patterns)
+
+
+def _has_semantic_keys(path: str):
+    with open(path, "r") as f:
+        return _SEMANTIC_KEYS_PATTERN.search(f.read()) is not None
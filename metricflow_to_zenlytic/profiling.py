@@ -0,0 +1,123 @@
+import json
+import threading
+import tracemalloc
+
+from .metricflow_to_zenlytic import TIMED_PHASES, subscribe_to_timings, unsubscribe_from_timings
+
+
+class ConversionProfiler:
+    """Records the time, call count and peak memory of each phase of the conversions run
+    while it is active, and of each file parsed and each view converted.
+
+        with ConversionProfiler() as profiler:
+            ...
+        print(profiler.report())
+
+    With trace_memory (the default) memory is traced with tracemalloc, which slows the
+    conversion down. The peak of an item is the most memory allocated at once while it ran,
+    on top of what was already allocated when it started. tracemalloc keeps one peak, so it is
+    folded into the peak of every running item before it is reset for an item that starts.
+    Resetting the peak needs Python 3.9, so on older versions memory is not traced.
+    """
+
+    def __init__(self, trace_memory: bool = True):
+        self.trace_memory = trace_memory and hasattr(tracemalloc, "reset_peak")
+        self.events = []
+        # key of each running item -> [memory allocated when it started, highest peak seen so far]
+        self._running = {}
+        self._lock = threading.Lock()
+        self._started_tracing = False
+
+    def __enter__(self):
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+        subscribe_to_timings(self._on_event)
+        return self
+
+    def __exit__(self, *exc_info):
+        unsubscribe_from_timings(self._on_event)
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+
+    def _on_event(self, event: dict):
+        key = (event["phase"], event["item"], event["start"])
+        if not self.trace_memory:
+            if event["event"] == "end":
+                self.events.append(event)
+            return
+
+        # Events come from the threads files are written from too
+        with self._lock:
+            current, peak = tracemalloc.get_traced_memory()
+            for running in self._running.values():
+                running[1] = max(running[1], peak)
+            if event["event"] == "start":
+                tracemalloc.reset_peak()
+                self._running[key] = [current, current]
+            else:
+                memory_at_start, peak = self._running.pop(key, [0, peak])
+                self.events.append({**event, "peak_memory_bytes": max(peak - memory_at_start, 0)})
+
+    def phase_summary(self):
+        """Returns a dict of phase to its total "seconds", "calls" and "peak_memory_bytes",
+        in the order the phases run in
+        """
+        summary = {}
+        for event in self.events:
+            phase = summary.setdefault(event["phase"], {"seconds": 0.0, "calls": 0, "peak_memory_bytes": 0})
+            phase["seconds"] += event["seconds"]
+            phase["calls"] += 1
+            phase["peak_memory_bytes"] = max(phase["peak_memory_bytes"], event.get("peak_memory_bytes", 0))
+        return {phase: summary[phase] for phase in TIMED_PHASES if phase in summary}
+
+    def slowest(self, phase: str, n: int = 5):
+        """Returns the end events of the n slowest items of the phase, slowest first"""
+        items = [event for event in self.events if event["phase"] == phase and event["item"] is not None]
+        return sorted(items, key=lambda event: event["seconds"], reverse=True)[:n]
+
+    def report(self, n: int = 5):
+        lines = [f"{'phase':>10} {'seconds':>10} {'calls':>8} {'peak MB':>10}"]
+        for phase, summary in self.phase_summary().items():
+            lines.append(
+                f"{phase:>10} {summary['seconds']:>10.3f} {summary['calls']:>8} "
+                f"{summary['peak_memory_bytes'] / 2**20:>10.1f}"
+            )
+
+        for phase, title in [("parse", "Slowest files to parse"), ("convert", "Slowest views to convert")]:
+            slowest = self.slowest(phase, n)
+            if slowest:
+                lines.append(f"\n{title}:")
+                for event in slowest:
+                    memory = event.get("peak_memory_bytes", 0) / 2**20
+                    lines.append(f"{event['seconds']:>10.3f}s {memory:>8.1f} MB  {event['item']}")
+        return "\n".join(lines)
+
+    def trace(self):
+        """Returns the events in the Chrome trace event format, which chrome://tracing
+        and Perfetto can open once saved as JSON
+        """
+        start = min((event["start"] for event in self.events), default=0)
+        trace_events = []
+        for event in self.events:
+            args = {"item": event["item"]}
+            if "peak_memory_bytes" in event:
+                args["peak_memory_bytes"] = event["peak_memory_bytes"]
+            trace_events.append(
+                {
+                    "name": event["phase"] if event["item"] is None else f"{event['phase']} {event['item']}",
+                    "cat": event["phase"],
+                    "ph": "X",
+                    "ts": (event["start"] - start) * 1e6,
+                    "dur": event["seconds"] * 1e6,
+                    "pid": 0,
+                    "tid": 0,
+                    "args": args,
+                }
+            )
+        return {"traceEvents": trace_events, "displayTimeUnit": "ms"}
+
+    def write_trace(self, path: str):
+        with open(path, "w") as f:
+            json.dump(self.trace(), f)
@@ -0,0 +1,198 @@
+import json
+import os
+import socket
+import threading
+import time
+import urllib.error
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from .incremental import IncrementalProject
+from .metricflow_to_zenlytic import (
+    YamlLoaders,
+    _project_measure_registry,
+    _project_metric_graph,
+    convert_mf_view_to_zenlytic_view,
+    dump_yaml_to_file,
+)
+
+DEFAULT_SERVER_PORT = 8765
+DEFAULT_SERVER_URL = f"http://127.0.0.1:{DEFAULT_SERVER_PORT}"
+# Environment variable the convert command reads the server URL from
+SERVER_URL_ENVIRONMENT_VARIABLE = "METRICFLOW_TO_ZENLYTIC_SERVER_URL"
+# Seconds to wait for the server before converting in process instead
+DEFAULT_SERVER_TIMEOUT = 60
+
+
+class ConversionServer(ThreadingHTTPServer):
+    """A local HTTP server that keeps the MetricFlow projects it converts in memory, so repeated
+    conversions only parse the files that changed since the last request (see IncrementalProject).
+
+        POST /convert       writes the Zenlytic project and returns the written, skipped and removed paths
+        POST /convert-view  returns the YAML of one semantic model's view
+        GET  /health        returns the status and the number of projects in memory
+
+    Requests are JSON objects with the "metricflow_folder" and optionally the "model_name",
+    "connection_name", "loader", "include", "exclude" and "semantic_only" to convert with.
+    /convert also takes the "out_directory", "remove_orphans" and "skip_unchanged", and
+    /convert-view the "semantic_model" to convert. Paths are used as given, so send absolute paths.
+
+    The server only listens on 127.0.0.1. Anyone who can connect to it can read and write files
+    as the user running it, so do not expose the port. To keep web pages open in a browser from
+    sending it requests, POST requests must have a Content-Type of application/json and no Origin
+    header, and the Host must be 127.0.0.1 or localhost.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, port: int = DEFAULT_SERVER_PORT):
+        super().__init__(("127.0.0.1", port), _RequestHandler)
+        # project key -> (IncrementalProject, lock held while it converts)
+        self._projects = {}
+        self._projects_lock = threading.Lock()
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def project_count(self):
+        return len(self._projects)
+
+    def convert_project(self, request: dict):
+        project, lock = self._get_project(request)
+        with lock:
+            return project.convert(
+                request.get("model_name", "my_model"),
+                request.get("connection_name", "my_company"),
+                request.get("out_directory"),
+                remove_orphans=request.get("remove_orphans", False),
+                skip_unchanged=request.get("skip_unchanged", False),
+            )
+
+    def convert_view(self, request: dict):
+        if "semantic_model" not in request:
+            raise ValueError("The request is missing the semantic_model to convert")
+
+        project, lock = self._get_project(request)
+        with lock:
+            semantic_models = project.load()
+            name = request["semantic_model"]
+            if name not in semantic_models:
+                raise ValueError(f"Could not find semantic model {name} in {project.models_folder}")
+            view = convert_mf_view_to_zenlytic_view(
+                semantic_models[name],
+                request.get("model_name", "my_model"),
+                _project_measure_registry(semantic_models),
+                metric_graph=_project_metric_graph(semantic_models),
+            )
+        return {"yaml": dump_yaml_to_file(view)}
+
+    def _get_project(self, request: dict):
+        if "metricflow_folder" not in request:
+            raise ValueError("The request is missing the metricflow_folder to convert")
+
+        options = {
+            "loader": request.get("loader", YamlLoaders.round_trip),
+            "include": request.get("include") or None,
+            "exclude": request.get("exclude") or None,
+            "semantic_only": request.get("semantic_only", False),
+        }
+        models_folder = os.path.abspath(request["metricflow_folder"])
+        if not os.path.isdir(models_folder):
+            raise ValueError(f"The MetricFlow folder {models_folder} does not exist")
+
+        key = json.dumps([models_folder, options], sort_keys=True)
+        with self._projects_lock:
+            if key not in self._projects:
+                self._projects[key] = (IncrementalProject(models_folder, **options), threading.Lock())
+            return self._projects[key]
+
+
+class _RequestHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path == "/health":
+            self._respond(200, {"status": "ok", "projects": self.server.project_count()})
+        else:
+            self._respond(404, {"error": f"Unknown path {self.path}"})
+
+    def do_POST(self):
+        routes = {"/convert": self.server.convert_project, "/convert-view": self.server.convert_view}
+        if self.path not in routes:
+            self._respond(404, {"error": f"Unknown path {self.path}"})
+            return
+
+        rejection = self._rejection()
+        if rejection is not None:
+            self._respond(*rejection)
+            return
+
+        start = time.perf_counter()
+        try:
+            request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+            if not isinstance(request, dict):
+                raise ValueError("The request must be a JSON object")
+            response = routes[self.path](request)
+        except ValueError as e:
+            self._respond(400, {"error": str(e)})
+        except Exception as e:
+            self._respond(500, {"error": f"{type(e).__name__}: {e}"})
+        else:
+            self._respond(200, {**response, "seconds": time.perf_counter() - start})
+
+    def _rejection(self):
+        """Returns the status and body to reject a request a web page could have sent, or None.
+        Browsers send cross-site form posts without a preflight and with an Origin header, and
+        DNS rebinding sends them to 127.0.0.1 with another Host
+        """
+        if self.headers.get("Origin") is not None:
+            return 403, {"error": "Requests from web pages are not accepted"}
+        host = (self.headers.get("Host") or "").rsplit(":", 1)[0]
+        if host not in {"127.0.0.1", "localhost"}:
+            return 403, {"error": f"Requests for the host {host} are not accepted"}
+        content_type = (self.headers.get("Content-Type") or "").split(";")[0].strip().lower()
+        if content_type != "application/json":
+            return 415, {"error": "Requests must have a Content-Type of application/json"}
+        return None
+
+    def _respond(self, status: int, body: dict):
+        content = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def log_message(self, format, *args):
+        # Requests come many times a minute, so they are not logged
+        pass
+
+
+def request_from_server(server_url: str, path: str, request: dict, timeout: float = DEFAULT_SERVER_TIMEOUT):
+    """Sends the request to the ConversionServer at server_url and returns its response.
+    Returns None when no server is listening there, so the caller can convert in process instead.
+    Raises a ValueError with the server's error when the conversion failed, and when the server
+    accepted the request but did not respond within timeout seconds, as it may still be writing
+    """
+    http_request = urllib.request.Request(
+        server_url.rstrip("/") + path,
+        data=json.dumps(request).encode(),
+        headers={"Content-Type": "application/json"},
+    )
+    # The server is local, so proxies set in the environment are skipped
+    opener = urllib.request.build_opener(urllib.request.ProxyHandler({}))
+    try:
+        with opener.open(http_request, timeout=timeout) as response:
+            return json.load(response)
+    except urllib.error.HTTPError as e:
+        try:
+            error = json.load(e).get("error")
+        except ValueError:
+            error = e.reason
+        raise ValueError(f"The conversion server at {server_url} failed: {error}") from None
+    except urllib.error.URLError:
+        # urllib wraps the errors raised while connecting and sending the request
+        return None
+    except (socket.timeout, ConnectionError) as e:
+        raise ValueError(
+            f"The conversion server at {server_url} accepted the request but did not respond: {e}"
+        ) from None
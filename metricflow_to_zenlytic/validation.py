@@ -0,0 +1,181 @@
+import re
+
+_REFERENCE_PATTERN = re.compile(r"\$\{([^}]*)\}")
+# References Zenlytic resolves itself rather than to a field
+_BUILT_IN_REFERENCES = {"TABLE"}
+REFERENCE_ISSUE_KINDS = ["unresolved", "wrong_view", "unknown_view", "cycle"]
+
+
+def view_references(view: dict):
+    """Returns what validating the view's references needs from it, as a small tuple that can
+    be sent between processes: (view name, field names, identifier names, references). Each
+    reference is (field name, key, referenced name, position of the reference in the value).
+
+    Dimension groups can be referenced by their name and by their name with a timeframe,
+    like ${created_date}.
+    """
+    field_names, references = [], []
+    for field in view.get("fields", []):
+        name = field["name"]
+        field_names.append(name)
+        if field.get("field_type") == "dimension_group":
+            field_names.extend(f"{name}_{timeframe}" for timeframe in field.get("timeframes", []))
+        _add_references(references, name, field.get("sql"))
+        # A cumulative measure is built on the measure named here
+        if measure := field.get("measure"):
+            references.append((name, "measure", measure, 0))
+
+    identifier_names = []
+    for identifier in view.get("identifiers", []):
+        identifier_names.append(identifier["name"])
+        _add_references(references, identifier["name"], identifier.get("sql"))
+    return view["name"], field_names, identifier_names, references
+
+
+def _add_references(references: list, field_name: str, sql: str):
+    if isinstance(sql, str) and "${" in sql:
+        for match in _REFERENCE_PATTERN.finditer(sql):
+            references.append((field_name, "sql", match.group(1).strip(), match.start()))
+
+
+class ReferenceValidator:
+    """Checks that the ${field} and ${view.field} references in converted views resolve.
+
+    Add every view of the project with add_view (or the tuples from view_references with
+    add_references), then call issues. Adding a view records its fields in the symbol table and
+    its references in a list, and issues resolves every reference against the table once, so
+    validating is linear in the number of fields and references.
+    """
+
+    def __init__(self):
+        # view name -> set of field names
+        self._fields = {}
+        # field name -> views defining it, identifier name -> views with it
+        self._field_views = {}
+        self._identifier_views = {}
+        # (view name, path, references) for each view
+        self._references = []
+
+    def add_view(self, view: dict, path: str = None):
+        self.add_references(view_references(view), path)
+
+    def add_references(self, references: tuple, path: str = None):
+        """Adds the view from the tuple view_references returned for it, path is where it is written"""
+        view_name, field_names, identifier_names, view_references = references
+        self._fields[view_name] = set(field_names)
+        for field_name in field_names:
+            self._field_views.setdefault(field_name, []).append(view_name)
+        for identifier_name in identifier_names:
+            self._identifier_views.setdefault(identifier_name, []).append(view_name)
+        self._references.append((view_name, path, view_references))
+
+    def issues(self):
+        """Returns a dict for each reference that does not resolve and each cycle of references,
+        with its "kind" (one of REFERENCE_ISSUE_KINDS), the "view", "field" and "key" it is in,
+        the "path" of the view's file, the "reference", its "position" in the value and a "message"
+        """
+        issues = []
+        # (view, field) -> (view, field) of each reference that resolves
+        graph = {}
+        for view_name, path, references in self._references:
+            for field_name, key, reference, position in references:
+                resolved, problem = self._resolve(view_name, reference)
+                location = (view_name, field_name, key, path, reference, position)
+                if problem is not None:
+                    issues.append(_issue(*problem, *location))
+                elif resolved is not None:
+                    graph.setdefault((view_name, field_name), {}).setdefault(resolved, location)
+
+        for cycle, location in _find_cycles(graph):
+            names = " -> ".join(f"{view}.{field}" for view, field in cycle + [cycle[0]])
+            issues.append(_issue("cycle", f"Fields reference each other in a cycle: {names}", *location))
+        return issues
+
+    def _resolve(self, view_name: str, reference: str):
+        """Returns the (view, field) the reference resolves to and None, or None and the (kind, message)"""
+        if reference in _BUILT_IN_REFERENCES:
+            return None, None
+
+        if "." in reference:
+            referenced_view, field_name = reference.split(".", 1)
+            if referenced_view not in self._fields:
+                message = f"There is no view named {referenced_view}"
+                if self._identifier_views.get(referenced_view):
+                    views = ", ".join(self._identifier_views[referenced_view])
+                    message += f", it is the name of an identifier in {views}"
+                return None, ("unknown_view", message)
+        else:
+            referenced_view, field_name = view_name, reference
+
+        if field_name in self._fields[referenced_view]:
+            return (referenced_view, field_name), None
+        if self._field_views.get(field_name):
+            views = self._field_views[field_name]
+            message = (
+                f"The field {field_name} is not in the view {referenced_view}, it is in {', '.join(views)}"
+            )
+            if len(views) == 1:
+                message += f". Reference it as ${{{views[0]}.{field_name}}}"
+            return None, ("wrong_view", message)
+        return None, ("unresolved", f"There is no field named {field_name} in any view")
+
+
+def _issue(
+    kind: str, message: str, view: str, field: str, key: str, path: str, reference: str, position: int
+):
+    return {
+        "kind": kind,
+        "view": view,
+        "field": field,
+        "key": key,
+        "path": path,
+        "reference": reference,
+        "position": position,
+        "message": message,
+    }
+
+
+def _find_cycles(graph: dict):
+    """Yields each cycle in the graph once, as the list of nodes in it and the location of the
+    reference that closes it. Iterative, so long chains of references do not hit the recursion limit
+    """
+    # Nodes not in state are unvisited, 1 is on the current path and 2 is done
+    state = {}
+    for start in graph:
+        if start in state:
+            continue
+        state[start] = 1
+        path = [start]
+        stack = [iter(graph[start].items())]
+        while stack:
+            for node, location in stack[-1]:
+                if state.get(node) == 1:
+                    yield path[path.index(node) :], location
+                elif node not in state:
+                    state[node] = 1
+                    path.append(node)
+                    stack.append(iter(graph.get(node, {}).items()))
+                    break
+            else:
+                state[path.pop()] = 2
+                stack.pop()
+
+
+def format_reference_issues(issues: list):
+    """Returns the issues as lines like views/orders_view.yml: orders.revenue sql ${_amount}: message"""
+    lines = []
+    for issue in issues:
+        source = f"{issue['path']}: " if issue["path"] else ""
+        reference = issue["reference"] if issue["key"] == "measure" else f"${{{issue['reference']}}}"
+        lines.append(
+            f"{source}{issue['view']}.{issue['field']} {issue['key']} {reference}: {issue['message']}"
+        )
+    return "\n".join(lines)
+
+
+def validate_references(zenlytic_views):
+    """Returns the issues with the references in the views, see ReferenceValidator.issues"""
+    validator = ReferenceValidator()
+    for view in zenlytic_views:
+        validator.add_view(view)
+    return validator.issues()
@@ -0,0 +1,67 @@
+import os
+import threading
+import time
+
+from .incremental import IncrementalProject
+from .metricflow_to_zenlytic import read_mf_project_files
+
+
+def watch_mf_project(
+    project: IncrementalProject,
+    project_name: str = "mf_project_name",
+    connection_name: str = "mf_connection_name",
+    directory: str = None,
+    interval: float = 0.5,
+    debounce: float = 0.5,
+    on_rebuild=None,
+    on_error=None,
+    stop_event: threading.Event = None,
+):
+    """Converts the project, then polls its files every interval seconds and reconverts it when
+    they change, until stop_event is set. The project stays in memory between rebuilds, so only
+    changed files are parsed and only the views affected by them are written.
+
+    A rebuild starts once no file has changed for debounce seconds, so saving many files at once
+    triggers a single rebuild. on_rebuild is called with the summary of each conversion (see
+    IncrementalProject.convert) and on_error with the exception when a conversion fails, for
+    example on a file that is only half written. Watching continues after an error.
+    """
+    stop_event = stop_event or threading.Event()
+
+    def rebuild():
+        try:
+            summary = project.convert(project_name, connection_name, directory)
+        except Exception as e:
+            if on_error:
+                on_error(e)
+        else:
+            if on_rebuild:
+                on_rebuild(summary)
+
+    snapshot = _snapshot(project)
+    rebuild()
+
+    last_change = None
+    while not stop_event.wait(interval):
+        current = _snapshot(project)
+        if current != snapshot:
+            snapshot = current
+            last_change = time.monotonic()
+        elif last_change is not None and time.monotonic() - last_change >= debounce:
+            last_change = None
+            rebuild()
+
+
+def _snapshot(project: IncrementalProject):
+    """The modification time and size of every file in the project. Files are not filtered on
+    their content here, so a file that gains a semantic_models or metrics key is noticed
+    """
+    snapshot = {}
+    for path in read_mf_project_files(project.models_folder, project.include, project.exclude):
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            # Deleted between listing and stat, the next poll will not list it
+            continue
+        snapshot[path] = (stat.st_mtime_ns, stat.st_size)
+    return snapshot
@@ -0,0 +1,120 @@
+import json
+import math
+import re
+from collections.abc import Mapping
+
+from ruamel.yaml.scalarbool import ScalarBoolean
+
+# Plain scalars that start with an indicator, a digit or a sign could be read back as something
+# else than a string, so they are quoted, as are ones that end with a colon or space
+_PLAIN_PATTERN = re.compile(r"(?![-?:,\[\]{}#&*!|>'\"%@`+.~=<\d ])[\x20-\x7e]+(?<![: ])")
+# Words YAML 1.1 or 1.2 reads as null or a boolean
+_RESERVED_WORDS = {"~", "null", "true", "false", "yes", "no", "y", "n", "on", "off"}
+_BLOCK_PATTERN = re.compile(r"[\t\n\x20-\x7e]*")
+
+
+def emit_yaml(document: Mapping):
+    """Returns the YAML for a Zenlytic model or view document, written directly instead of with
+    ruamel. Handles mappings, lists, strings, numbers, booleans and None, which is all the
+    documents hold. Multi-line strings are written as literal blocks and long lines are not folded.
+
+    Raises TypeError for any other value, so the caller can dump the document with ruamel instead.
+    """
+    lines = []
+    _emit_mapping(document, "", lines)
+    return "".join(lines)
+
+
+def _emit_mapping(mapping: Mapping, indent: str, lines: list):
+    for key, value in mapping.items():
+        key = _scalar(key)
+        if "\n" in key:
+            raise TypeError(f"Can not write the multi-line key {key!r}")
+        _emit_value(f"{indent}{key}:", value, indent, lines)
+
+
+def _emit_value(prefix: str, value, indent: str, lines: list):
+    """Writes value after prefix, the key or list dash ending at the column indent is for"""
+    if isinstance(value, Mapping):
+        if not value:
+            lines.append(f"{prefix} {{}}\n")
+            return
+        lines.append(f"{prefix}\n")
+        _emit_mapping(value, indent + "  ", lines)
+    elif isinstance(value, list):
+        if not value:
+            lines.append(f"{prefix} []\n")
+            return
+        lines.append(f"{prefix}\n")
+        _emit_sequence(value, indent, lines)
+    else:
+        lines.append(f"{prefix} {_scalar(value, indent)}\n")
+
+
+def _emit_sequence(sequence: list, indent: str, lines: list):
+    for item in sequence:
+        if isinstance(item, Mapping) and item:
+            # The first key goes on the line of the dash, the rest line up with it
+            start = len(lines)
+            _emit_mapping(item, indent + "  ", lines)
+            lines[start] = f"{indent}- {lines[start][len(indent) + 2:]}"
+        elif isinstance(item, list) and item:
+            raise TypeError("Can not write a list nested directly in a list")
+        else:
+            _emit_value(f"{indent}-", item, indent, lines)
+
+
+def _scalar(value, indent: str = ""):
+    if isinstance(value, str):
+        return _string(value, indent)
+    if value is None:
+        return "null"
+    # The round-trip loader reads anchored booleans as ScalarBoolean, an int subclass
+    if isinstance(value, (bool, ScalarBoolean)):
+        return "true" if value else "false"
+    if isinstance(value, int):
+        return str(int(value))
+    if isinstance(value, float):
+        return _float(float(value))
+    raise TypeError(f"Can not write a value of type {type(value).__name__}")
+
+
+def _string(value: str, indent: str):
+    if "\n" in value and value.strip() and _BLOCK_PATTERN.fullmatch(value):
+        return _literal_block(value, indent)
+    if _PLAIN_PATTERN.fullmatch(value):
+        if ": " not in value and " #" not in value and value.lower() not in _RESERVED_WORDS:
+            return value
+        return "'" + value.replace("'", "''") + "'"
+    if value.isascii() and value.isprintable():
+        return "'" + value.replace("'", "''") + "'"
+    # JSON escapes are valid in YAML's double-quoted strings
+    return json.dumps(value)
+
+
+def _literal_block(value: str, indent: str):
+    if not value.endswith("\n"):
+        chomping = "-"
+    elif value.endswith("\n\n"):
+        chomping = "+"
+    else:
+        chomping = ""
+    # The indentation can not be detected from a first line starting with a space, a tab or left empty
+    indicator = "2" if value[0] in " \t\n" else ""
+    content_indent = indent + "  "
+    body = value[:-1] if value.endswith("\n") else value
+    content = "\n".join(content_indent + line if line else "" for line in body.split("\n"))
+    return f"|{indicator}{chomping}\n{content}"
+
+
+def _float(value: float):
+    if math.isnan(value):
+        return ".nan"
+    if math.isinf(value):
+        return ".inf" if value > 0 else "-.inf"
+    text = repr(value)
+    # YAML 1.1 needs a dot in floats written with an exponent
+    if "e" in text and "." not in text:
+        mantissa, exponent = text.split("e")
+        text = f"{mantissa}.0e{exponent}"
+    return text
@@ -0,0 +1,94 @@
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+
+from metricflow_to_zenlytic import aio
+from metricflow_to_zenlytic.metricflow_to_zenlytic import (
+    convert_mf_project_to_zenlytic_project,
+    load_mf_project,
+    zenlytic_views_to_yaml,
+)
+
+BASE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "examples")
+
+
+@pytest.mark.e2e
+@pytest.mark.parametrize("executor", ["default", "processes"])
+def test_async_api_matches_sync(tmp_path, executor):
+    models_folder = os.path.join(BASE_PATH, "metricflow")
+    sync_project = load_mf_project(models_folder)
+    sync_models, sync_views = convert_mf_project_to_zenlytic_project(sync_project, "sales", "warehouse")
+    sync_yaml = zenlytic_views_to_yaml(sync_models, sync_views, str(tmp_path / "sync"))
+
+    async def run(pool):
+        project = await aio.load_mf_project(models_folder, executor=pool, concurrency=2)
+        models, views = await aio.convert_mf_project_to_zenlytic_project(
+            project, "sales", "warehouse", executor=pool
+        )
+        summary = {"written": [], "skipped": [], "removed": []}
+        yaml = await aio.zenlytic_views_to_yaml(
+            models, views, str(tmp_path / "async"), executor=pool, skip_unchanged=True, summary=summary
+        )
+        return project, models, views, yaml, summary
+
+    if executor == "processes":
+        with ProcessPoolExecutor(2) as pool:
+            project, models, views, yaml, summary = asyncio.run(run(pool))
+    else:
+        project, models, views, yaml, summary = asyncio.run(run(None))
+
+    assert list(project) == list(sync_project)
+    assert (models, views) == (sync_models, sync_views)
+    assert yaml == sync_yaml
+    assert len(summary["written"]) == 4 and summary["skipped"] == []
+    for path in summary["written"]:
+        sync_path = path.replace(str(tmp_path / "async"), str(tmp_path / "sync"))
+        with open(path) as f, open(sync_path) as sync_f:
+            assert f.read() == sync_f.read()
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("outcome", ["bounded", "error", "cancelled"])
+def test_gather_bounded(outcome):
+    running, started, lock = [0], [], threading.Lock()
+
+    def work(item):
+        with lock:
+            running[0] += 1
+            started.append(item)
+            assert running[0] <= 2
+        time.sleep(0.02)
+        with lock:
+            running[0] -= 1
+        if outcome == "error" and item == 3:
+            raise KeyError(item)
+        return item * 2
+
+    async def run():
+        loop = asyncio.get_running_loop()
+
+        async def call(item):
+            return await loop.run_in_executor(None, work, item)
+
+        task = asyncio.ensure_future(aio._gather_bounded(call, list(range(50)), concurrency=2))
+        if outcome == "cancelled":
+            await asyncio.sleep(0.05)
+            task.cancel()
+        return await task
+
+    if outcome == "bounded":
+        assert asyncio.run(run()) == [item * 2 for item in range(50)]
+    elif outcome == "error":
+        with pytest.raises(KeyError):
+            asyncio.run(run())
+        assert len(started) < 10
+    elif outcome == "cancelled":
+        with pytest.raises(asyncio.CancelledError):
+            asyncio.run(run())
+        assert len(started) < 10
+    else:
+        raise ValueError(f"Unknown outcome {outcome}")
@@ -0,0 +1,94 @@
+import os
+import shutil
+
+import pytest
+from click.testing import CliRunner
+
+from metricflow_to_zenlytic.batch import iter_convert_projects, read_batch_manifest
+from metricflow_to_zenlytic.cli import convert_many
+
+BASE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "examples")
+
+
+@pytest.fixture
+def batch_manifest(tmp_path):
+    shutil.copytree(os.path.join(BASE_PATH, "metricflow"), tmp_path / "sales")
+    shutil.copytree(os.path.join(BASE_PATH, "metricflow"), tmp_path / "broken")
+    with open(tmp_path / "broken" / "orders.yml", "a") as f:
+        f.write("  - name: [unclosed\n")
+
+    manifest_path = tmp_path / "batch.yml"
+    manifest_path.write_text(
+        "projects:\n"
+        "  - metricflow_folder: sales\n"
+        "    model_name: sales\n"
+        "    connection_name: sales_warehouse\n"
+        "    out_directory: out/sales\n"
+        "  - metricflow_folder: broken\n"
+        "    model_name: broken\n"
+        "    connection_name: broken_warehouse\n"
+        "    out_directory: out/broken\n"
+        "  - metricflow_folder: sales\n"
+        "    name: finance\n"
+        "    model_name: finance\n"
+        "    connection_name: finance_warehouse\n"
+        "    out_directory: out/finance\n"
+        "    loader: csafe\n"
+    )
+    return str(manifest_path)
+
+
+@pytest.mark.e2e
+@pytest.mark.parametrize("workers", [None, 2])
+def test_convert_projects_isolates_failures(batch_manifest, tmp_path, workers):
+    projects = read_batch_manifest(batch_manifest)
+    assert [project["name"] for project in projects] == ["sales", "broken", "finance"]
+    assert projects[0]["metricflow_folder"] == str(tmp_path / "sales")
+
+    results = list(iter_convert_projects(projects, workers=workers, manifest=False))
+
+    assert [result["name"] for result in results] == ["sales", "broken", "finance"]
+    assert results[0]["error"] is None and len(results[0]["written"]) == 4
+    assert results[1]["error"].startswith("ParserError") and results[1]["written"] == []
+    assert results[2]["error"] is None and len(results[2]["written"]) == 4
+    assert all(result["seconds"] > 0 for result in results)
+
+    model_yaml = (tmp_path / "out" / "finance" / "models" / "finance_model.yml").read_text()
+    assert "connection: finance_warehouse" in model_yaml
+    assert "model_name: sales" in (tmp_path / "out" / "sales" / "views" / "orders_view.yml").read_text()
+    assert not (tmp_path / "out" / "broken").exists()
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("problem", ["not_a_list", "missing_key", "unknown_key", "duplicate_name"])
+def test_read_batch_manifest_errors(tmp_path, problem):
+    project = "  - {metricflow_folder: a, model_name: a, connection_name: c, out_directory: out}\n"
+    if problem == "not_a_list":
+        text, correct = "projects: a\n", "must have a top level projects list"
+    elif problem == "missing_key":
+        text, correct = "projects:\n  - {metricflow_folder: a, model_name: a}\n", "is missing connection_name"
+    elif problem == "unknown_key":
+        text = "projects:\n  - {metricflow_folder: a, model_name: a, connection_name: c, out_directory: o, x: 1}\n"
+        correct = "has unknown keys x"
+    elif problem == "duplicate_name":
+        text, correct = "projects:\n" + project + project, "The project name a is used twice"
+    else:
+        raise ValueError(f"Unknown problem {problem}")
+
+    manifest_path = tmp_path / "batch.yml"
+    manifest_path.write_text(text)
+    with pytest.raises(ValueError) as exc_info:
+        read_batch_manifest(str(manifest_path))
+
+    assert correct in str(exc_info.value)
+
+
+@pytest.mark.e2e
+def test_convert_many_command(batch_manifest, tmp_path):
+    result = CliRunner().invoke(convert_many, [batch_manifest, "--no-manifest", "--jobs", "2"])
+
+    assert result.exit_code == 1
+    assert "sales: wrote 4 files, 0 unchanged, 0 removed" in result.output
+    assert "broken failed after" in result.output
+    assert "Converted 2 of 3 projects" in result.output
+    assert (tmp_path / "out" / "finance" / "views" / "orders_view.yml").exists()
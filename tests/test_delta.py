@@ -0,0 +1,191 @@
+import json
+import os
+import shutil
+from itertools import chain
+
+import pytest
+from click.testing import CliRunner
+
+from metricflow_to_zenlytic.cli import convert
+from metricflow_to_zenlytic.delta import apply_delta, format_delta, project_delta, read_zenlytic_project
+from metricflow_to_zenlytic.metricflow_to_zenlytic import (
+    convert_mf_project_to_zenlytic_project,
+    load_mf_project,
+    zenlytic_views_to_yaml,
+)
+
+BASE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "examples")
+
+
+def _view(name: str, fields: list, **kwargs):
+    return {"version": 1, "type": "view", "name": name, **kwargs, "fields": fields}
+
+
+def _field(name: str, sql: str, field_type: str = "dimension"):
+    return {"name": name, "field_type": field_type, "type": "string", "sql": sql}
+
+
+OLD_PROJECT = [
+    {"version": 1, "type": "model", "name": "sales", "connection": "warehouse"},
+    _view(
+        "orders",
+        [_field("status", "${TABLE}.status"), _field("channel", "${TABLE}.channel")],
+        description="Orders",
+        identifiers=[{"name": "order", "type": "primary", "sql": "${TABLE}.id"}],
+    ),
+    _view("returns", [_field("reason", "${TABLE}.reason")]),
+]
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize(
+    "change", ["none", "modify_field", "add_field", "remove_field", "move_field", "key", "view", "model"]
+)
+def test_project_delta(change):
+    new_project = json.loads(json.dumps(OLD_PROJECT))
+    orders = new_project[1]
+    if change == "none":
+        correct = []
+    elif change == "modify_field":
+        orders["fields"][1]["sql"] = "lower(${TABLE}.channel)"
+        correct = [{"op": "replace", "path": "/views/orders/fields/channel", "value": orders["fields"][1]}]
+    elif change == "add_field":
+        orders["fields"].append(_field("a/b~c", "1", "measure"))
+        correct = [{"op": "add", "path": "/views/orders/fields/a~1b~0c", "value": orders["fields"][2]}]
+    elif change == "remove_field":
+        orders["fields"].pop(0)
+        correct = [{"op": "remove", "path": "/views/orders/fields/status"}]
+    elif change == "move_field":
+        orders["fields"].reverse()
+        correct = []
+        # Fields keep their order when the delta is applied, so the result is the old project
+        new_project = OLD_PROJECT
+    elif change == "key":
+        orders["description"] = "All orders"
+        orders["identifiers"] = []
+        orders["sql_table_name"] = "orders"
+        correct = [
+            {"op": "replace", "path": "/views/orders/description", "value": "All orders"},
+            {"op": "remove", "path": "/views/orders/identifiers/order"},
+            {"op": "add", "path": "/views/orders/sql_table_name", "value": "orders"},
+        ]
+    elif change == "view":
+        new_project[2] = _view("refunds", [])
+        correct = [
+            {"op": "remove", "path": "/views/returns"},
+            {"op": "add", "path": "/views/refunds", "value": new_project[2]},
+        ]
+    elif change == "model":
+        new_project[0]["connection"] = "lake"
+        correct = [{"op": "replace", "path": "/models/sales", "value": new_project[0]}]
+    else:
+        raise ValueError(f"Unknown change {change}")
+
+    patch = project_delta(OLD_PROJECT, new_project)
+
+    assert patch == correct
+    assert json.loads(format_delta(patch)) == patch
+    applied = {document["name"]: document for document in apply_delta(OLD_PROJECT, patch)}
+    assert applied == {document["name"]: document for document in new_project}
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("problem", ["duplicate_field", "missing_field", "unknown_path", "unknown_op"])
+def test_delta_errors(problem):
+    if problem == "duplicate_field":
+        views = [_view("orders", [_field("status", "a"), _field("status", "b")])]
+        with pytest.raises(ValueError) as exc_info:
+            project_delta(views, [_view("orders", [])])
+        assert "more than one item named status in /views/orders/fields" in str(exc_info.value)
+        return
+
+    if problem == "missing_field":
+        operation, correct = {"op": "remove", "path": "/views/orders/fields/total"}, "it does not exist"
+    elif problem == "unknown_path":
+        operation, correct = {"op": "remove", "path": "/views/orders/fields/status/sql"}, "to the path"
+    elif problem == "unknown_op":
+        operation, correct = {"op": "move", "path": "/views/orders"}, "Unknown delta operation move"
+    else:
+        raise ValueError(f"Unknown problem {problem}")
+
+    with pytest.raises(ValueError) as exc_info:
+        apply_delta(OLD_PROJECT, [operation])
+
+    assert correct in str(exc_info.value)
+
+
+@pytest.mark.e2e
+def test_written_project_has_no_delta(tmp_path):
+    metricflow_project = load_mf_project(os.path.join(BASE_PATH, "metricflow"))
+    models, views = convert_mf_project_to_zenlytic_project(metricflow_project, "my_model", "my_company")
+    zenlytic_views_to_yaml(models, views, str(tmp_path))
+
+    assert project_delta(read_zenlytic_project(str(tmp_path)).values(), chain(models, views)) == []
+    assert read_zenlytic_project(str(tmp_path / "missing")) == {}
+
+
+@pytest.mark.e2e
+def test_convert_delta_output(tmp_path):
+    metricflow_folder = tmp_path / "metricflow"
+    shutil.copytree(os.path.join(BASE_PATH, "metricflow"), metricflow_folder)
+    delta_path = str(tmp_path / "delta.json")
+    args = [str(metricflow_folder), "--out-directory", str(tmp_path / "out"), "--no-manifest"]
+
+    result = CliRunner().invoke(convert, args + ["--delta-output", delta_path])
+    assert result.exit_code == 0, result.output
+    with open(delta_path) as f:
+        patch = json.load(f)
+    assert {operation["path"] for operation in patch} == {
+        "/models/my_model",
+        "/views/customers",
+        "/views/order_item",
+        "/views/orders",
+    }
+
+    # Hand-written files in the project are not part of the delta
+    (tmp_path / "out" / "views" / "manual.yml").write_text(
+        "version: 1\ntype: view\nname: manual\nfields: []\n"
+    )
+    (tmp_path / "out" / "views" / "notes_view.yml").write_text("notes: not a view\n")
+
+    orders_path = metricflow_folder / "orders.yml"
+    orders_path.write_text(
+        orders_path.read_text().replace(
+            "Distinct count of customers placing orders", "Customers placing orders"
+        )
+    )
+    for options in [[], ["--skip-unchanged"], ["--incremental"]]:
+        result = CliRunner().invoke(convert, args + options + ["--delta-output", delta_path])
+        assert result.exit_code == 0, result.output
+        assert "notes_view.yml is not a Zenlytic model or view" in result.output
+        with open(delta_path) as f:
+            patch = json.load(f)
+        if options:
+            # The first run already wrote the change
+            assert patch == [] and "Saved 0 changes" in result.output
+        else:
+            assert [operation["path"] for operation in patch] == [
+                "/views/orders/fields/_customers_with_orders"
+            ]
+            assert patch[0]["value"]["description"] == "Customers placing orders"
+
+
+@pytest.mark.e2e
+def test_convert_delta_output_with_damaged_unchanged_file(tmp_path):
+    metricflow_folder = os.path.join(BASE_PATH, "metricflow")
+    delta_path = str(tmp_path / "delta.json")
+    args = [metricflow_folder, "--out-directory", str(tmp_path / "out"), "--no-manifest", "--incremental"]
+    args += ["--cache-dir", str(tmp_path / "cache")]
+
+    result = CliRunner().invoke(convert, args)
+    assert result.exit_code == 0, result.output
+
+    # The incremental run leaves the file alone, so it is read again and can not be parsed
+    orders_path = tmp_path / "out" / "views" / "orders_view.yml"
+    orders_path.write_text("::: not yaml\n")
+    result = CliRunner().invoke(convert, args + ["--delta-output", delta_path])
+
+    assert result.exit_code == 0, result.output
+    assert result.output.count(f"{orders_path} is not a Zenlytic model or view") == 1
+    with open(delta_path) as f:
+        assert json.load(f) == []
@@ -0,0 +1,70 @@
+import pickle
+
+import pytest
+
+from metricflow_to_zenlytic.fields import Dimension, DimensionGroup, Identifier, Measure, View
+from metricflow_to_zenlytic.metricflow_to_zenlytic import dump_yaml_to_file
+
+
+@pytest.mark.unit
+def test_field_behaves_like_a_dict():
+    measure = Measure(name="revenue", sql="amount", type="sum", field_type="measure")
+    measure["hidden"] = True
+    measure.update({"zoe_description": "Total revenue", "name": "_revenue"})
+
+    assert measure == {
+        "name": "_revenue",
+        "sql": "amount",
+        "type": "sum",
+        "field_type": "measure",
+        "hidden": True,
+        "zoe_description": "Total revenue",
+    }
+    assert list(measure) == ["name", "sql", "type", "field_type", "hidden", "zoe_description"]
+    assert "canon_date" not in measure and measure.get("canon_date") is None
+
+    del measure["hidden"]
+    del measure["zoe_description"]
+    assert list(measure) == ["name", "sql", "type", "field_type"]
+    with pytest.raises(KeyError):
+        measure["hidden"]
+    assert pickle.loads(pickle.dumps(measure)) == measure
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("field_name", ["dimension", "dimension_group", "measure", "identifier", "view"])
+def test_field_validation(field_name):
+    if field_name == "dimension":
+        field, correct = Dimension(name="status", field_type="dimension", type="string"), "is missing sql"
+    elif field_name == "dimension_group":
+        field = DimensionGroup(name="created", sql="created", field_type="dimension_group", type="time")
+        correct = "is missing timeframes"
+    elif field_name == "measure":
+        field, correct = (
+            Measure(name="revenue", field_type="measure", type="sum"),
+            "needs either sql or a measure",
+        )
+    elif field_name == "identifier":
+        field, correct = Identifier(name="order_id", type="primary"), "is missing sql"
+    elif field_name == "view":
+        field, correct = (
+            View(version=1, type="view", name="orders"),
+            "is missing model_name, fields, identifiers",
+        )
+
+    with pytest.raises(ValueError) as exc_info:
+        field.to_dict()
+    assert correct in str(exc_info.value)
+
+
+@pytest.mark.unit
+def test_view_renders_to_plain_dicts():
+    view = View(version=1, type="view", model_name="my_model", fields=[], identifiers=[], name="orders")
+    view["fields"].append(Dimension(name="status", sql="status", field_type="dimension", type="string"))
+    view["identifiers"].append(Identifier(name="order_id", type="primary", sql="${order_id}"))
+
+    rendered = view.to_dict()
+    assert type(rendered) is dict
+    assert all(type(field) is dict for field in rendered["fields"] + rendered["identifiers"])
+    assert rendered == view
+    assert dump_yaml_to_file(view) == dump_yaml_to_file(rendered)
@@ -0,0 +1,164 @@
+import os
+import shutil
+
+import pytest
+
+from metricflow_to_zenlytic.incremental import IncrementalProject
+from metricflow_to_zenlytic.metricflow_to_zenlytic import (
+    convert_mf_project_to_zenlytic_project,
+    load_mf_project,
+    zenlytic_views_to_yaml,
+)
+
+BASE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "examples")
+
+
+@pytest.fixture
+def metricflow_folder(tmp_path):
+    folder = tmp_path / "metricflow"
+    shutil.copytree(os.path.join(BASE_PATH, "metricflow"), folder)
+    return str(folder)
+
+
+def _view_path(out_directory, view_name):
+    return os.path.join(out_directory, "views", f"{view_name}_view.yml")
+
+
+@pytest.mark.e2e
+def test_incremental_matches_full_conversion(metricflow_folder, tmp_path):
+    out_directory = str(tmp_path / "out")
+    summary = IncrementalProject(metricflow_folder).convert("my_model", "my_company", out_directory)
+
+    models, views = convert_mf_project_to_zenlytic_project(
+        load_mf_project(metricflow_folder), "my_model", "my_company"
+    )
+    expected = zenlytic_views_to_yaml(models, views, write_to_file=False)
+
+    assert len(summary["written"]) == 4
+    assert summary["skipped"] == []
+    written = []
+    for path in summary["written"]:
+        with open(path) as f:
+            written.append(f.read())
+    assert written == expected
+
+
+@pytest.mark.e2e
+def test_incremental_rewrites_only_changed_views(metricflow_folder, tmp_path):
+    out_directory = str(tmp_path / "out")
+    cache_dir = str(tmp_path / "cache")
+    IncrementalProject(metricflow_folder, cache_dir=cache_dir).convert(
+        "my_model", "my_company", out_directory
+    )
+    mtimes = {view: os.path.getmtime(_view_path(out_directory, view)) for view in ["customers", "orders"]}
+
+    # A fresh instance picks up the state saved in the cache directory
+    summary = IncrementalProject(metricflow_folder, cache_dir=cache_dir).convert(
+        "my_model", "my_company", out_directory
+    )
+    assert summary["written"] == []
+    assert len(summary["skipped"]) == 4
+
+    # order_cost is owned by orders, and the order_gross_profit metric in order_item references it
+    orders_path = os.path.join(metricflow_folder, "orders.yml")
+    with open(orders_path) as f:
+        content = f.read()
+    with open(orders_path, "w") as f:
+        f.write(
+            content.replace("      - name: order_cost\n", "      - name: order_cost\n        expr: cost\n")
+        )
+
+    summary = IncrementalProject(metricflow_folder, cache_dir=cache_dir).convert(
+        "my_model", "my_company", out_directory
+    )
+    assert sorted(summary["written"]) == [
+        _view_path(out_directory, "order_item"),
+        _view_path(out_directory, "orders"),
+    ]
+    assert os.path.getmtime(_view_path(out_directory, "customers")) == mtimes["customers"]
+    with open(_view_path(out_directory, "orders")) as f:
+        assert "sql: cost" in f.read()
+
+
+@pytest.mark.e2e
+def test_incremental_rewrites_views_embedding_another_measure(tmp_path):
+    # The derived metric d in c.yml has a filtered input b, a simple metric on the measure m in a.yml,
+    # so the converted sql of d embeds the expr of m
+    metricflow_folder = tmp_path / "metricflow"
+    metricflow_folder.mkdir()
+    (metricflow_folder / "a.yml").write_text(
+        "semantic_models:\n"
+        "  - name: a\n"
+        "    model: ref('a')\n"
+        "    entities:\n"
+        "      - {name: a_id, type: primary}\n"
+        "    measures:\n"
+        "      - {name: m, expr: amount, agg: sum}\n"
+        "metrics:\n"
+        "  - {name: b, type: simple, type_params: {measure: m}}\n"
+    )
+    (metricflow_folder / "c.yml").write_text(
+        "semantic_models:\n"
+        "  - name: c\n"
+        "    model: ref('c')\n"
+        "    entities:\n"
+        "      - {name: c_id, type: primary}\n"
+        "    measures:\n"
+        "      - {name: units, expr: quantity, agg: sum}\n"
+        "metrics:\n"
+        "  - {name: e, type: simple, type_params: {measure: units}}\n"
+        "  - name: d\n"
+        "    type: derived\n"
+        "    type_params:\n"
+        "      expr: e + b_filtered\n"
+        "      metrics:\n"
+        "        - {name: e}\n"
+        "        - name: b\n"
+        "          alias: b_filtered\n"
+        "          filter: \"{{ Dimension('c_id__status') }} = 'paid'\"\n"
+    )
+    out_directory = str(tmp_path / "out")
+    project = IncrementalProject(str(metricflow_folder))
+    project.convert("my_model", "my_company", out_directory)
+    with open(_view_path(out_directory, "c")) as f:
+        assert "amount" in f.read()
+
+    (metricflow_folder / "a.yml").write_text(
+        (metricflow_folder / "a.yml").read_text().replace("expr: amount", "expr: amount_usd")
+    )
+    summary = project.convert("my_model", "my_company", out_directory)
+
+    assert _view_path(out_directory, "c") in summary["written"]
+    with open(_view_path(out_directory, "c")) as f:
+        assert "amount_usd" in f.read()
+
+
+@pytest.mark.e2e
+@pytest.mark.parametrize("damage", ["not_json", "wrong_shape"])
+def test_incremental_reparses_damaged_cache_entries(metricflow_folder, tmp_path, damage):
+    out_directory = str(tmp_path / "out")
+    cache_dir = tmp_path / "cache"
+    IncrementalProject(metricflow_folder, cache_dir=str(cache_dir)).convert(
+        "my_model", "my_company", out_directory
+    )
+    with open(_view_path(out_directory, "orders")) as f:
+        expected = f.read()
+
+    cache_entries = sorted((cache_dir / "parsed").iterdir())
+    assert cache_entries and all(entry.suffix == ".json" for entry in cache_entries)
+    for entry in cache_entries:
+        if damage == "not_json":
+            entry.write_bytes(b"\x80\x04\x95 not a cache entry")
+        elif damage == "wrong_shape":
+            entry.write_text('{"semantic_models": []}')
+        else:
+            raise ValueError(f"Unknown damage {damage}")
+    shutil.rmtree(out_directory)
+
+    summary = IncrementalProject(metricflow_folder, cache_dir=str(cache_dir)).convert(
+        "my_model", "my_company", out_directory
+    )
+
+    assert len(summary["written"]) == 4
+    with open(_view_path(out_directory, "orders")) as f:
+        assert f.read() == expected
@@ -0,0 +1,127 @@
+import os
+import shutil
+
+import pytest
+
+from metricflow_to_zenlytic.lazy import LazyProject, scan_mf_file
+from metricflow_to_zenlytic.metricflow_to_zenlytic import (
+    convert_mf_project_to_zenlytic_project,
+    load_mf_project,
+)
+
+BASE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "examples")
+
+SCANNED_FILE = """\
+semantic_models:
+- name: orders  # the orders table
+  description: |
+    name: not_a_model
+    - name: not_a_measure
+  model: ref('orders')
+  measures:
+    - name: "order_total"
+      agg: sum
+    -
+      agg: count
+      name: order_count
+  dimensions:
+    - name: status
+      type: categorical
+
+metrics:
+  - name: food_revenue_pct
+    type: ratio
+    type_params:
+      numerator:
+        name: order_total
+        filter: |
+          {{ Dimension('orders__status') }} = 'complete'
+      denominator: 'order_count'
+  - type: Derived
+    name: growth
+    type_params:
+      expr: current - previous
+      metrics:
+        - name: order_total
+          alias: current
+        - {name: order_total, alias: previous}
+"""
+
+
+@pytest.mark.unit
+def test_scan_mf_file():
+    semantic_models, metrics = scan_mf_file(
+        SCANNED_FILE.replace("- {name: order_total, alias: previous}", "")
+    )
+
+    assert semantic_models == [
+        {"name": "orders", "measures": [{"name": "order_total"}, {"name": "order_count"}]}
+    ]
+    assert metrics == [
+        {
+            "name": "food_revenue_pct",
+            "type": "ratio",
+            "type_params": {"numerator": {"name": "order_total"}, "denominator": "order_count"},
+        },
+        {"name": "growth", "type": "Derived", "type_params": {"metrics": [{"name": "order_total"}]}},
+    ]
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("case", ["flow_mapping", "anchor", "missing_measure", "missing_name"])
+def test_scan_mf_file_unscannable(case):
+    if case == "flow_mapping":
+        text = SCANNED_FILE
+    elif case == "anchor":
+        text = SCANNED_FILE.replace("agg: sum", "agg: &agg sum")
+    elif case == "missing_measure":
+        text = "metrics:\n  - name: revenue\n    type: simple\n    type_params:\n      measures: revenue\n"
+    elif case == "missing_name":
+        text = "semantic_models:\n  - model: ref('orders')\n"
+
+    assert scan_mf_file(text) is None
+
+
+@pytest.mark.e2e
+def test_lazy_project_matches_load():
+    metricflow_folder = os.path.join(BASE_PATH, "metricflow")
+    mf_project = load_mf_project(metricflow_folder)
+    _, views = convert_mf_project_to_zenlytic_project(mf_project, "my_model", "my_company")
+
+    lazy_project = LazyProject(metricflow_folder)
+    assert lazy_project.semantic_model_names() == list(mf_project)
+    for view in views:
+        assert lazy_project.get_semantic_model(view["name"]) == mf_project[view["name"]]
+        assert lazy_project.convert_view(view["name"], "my_model") == view
+
+    with pytest.raises(ValueError) as exc_info:
+        lazy_project.convert_view("missing")
+    assert "Could not find semantic model missing" in str(exc_info.value)
+
+
+@pytest.mark.e2e
+def test_lazy_project_parses_only_needed_files(tmp_path):
+    shutil.copytree(os.path.join(BASE_PATH, "metricflow"), tmp_path, dirs_exist_ok=True)
+    lazy_project = LazyProject(str(tmp_path))
+
+    # None of the metrics are placed in customers, so no other file is needed
+    lazy_project.convert_view("customers")
+    assert list(lazy_project._parsed_files) == [str(tmp_path / "customers.yml")]
+
+    # Metrics placed in order_item reference measures of orders, like order_cost
+    order_item = lazy_project.convert_view("order_item")
+    assert {os.path.basename(path) for path in lazy_project._parsed_files} == {
+        "customers.yml",
+        "order_items.yml",
+        "orders.yml",
+    }
+
+    (tmp_path / "customers.yml").write_text(
+        (tmp_path / "customers.yml")
+        .read_text()
+        .replace("semantic_models:\n  - name: customers\n", "semantic_models:\n  - name: clients\n")
+    )
+    lazy_project.refresh()
+    assert "clients" in lazy_project.semantic_model_names()
+    assert "customers" not in lazy_project.semantic_model_names()
+    assert lazy_project.convert_view("order_item") == order_item
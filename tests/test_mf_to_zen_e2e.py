@@ -1,8 +1,20 @@
 import pytest
+from click.testing import CliRunner
+
+from metricflow_to_zenlytic.cli import convert
 from metricflow_to_zenlytic.metricflow_to_zenlytic import (
+    find_semantic_manifest,
+    read_mf_project_files,
+    load_mf_manifest,
     load_mf_project,
     convert_mf_project_to_zenlytic_project,
+    create_zenlytic_model,
+    iter_mf_project_to_zenlytic_views,
+    write_mf_project_to_zenlytic,
+    zenlytic_views_to_yaml,
+    YamlLoaders,
 )
+import copy
 import os
 
 BASE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "examples")
@@ -78,3 +90,284 @@ def test_e2e_conversions():
     assert order_item_view["identifiers"][1]["name"] == "order_id"
     assert order_item_view["identifiers"][1]["type"] == "foreign"
     assert order_item_view["identifiers"][1]["sql"] == "${order_id}"
+
+
+@pytest.mark.e2e
+def test_e2e_duplicate_measure_names(tmp_path):
+    for model_name in ["orders", "returns"]:
+        (tmp_path / f"{model_name}.yml").write_text(
+            "semantic_models:\n"
+            f"  - name: {model_name}\n"
+            f"    model: ref('{model_name}')\n"
+            "    entities: []\n"
+            "    measures:\n"
+            "      - name: order_total\n"
+            "        agg: sum\n"
+        )
+
+    with pytest.raises(ValueError) as exc_info:
+        load_mf_project(str(tmp_path) + "/")
+
+    assert "order_total" in str(exc_info.value)
+    assert "orders" in str(exc_info.value)
+    assert "returns" in str(exc_info.value)
+
+
+@pytest.mark.e2e
+@pytest.mark.parametrize("workers", [2, 4])
+def test_e2e_parallel_load_matches_serial(workers):
+    metricflow_folder = os.path.join(BASE_PATH, "metricflow")
+
+    serial_project = load_mf_project(metricflow_folder)
+    parallel_project = load_mf_project(metricflow_folder, workers=workers)
+
+    assert list(parallel_project.keys()) == list(serial_project.keys())
+
+    serial_yaml = zenlytic_views_to_yaml(
+        *convert_mf_project_to_zenlytic_project(serial_project), write_to_file=False
+    )
+    parallel_yaml = zenlytic_views_to_yaml(
+        *convert_mf_project_to_zenlytic_project(parallel_project), write_to_file=False
+    )
+    assert parallel_yaml == serial_yaml
+
+
+@pytest.mark.e2e
+@pytest.mark.parametrize("loader", [YamlLoaders.safe, YamlLoaders.c_safe])
+def test_e2e_safe_loaders_match_round_trip(loader):
+    metricflow_folder = os.path.join(BASE_PATH, "metricflow")
+
+    _, round_trip_views = convert_mf_project_to_zenlytic_project(load_mf_project(metricflow_folder))
+    _, views = convert_mf_project_to_zenlytic_project(load_mf_project(metricflow_folder, loader=loader))
+
+    assert views == round_trip_views
+
+
+@pytest.mark.e2e
+def test_e2e_unknown_loader():
+    with pytest.raises(ValueError):
+        load_mf_project(os.path.join(BASE_PATH, "metricflow"), loader="fast")
+
+
+@pytest.mark.e2e
+def test_e2e_manifest_matches_yaml():
+    metricflow_folder = os.path.join(BASE_PATH, "metricflow")
+
+    yaml_project = load_mf_project(metricflow_folder)
+    manifest_project = load_mf_manifest(os.path.join(BASE_PATH, "semantic_manifest.json"))
+
+    assert list(manifest_project.keys()) == list(yaml_project.keys())
+    for name, semantic_model in manifest_project.items():
+        assert [m["name"] for m in semantic_model["metrics"]] == [
+            m["name"] for m in yaml_project[name]["metrics"]
+        ]
+
+    _, yaml_views = convert_mf_project_to_zenlytic_project(yaml_project)
+    _, manifest_views = convert_mf_project_to_zenlytic_project(manifest_project)
+    assert manifest_views == yaml_views
+
+
+@pytest.mark.e2e
+def test_e2e_find_semantic_manifest(tmp_path):
+    source_path = tmp_path / "orders.yml"
+    source_path.write_text("semantic_models: []\n")
+    assert find_semantic_manifest(str(tmp_path)) is None
+
+    manifest_path = tmp_path / "target" / "semantic_manifest.json"
+    manifest_path.parent.mkdir()
+    manifest_path.write_text("{}")
+    os.utime(source_path, (0, 100))
+    os.utime(manifest_path, (0, 200))
+    assert find_semantic_manifest(str(tmp_path)) == str(manifest_path)
+
+    os.utime(source_path, (0, 300))
+    assert find_semantic_manifest(str(tmp_path)) is None
+
+
+@pytest.mark.e2e
+def test_e2e_views_to_yaml_writes_returned_yaml(tmp_path):
+    metricflow_project = load_mf_project(os.path.join(BASE_PATH, "metricflow"))
+    models, views = convert_mf_project_to_zenlytic_project(metricflow_project, "my_model", "my_company")
+
+    zenlytic_yaml = zenlytic_views_to_yaml(models, views, str(tmp_path))
+
+    written = [(tmp_path / "models" / "my_model_model.yml").read_text()]
+    written.extend((tmp_path / "views" / f"{view['name']}_view.yml").read_text() for view in views)
+    assert written == zenlytic_yaml
+    assert "name: my_model" in zenlytic_yaml[0]
+
+    files_only = tmp_path / "files_only"
+    assert zenlytic_views_to_yaml(models, views, str(files_only), return_yaml=False) is None
+    assert (files_only / "models" / "my_model_model.yml").read_text() == written[0]
+    assert [(files_only / "views" / f"{view['name']}_view.yml").read_text() for view in views] == written[1:]
+
+
+@pytest.mark.e2e
+def test_e2e_streaming_conversion(tmp_path):
+    metricflow_project = load_mf_project(os.path.join(BASE_PATH, "metricflow"))
+    models, views = convert_mf_project_to_zenlytic_project(metricflow_project, "my_model", "my_company")
+    expected = zenlytic_views_to_yaml(models, views, write_to_file=False)
+
+    view_iterator = iter_mf_project_to_zenlytic_views(metricflow_project, "my_model")
+    assert next(view_iterator) == views[0]
+
+    streamed_views = iter_mf_project_to_zenlytic_views(metricflow_project, "my_model")
+    model = create_zenlytic_model("my_model", "my_company")
+    assert zenlytic_views_to_yaml([model], streamed_views, str(tmp_path), return_yaml=False) is None
+
+    written = [(tmp_path / "models" / "my_model_model.yml").read_text()]
+    written.extend((tmp_path / "views" / f"{view['name']}_view.yml").read_text() for view in views)
+    assert written == expected
+
+
+@pytest.mark.e2e
+@pytest.mark.parametrize("workers", [None, 2])
+def test_e2e_write_skips_unchanged_files(tmp_path, workers):
+    metricflow_project = load_mf_project(os.path.join(BASE_PATH, "metricflow"))
+    directory = str(tmp_path)
+    write_options = {"workers": workers, "skip_unchanged": True, "remove_orphans": True}
+
+    summary = write_mf_project_to_zenlytic(
+        metricflow_project, "my_model", "my_company", directory, **write_options
+    )
+    assert len(summary["written"]) == 4
+    assert summary["skipped"] == [] and summary["removed"] == []
+
+    orders_path = tmp_path / "views" / "orders_view.yml"
+    customers_path = tmp_path / "views" / "customers_view.yml"
+    expected_orders = orders_path.read_text()
+    os.chmod(orders_path, 0o640)
+    # Same size but different content, so only the hashes tell them apart
+    orders_path.write_text(expected_orders.replace("orders", "sredro"))
+    os.utime(customers_path, (0, 0))
+    (tmp_path / "views" / "deleted_view.yml").write_text("version: 1\n")
+    (tmp_path / "views" / "hand_written.yml").write_text("version: 1\n")
+
+    summary = write_mf_project_to_zenlytic(
+        metricflow_project, "my_model", "my_company", directory, **write_options
+    )
+    assert summary["written"] == [str(orders_path)]
+    assert len(summary["skipped"]) == 3
+    assert summary["removed"] == [str(tmp_path / "views" / "deleted_view.yml")]
+
+    assert orders_path.read_text() == expected_orders
+    assert os.stat(orders_path).st_mode & 0o777 == 0o640
+    assert os.path.getmtime(customers_path) == 0
+    assert sorted(os.listdir(tmp_path / "views")) == [
+        "customers_view.yml",
+        "hand_written.yml",
+        "order_item_view.yml",
+        "orders_view.yml",
+    ]
+
+
+@pytest.mark.e2e
+def test_e2e_parallel_conversion_matches_serial(tmp_path):
+    metricflow_project = load_mf_project(os.path.join(BASE_PATH, "metricflow"))
+    models, views = convert_mf_project_to_zenlytic_project(metricflow_project, "my_model", "my_company")
+    expected = zenlytic_views_to_yaml(models, views, write_to_file=False)
+
+    parallel_models, parallel_views = convert_mf_project_to_zenlytic_project(
+        metricflow_project, "my_model", "my_company", workers=2
+    )
+    assert parallel_views == views
+    assert (
+        zenlytic_views_to_yaml(parallel_models, parallel_views, str(tmp_path / "dumped"), workers=2)
+        == expected
+    )
+
+    write_mf_project_to_zenlytic(metricflow_project, "my_model", "my_company", str(tmp_path), workers=2)
+    for directory in [tmp_path, tmp_path / "dumped"]:
+        written = [(directory / "models" / "my_model_model.yml").read_text()]
+        written.extend((directory / "views" / f"{view['name']}_view.yml").read_text() for view in views)
+        assert written == expected
+
+
+@pytest.mark.e2e
+def test_e2e_parallel_conversion_raises_first_error(tmp_path):
+    metricflow_project = load_mf_project(os.path.join(BASE_PATH, "metricflow"))
+    broken_project = copy.deepcopy(metricflow_project)
+    first, *_, last = broken_project.values()
+    del first["entities"]
+    last["dimensions"] = None
+
+    for workers in [None, 2]:
+        with pytest.raises(KeyError) as exc_info:
+            write_mf_project_to_zenlytic(
+                broken_project, "my_model", "my_company", str(tmp_path), workers=workers
+            )
+        assert exc_info.value.args == ("entities",)
+
+
+@pytest.mark.e2e
+def test_e2e_read_project_files(tmp_path):
+    files = {
+        "models/marts/orders.yml": "semantic_models: []\n",
+        "models/marts/metrics.yaml": "metrics: []\n",
+        "models/staging/schema.yml": "models: []\n",
+        "models/staging/notes.txt": "",
+        "dbt_project.yml": "name: jaffle_shop\n",
+        "target/compiled.yml": "semantic_models: []\n",
+        "dbt_packages/metrics/models.yml": "metrics: []\n",
+        "logs/run.yml": "",
+        "models/sales/target/orders.yml": "semantic_models: []\n",
+        "models/staging/logs/__pycache__/cached.yml": "",
+        ".venv/lib/settings.yml": "",
+        "models/.hidden.yml": "semantic_models: []\n",
+    }
+    for file_path, content in files.items():
+        (tmp_path / file_path).parent.mkdir(parents=True, exist_ok=True)
+        (tmp_path / file_path).write_text(content)
+
+    def relative_paths(**kwargs):
+        return [os.path.relpath(p, tmp_path) for p in read_mf_project_files(str(tmp_path), **kwargs)]
+
+    assert relative_paths() == [
+        "dbt_project.yml",
+        "models/marts/metrics.yaml",
+        "models/marts/orders.yml",
+        "models/sales/target/orders.yml",
+        "models/staging/schema.yml",
+    ]
+    assert relative_paths(semantic_only=True) == [
+        "models/marts/metrics.yaml",
+        "models/marts/orders.yml",
+        "models/sales/target/orders.yml",
+    ]
+    # An include pattern for a skipped directory reads it
+    assert relative_paths(include=["target/*.yml", "models/sales/target/*.yml"]) == [
+        "models/sales/target/orders.yml",
+        "target/compiled.yml",
+    ]
+    assert relative_paths(include=["models/*"], exclude=["staging", "sales"]) == [
+        "models/marts/metrics.yaml",
+        "models/marts/orders.yml",
+    ]
+    assert relative_paths(exclude=["*.yaml", "dbt_project.yml"]) == [
+        "models/marts/orders.yml",
+        "models/sales/target/orders.yml",
+        "models/staging/schema.yml",
+    ]
+
+
+@pytest.mark.e2e
+def test_e2e_convert_command_names(tmp_path):
+    result = CliRunner().invoke(
+        convert,
+        [
+            os.path.join(BASE_PATH, "metricflow"),
+            "--out-directory",
+            str(tmp_path),
+            "--no-manifest",
+            "--model-name",
+            "sales",
+            "--connection-name",
+            "sales_warehouse",
+        ],
+    )
+
+    assert result.exit_code == 0, result.output
+    assert "Wrote 4 files, 0 unchanged, 0 removed" in result.output
+    model_yaml = (tmp_path / "models" / "sales_model.yml").read_text()
+    assert "name: sales\n" in model_yaml and "connection: sales_warehouse\n" in model_yaml
+    assert "model_name: sales\n" in (tmp_path / "views" / "orders_view.yml").read_text()
@@ -4,10 +4,26 @@ from metricflow_to_zenlytic.metricflow_to_zenlytic import (
     convert_mf_measure_to_zenlytic_measure,
     convert_mf_entity_to_zenlytic_identifier,
     convert_mf_metric_to_zenlytic_measure,
+    _assign_metrics_to_semantic_models,
+    _extract_filter_sql,
+    MetricGraph,
     ZenlyticUnsupportedError,
 )
 
 
+def _simple(name, measure, **kwargs):
+    return {"name": name, "type": "simple", "type_params": {"measure": measure}, **kwargs}
+
+
+def _derived(name, *inputs, expr=None):
+    metrics = [{"name": metric_name} for metric_name in inputs]
+    return {
+        "name": name,
+        "type": "derived",
+        "type_params": {"expr": expr or " + ".join(inputs), "metrics": metrics},
+    }
+
+
 @pytest.mark.unit
 @pytest.mark.parametrize(
     "mf_dimension",
@@ -239,6 +255,15 @@ def test_measure_conversion(mf_measure):
                 ],
             },
         },
+        {
+            "name": "overlapping_names",
+            "label": "Overlapping Names",
+            "type": "derived",
+            "type_params": {
+                "expr": "case when rev > 0 and region = 'rev' then (revenue - rev) / rev end",
+                "metrics": [{"name": "order_total", "alias": "rev"}, {"name": "revenue"}],
+            },
+        },
     ],
 )
 def test_metric_conversion(mf_metric):
@@ -341,6 +366,15 @@ def test_metric_conversion(mf_metric):
             "label": "Food Order Gross Profit",
             "description": "The gross profit for each food order.",
         }
+    elif mf_metric["name"] == "overlapping_names":
+        correct = {
+            "name": "overlapping_names",
+            "field_type": "measure",
+            "sql": "case when ${_order_total} > 0 and region = 'rev' "
+            "then (${_revenue} - ${_order_total}) / ${_order_total} end",
+            "type": "number",
+            "label": "Overlapping Names",
+        }
 
     assert converted == correct
 
@@ -365,3 +399,144 @@ def test_entity_conversion(mf_entity):
         correct = {"name": "order_line", "type": "primary", "sql": "CAST(id_order_line AS STRING)"}
 
     assert converted == correct
+
+
+@pytest.mark.unit
+def test_metric_conversion_with_measure_registry():
+    measures = [
+        {"name": "orders", "agg": "count_distinct", "expr": "id_order"},
+        {"name": "food_orders", "agg": "count_distinct", "expr": "case when is_food then id_order end"},
+    ]
+    mf_metric = {
+        "name": "food_order_pct",
+        "type": "ratio",
+        "type_params": {
+            "numerator": {"name": "food_orders", "filter": "{{ Dimension('order__is_online') }} = True"},
+            "denominator": "orders",
+        },
+    }
+    registry = {measure["name"]: measure for measure in measures}
+
+    from_list = convert_mf_metric_to_zenlytic_measure(mf_metric, measures)
+    from_registry = convert_mf_metric_to_zenlytic_measure(mf_metric, registry)
+
+    assert from_list == from_registry
+    assert from_registry[0]["sql"] == "${food_order_pct_numerator} / ${_orders}"
+    missing_measure_metric = {"name": "missing", "type": "simple", "type_params": {"measure": "missing"}}
+    with pytest.raises(ValueError):
+        convert_mf_metric_to_zenlytic_measure(missing_measure_metric, registry)
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize(
+    "filter_string,correct",
+    [
+        ("{{Dimension('customer__order_total_dim')}} >= 20", "${customer.order_total_dim} >= 20"),
+        ("{{ Dimension('order__is_food_order') }}", " ${order.is_food_order} "),
+        ("{{ Dimension(\"order__status\") }} in ('a', 'b')", " ${order.status}  in ('a', 'b')"),
+        (
+            "{{ Dimension('order__status') }} = 'new' or {{ Dimension('order__status') }} is null",
+            " ${order.status}  = 'new' or  ${order.status}  is null",
+        ),
+        (
+            "{{ Dimension('order__type') }} = 'a' and {{ Dimension('order__type_detail') }} = 'b'",
+            " ${order.type}  = 'a' and  ${order.type_detail}  = 'b'",
+        ),
+        (
+            "{{ TimeDimension('order__ordered_at', 'day') }} > '2024-01-01' "
+            'and {{ TimeDimension( "order__ordered_at" , "month" ) }} = \'2024-01-01\'',
+            " ${order.ordered_at_date}  > '2024-01-01' and  ${order.ordered_at_month}  = '2024-01-01'",
+        ),
+    ],
+)
+def test_filter_translation(filter_string, correct):
+    assert _extract_filter_sql(filter_string) == correct
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize(
+    "filter_string",
+    ["{{ Entity('product') }} = 'P3150104'", "{{ Metric('food_revenue', group_by=['order_id']) }} > 0"],
+)
+def test_filter_translation_unsupported(filter_string):
+    with pytest.raises(ZenlyticUnsupportedError):
+        _extract_filter_sql(filter_string)
+
+
+@pytest.mark.unit
+def test_metric_graph_order_and_placement():
+    metrics = [
+        _derived("growth", "net_revenue", "revenue"),
+        _derived("net_revenue", "revenue", "refunds"),
+        _simple("revenue", "revenue_measure"),
+        _simple("refunds", "refund_measure", filter="{{ Dimension('orders__status') }} = 'refunded'"),
+    ]
+    graph = MetricGraph(metrics)
+
+    order = graph.topological_order()
+    assert order.index("revenue") < order.index("net_revenue") < order.index("growth")
+    assert order.index("refunds") < order.index("net_revenue")
+
+    measure_owners = {"revenue_measure": "orders", "refund_measure": "refunds"}
+    assert graph.place(measure_owners) == {
+        "revenue": "orders",
+        "refunds": "refunds",
+        "net_revenue": "orders",
+        "growth": "orders",
+    }
+
+    # Derived metrics built on other derived metrics used to be dropped
+    semantic_models = {"orders": {"metrics": []}, "refunds": {"metrics": []}}
+    _assign_metrics_to_semantic_models(semantic_models, metrics, measure_owners)
+    assert [metric["name"] for metric in semantic_models["orders"]["metrics"]] == [
+        "growth",
+        "net_revenue",
+        "revenue",
+    ]
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("metric_name", ["revenue", "refunds", "net_revenue", "revenue_measure"])
+def test_metric_graph_reference(metric_name):
+    graph = MetricGraph(
+        [
+            _simple("revenue", "revenue_measure"),
+            _simple("refunds", "refund_measure", filter="{{ Dimension('orders__status') }} = 'refunded'"),
+            _derived("net_revenue", "revenue", "refunds"),
+        ]
+    )
+    reference = graph.reference(metric_name)
+
+    if metric_name == "revenue":
+        correct = "${_revenue_measure}"
+    elif metric_name == "refunds":
+        correct = "${refunds}"
+    elif metric_name == "net_revenue":
+        correct = "${net_revenue}"
+    elif metric_name == "revenue_measure":
+        correct = "${_revenue_measure}"
+    assert reference == correct
+
+
+@pytest.mark.unit
+def test_metric_graph_cycle():
+    graph = MetricGraph([_derived("a", "b"), _derived("b", "c"), _derived("c", "a"), _simple("d", "m")])
+
+    with pytest.raises(ValueError) as exc_info:
+        graph.topological_order()
+
+    assert "a -> b -> c -> a" in str(exc_info.value)
+
+
+@pytest.mark.unit
+def test_metric_graph_deep_chain():
+    depth = 5000
+    metrics = [_simple("metric_0", "measure_0")]
+    metrics.extend(_derived(f"metric_{idx}", f"metric_{idx - 1}") for idx in range(1, depth))
+    graph = MetricGraph(reversed(metrics))
+
+    assert graph.topological_order() == [f"metric_{idx}" for idx in range(depth)]
+    assert set(graph.place({"measure_0": "orders"}).values()) == {"orders"}
+
+    metric_dict, _ = convert_mf_metric_to_zenlytic_measure(metrics[-1], {}, graph)
+    assert metric_dict["sql"] == "${metric_4998}"
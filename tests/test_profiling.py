@@ -0,0 +1,134 @@
+import json
+import os
+import tracemalloc
+
+import pytest
+from click.testing import CliRunner
+
+from metricflow_to_zenlytic.cli import convert
+from metricflow_to_zenlytic.metricflow_to_zenlytic import (
+    _timed,
+    convert_mf_project_to_zenlytic_project,
+    load_mf_project,
+    subscribe_to_timings,
+    unsubscribe_from_timings,
+    write_mf_project_to_zenlytic,
+    zenlytic_views_to_yaml,
+)
+from metricflow_to_zenlytic.profiling import ConversionProfiler
+
+BASE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "examples")
+
+
+@pytest.mark.e2e
+def test_timing_events(tmp_path):
+    events = []
+    subscribe_to_timings(events.append)
+    try:
+        project = load_mf_project(os.path.join(BASE_PATH, "metricflow"))
+        models, views = convert_mf_project_to_zenlytic_project(project, "my_model", "my_company")
+        zenlytic_views_to_yaml(models, views, str(tmp_path), return_yaml=False)
+    finally:
+        unsubscribe_from_timings(events.append)
+
+    ends = [event for event in events if event["event"] == "end"]
+    assert len(events) == 2 * len(ends)
+    assert [event["phase"] for event in ends[:1]] == ["discover"]
+    assert {event["item"] for event in ends if event["phase"] == "convert"} == set(project)
+    assert sum(event["phase"] == "parse" for event in ends) == 3
+    assert sum(event["phase"] == "write" for event in ends) == len(views) + 1
+    assert all(event["seconds"] >= 0 for event in ends)
+
+    # Nothing is published once unsubscribed
+    load_mf_project(os.path.join(BASE_PATH, "metricflow"))
+    assert len(events) == 2 * len(ends)
+
+
+@pytest.mark.e2e
+def test_conversion_profiler(tmp_path):
+    with ConversionProfiler() as profiler:
+        project = load_mf_project(os.path.join(BASE_PATH, "metricflow"))
+        models, views = convert_mf_project_to_zenlytic_project(project, "my_model", "my_company")
+        zenlytic_views_to_yaml(models, views, str(tmp_path), return_yaml=False)
+
+    summary = profiler.phase_summary()
+    assert list(summary) == ["discover", "parse", "assign", "convert", "dump", "write"]
+    assert summary["convert"]["calls"] == len(views)
+    assert summary["parse"]["peak_memory_bytes"] > 0
+
+    slowest = profiler.slowest("convert", n=2)
+    assert len(slowest) == 2
+    assert slowest[0]["seconds"] >= slowest[1]["seconds"]
+    assert "Slowest views to convert" in profiler.report()
+    assert len(profiler.trace()["traceEvents"]) == len(profiler.events)
+
+
+@pytest.mark.e2e
+def test_convert_profile_options(tmp_path):
+    trace_path, stats_path = str(tmp_path / "trace.json"), str(tmp_path / "convert.prof")
+    result = CliRunner().invoke(
+        convert,
+        [
+            os.path.join(BASE_PATH, "metricflow"),
+            "--out-directory",
+            str(tmp_path / "out"),
+            "--no-manifest",
+            "--profile",
+            "--profile-trace",
+            trace_path,
+            "--cprofile",
+            stats_path,
+        ],
+    )
+
+    assert result.exit_code == 0, result.output
+    assert "Slowest files to parse" in result.output
+    with open(trace_path) as f:
+        assert {event["cat"] for event in json.load(f)["traceEvents"]} >= {"parse", "convert", "write"}
+    assert os.path.getsize(stats_path) > 0
+
+
+@pytest.mark.e2e
+def test_parallel_convert_timing_ends_before_writes(tmp_path):
+    project = load_mf_project(os.path.join(BASE_PATH, "metricflow"))
+    events = []
+    subscribe_to_timings(events.append)
+    try:
+        write_mf_project_to_zenlytic(project, "my_model", "my_company", str(tmp_path), workers=2)
+    finally:
+        unsubscribe_from_timings(events.append)
+
+    phases = [(event["event"], event["phase"]) for event in events]
+    assert phases.count(("end", "convert")) == 1
+    assert phases.index(("end", "convert")) < phases.index(("start", "write"))
+    assert phases.count(("end", "write")) == len(project) + 1
+
+
+@pytest.mark.unit
+def test_profiler_keeps_peak_of_enclosing_phase():
+    with ConversionProfiler() as profiler:
+        with _timed("convert"):
+            with _timed("write", "first"):
+                allocated = bytearray(2**22)
+                del allocated
+            with _timed("write", "second"):
+                pass
+
+    peaks = {(event["phase"], event["item"]): event["peak_memory_bytes"] for event in profiler.events}
+    assert peaks[("convert", None)] > 2**21
+    assert peaks[("write", "first")] > 2**21
+    assert peaks[("write", "second")] < 2**20
+
+
+@pytest.mark.unit
+def test_profiler_skips_memory_without_reset_peak(monkeypatch):
+    # Python 3.8's tracemalloc has no reset_peak
+    monkeypatch.delattr(tracemalloc, "reset_peak")
+    with ConversionProfiler() as profiler:
+        with _timed("convert"):
+            pass
+
+    assert not profiler.trace_memory
+    assert [event["phase"] for event in profiler.events] == ["convert"]
+    assert "peak_memory_bytes" not in profiler.events[0]
+    assert profiler.phase_summary()["convert"]["peak_memory_bytes"] == 0
@@ -0,0 +1,172 @@
+import json
+import os
+import shutil
+import socket
+import threading
+import urllib.error
+import urllib.request
+
+import pytest
+from click.testing import CliRunner
+
+from metricflow_to_zenlytic.cli import convert
+from metricflow_to_zenlytic.metricflow_to_zenlytic import (
+    convert_mf_project_to_zenlytic_project,
+    dump_yaml_to_file,
+    load_mf_project,
+)
+from metricflow_to_zenlytic.server import ConversionServer, request_from_server
+
+BASE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "examples")
+
+
+@pytest.fixture
+def server():
+    server = ConversionServer(port=0)
+    thread = threading.Thread(target=server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+    thread.join()
+
+
+@pytest.fixture
+def metricflow_folder(tmp_path):
+    folder = tmp_path / "metricflow"
+    shutil.copytree(os.path.join(BASE_PATH, "metricflow"), folder)
+    return str(folder)
+
+
+def _unused_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+@pytest.mark.e2e
+def test_server_keeps_project_warm(server, metricflow_folder, tmp_path):
+    request = {
+        "metricflow_folder": metricflow_folder,
+        "out_directory": str(tmp_path / "out"),
+        "model_name": "sales",
+        "connection_name": "sales_warehouse",
+    }
+    assert request_from_server(server.url, "/convert", request)["written"] != []
+    assert request_from_server(server.url, "/convert", request)["written"] == []
+
+    with open(os.path.join(metricflow_folder, "orders.yml")) as f:
+        content = f.read()
+    with open(os.path.join(metricflow_folder, "orders.yml"), "w") as f:
+        f.write(content.replace("Distinct count of customers placing orders", "Customers placing orders"))
+
+    response = request_from_server(server.url, "/convert", request)
+    assert response["written"] == [str(tmp_path / "out" / "views" / "orders_view.yml")]
+    assert response["seconds"] >= 0
+
+    project = load_mf_project(metricflow_folder)
+    _, views = convert_mf_project_to_zenlytic_project(project, "sales", "sales_warehouse")
+    expected = dump_yaml_to_file(next(view for view in views if view["name"] == "orders"))
+    view_request = {"metricflow_folder": metricflow_folder, "semantic_model": "orders", "model_name": "sales"}
+    assert request_from_server(server.url, "/convert-view", view_request)["yaml"] == expected
+    assert (tmp_path / "out" / "views" / "orders_view.yml").read_text() == expected
+    assert server.project_count() == 1
+
+    opener = urllib.request.build_opener(urllib.request.ProxyHandler({}))
+    with opener.open(f"{server.url}/health") as response:
+        assert json.load(response) == {"status": "ok", "projects": 1}
+
+
+@pytest.mark.e2e
+@pytest.mark.parametrize("problem", ["missing_folder", "missing_semantic_model", "unknown_semantic_model"])
+def test_server_errors(server, metricflow_folder, problem):
+    if problem == "missing_folder":
+        request, correct = {"semantic_model": "orders"}, "missing the metricflow_folder"
+    elif problem == "missing_semantic_model":
+        request, correct = {"metricflow_folder": metricflow_folder}, "missing the semantic_model"
+    elif problem == "unknown_semantic_model":
+        request = {"metricflow_folder": metricflow_folder, "semantic_model": "returns"}
+        correct = "Could not find semantic model returns"
+    else:
+        raise ValueError(f"Unknown problem {problem}")
+
+    with pytest.raises(ValueError) as exc_info:
+        request_from_server(server.url, "/convert-view", request)
+
+    assert correct in str(exc_info.value)
+
+
+@pytest.mark.e2e
+def test_convert_uses_server_when_running(server, metricflow_folder, tmp_path):
+    args = [metricflow_folder, "--out-directory", str(tmp_path / "out"), "--no-manifest"]
+
+    result = CliRunner().invoke(convert, args + ["--server-url", server.url])
+    assert result.exit_code == 0, result.output
+    assert "Wrote 4 files" in result.output
+    assert server.project_count() == 1
+
+    # Nothing listens on the port, so the conversion falls back to running in process
+    stopped_url = f"http://127.0.0.1:{_unused_port()}"
+    result = CliRunner().invoke(convert, args, env={"METRICFLOW_TO_ZENLYTIC_SERVER_URL": stopped_url})
+    assert result.exit_code == 0, result.output
+    assert f"No conversion server is listening at {stopped_url}" in result.output
+    assert "Wrote 4 files" in result.output
+
+
+@pytest.mark.e2e
+@pytest.mark.parametrize("problem", ["text_plain", "origin", "host"])
+def test_server_rejects_requests_from_web_pages(server, metricflow_folder, tmp_path, problem):
+    headers = {"Content-Type": "application/json"}
+    if problem == "text_plain":
+        headers["Content-Type"], correct = "text/plain", 415
+    elif problem == "origin":
+        headers["Origin"], correct = "https://example.com", 403
+    elif problem == "host":
+        headers["Host"], correct = "attacker.example.com:8765", 403
+    else:
+        raise ValueError(f"Unknown problem {problem}")
+
+    request = {"metricflow_folder": metricflow_folder, "out_directory": str(tmp_path / "out")}
+    http_request = urllib.request.Request(
+        f"{server.url}/convert", data=json.dumps(request).encode(), headers=headers
+    )
+    opener = urllib.request.build_opener(urllib.request.ProxyHandler({}))
+    with pytest.raises(urllib.error.HTTPError) as exc_info:
+        opener.open(http_request)
+
+    assert exc_info.value.code == correct
+    assert not (tmp_path / "out").exists()
+    assert server.project_count() == 0
+
+
+@pytest.mark.e2e
+def test_request_from_server_times_out():
+    # The socket accepts connections but nothing ever answers them
+    with socket.socket() as listener:
+        listener.bind(("127.0.0.1", 0))
+        listener.listen()
+        url = f"http://127.0.0.1:{listener.getsockname()[1]}"
+
+        with pytest.raises(ValueError) as exc_info:
+            request_from_server(url, "/convert", {}, timeout=0.2)
+
+    assert "accepted the request but did not respond" in str(exc_info.value)
+
+
+@pytest.mark.e2e
+def test_convert_forwards_skip_unchanged_to_server(server, metricflow_folder, tmp_path):
+    args = [metricflow_folder, "--out-directory", str(tmp_path / "out"), "--no-manifest"]
+    result = CliRunner().invoke(convert, args)
+    assert "Wrote 4 files" in result.output
+
+    # The server has not converted the project yet, but the files already hold its YAML
+    result = CliRunner().invoke(convert, args + ["--server-url", server.url, "--skip-unchanged"])
+    assert result.exit_code == 0, result.output
+    assert "Wrote 0 files, 4 unchanged" in result.output
+    assert server.project_count() == 1
+
+    # Several jobs run the conversion in this process
+    result = CliRunner().invoke(convert, args + ["--server-url", server.url, "--jobs", "2"])
+    assert result.exit_code == 0, result.output
+    assert "Wrote 4 files" in result.output
+    assert server.project_count() == 1
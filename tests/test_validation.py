@@ -0,0 +1,142 @@
+import os
+
+import pytest
+from click.testing import CliRunner
+
+from metricflow_to_zenlytic.cli import convert
+from metricflow_to_zenlytic.metricflow_to_zenlytic import load_mf_project, write_mf_project_to_zenlytic
+from metricflow_to_zenlytic.validation import ReferenceValidator, format_reference_issues, validate_references
+
+BASE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "examples")
+
+
+def _view(name: str, fields: list, identifiers: list = None):
+    return {"name": name, "fields": fields, "identifiers": identifiers or []}
+
+
+def _measure(name: str, sql: str = None, **kwargs):
+    return {"name": name, "field_type": "measure", "type": "number", "sql": sql, **kwargs}
+
+
+ORDERS = _view(
+    "orders",
+    [
+        {
+            "name": "created",
+            "field_type": "dimension_group",
+            "type": "time",
+            "sql": "created_at",
+            "timeframes": ["date"],
+        },
+        {"name": "status", "field_type": "dimension", "type": "string", "sql": "${TABLE}.status"},
+        _measure("_revenue", "amount"),
+        _measure("total_revenue", "${_revenue}"),
+    ],
+    identifiers=[{"name": "order", "type": "primary", "sql": "${status}"}],
+)
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize(
+    "sql",
+    [
+        "${_revenue} / nullif(${ _revenue }, 0)",
+        "case when ${created_date} > '2024-01-01' then ${status} end",
+        "${orders.total_revenue} + ${customers.lifetime_value}",
+        "${TABLE}.amount",
+    ],
+)
+def test_references_resolve(sql):
+    orders = _view("orders", ORDERS["fields"] + [_measure("checked", sql)], ORDERS["identifiers"])
+    customers = _view("customers", [_measure("lifetime_value", "ltv")])
+
+    assert validate_references([orders, customers]) == []
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("kind", ["unresolved", "wrong_view", "unknown_view", "measure", "cycle"])
+def test_reference_issues(kind):
+    customers = _view(
+        "customers", [_measure("lifetime_value", "ltv")], [{"name": "customer", "type": "primary"}]
+    )
+    if kind == "unresolved":
+        field, correct = _measure("checked", "1 + ${_cost}"), "There is no field named _cost in any view"
+    elif kind == "wrong_view":
+        field = _measure("checked", "1 + ${lifetime_value}")
+        correct = "it is in customers. Reference it as ${customers.lifetime_value}"
+    elif kind == "unknown_view":
+        field = _measure("checked", "1 + ${customer.lifetime_value}")
+        correct = "There is no view named customer, it is the name of an identifier in customers"
+    elif kind == "measure":
+        field = {"name": "checked", "field_type": "measure", "type": "cumulative", "measure": "_cost"}
+        correct = "There is no field named _cost in any view"
+    elif kind == "cycle":
+        field = _measure("checked", "1 + ${orders.checked_again}")
+        correct = (
+            "Fields reference each other in a cycle: orders.checked -> orders.checked_again -> orders.checked"
+        )
+    else:
+        raise ValueError(f"Unknown kind {kind}")
+
+    fields = ORDERS["fields"] + [field, _measure("checked_again", "${checked} * 2")]
+    validator = ReferenceValidator()
+    validator.add_view(_view("orders", fields), "views/orders_view.yml")
+    validator.add_view(customers)
+    issues = validator.issues()
+
+    assert len(issues) == 1
+    issue = issues[0]
+    assert issue["kind"] == ("unresolved" if kind == "measure" else kind)
+    assert correct in issue["message"]
+    assert issue["path"] == "views/orders_view.yml"
+    assert issue["view"] == "orders" and issue["field"] in {"checked", "checked_again"}
+    assert format_reference_issues(issues).startswith("views/orders_view.yml: orders.")
+
+
+@pytest.mark.unit
+def test_reference_cycle_in_long_chain():
+    n = 5000
+    fields = [_measure(f"m_{i}", f"${{m_{i + 1}}} + 1") for i in range(n)]
+    fields.append(_measure(f"m_{n}", "${m_0}"))
+
+    issues = validate_references([_view("orders", fields)])
+
+    assert [issue["kind"] for issue in issues] == ["cycle"]
+    assert issues[0]["message"].count("->") == n + 1
+
+
+@pytest.mark.e2e
+def test_e2e_validate_example_project(tmp_path):
+    metricflow_project = load_mf_project(os.path.join(BASE_PATH, "metricflow"))
+
+    summary = write_mf_project_to_zenlytic(
+        metricflow_project, "my_model", "my_company", str(tmp_path), validate=True
+    )
+    parallel_summary = write_mf_project_to_zenlytic(
+        metricflow_project, "my_model", "my_company", str(tmp_path), workers=2, validate=True
+    )
+
+    assert parallel_summary["issues"] == summary["issues"]
+    issues = {(issue["view"], issue["field"], issue["reference"]): issue for issue in summary["issues"]}
+    assert issues[("order_item", "order_gross_profit", "_order_cost")]["kind"] == "wrong_view"
+    assert issues[("orders", "new_customer", "customer.customer_type")]["kind"] == "unknown_view"
+    assert issues[("orders", "new_customer", "customer.customer_type")]["path"] == os.path.join(
+        str(tmp_path), "views", "orders_view.yml"
+    )
+    assert "issues" not in write_mf_project_to_zenlytic(
+        metricflow_project, "my_model", "my_company", str(tmp_path)
+    )
+
+
+@pytest.mark.e2e
+def test_convert_validate_option(tmp_path):
+    args = [os.path.join(BASE_PATH, "metricflow"), "--out-directory", str(tmp_path), "--no-manifest"]
+
+    result = CliRunner().invoke(convert, args + ["--validate"])
+    assert result.exit_code == 1
+    assert "order_item.order_gross_profit sql ${_order_cost}: The field _order_cost" in result.output
+    assert "broken references" in result.output
+
+    result = CliRunner().invoke(convert, args + ["--validate", "--incremental"])
+    assert result.exit_code == 2
+    assert "can not be used with --incremental" in result.output
@@ -0,0 +1,57 @@
+import os
+import queue
+import shutil
+import threading
+
+import pytest
+
+from metricflow_to_zenlytic.incremental import IncrementalProject
+from metricflow_to_zenlytic.watch import watch_mf_project
+
+BASE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "examples")
+
+
+def _append(path, text):
+    with open(path, "a") as f:
+        f.write(text)
+
+
+@pytest.mark.e2e
+def test_watch_rebuilds_changed_views_once(tmp_path):
+    metricflow_folder = tmp_path / "metricflow"
+    shutil.copytree(os.path.join(BASE_PATH, "metricflow"), metricflow_folder)
+    out_directory = str(tmp_path / "out")
+
+    summaries, stop_event = queue.Queue(), threading.Event()
+    watcher = threading.Thread(
+        target=watch_mf_project,
+        args=(IncrementalProject(str(metricflow_folder)), "my_model", "my_company", out_directory),
+        kwargs={
+            "interval": 0.02,
+            "debounce": 0.2,
+            "on_rebuild": summaries.put,
+            "on_error": summaries.put,
+            "stop_event": stop_event,
+        },
+    )
+    watcher.start()
+    try:
+        initial = summaries.get(timeout=10)
+        assert len(initial["written"]) == 4
+
+        # Two saves in quick succession trigger a single rebuild
+        _append(metricflow_folder / "customers.yml", "\n# first edit\n")
+        _append(metricflow_folder / "customers.yml", "\n# second edit\n")
+        rebuild = summaries.get(timeout=10)
+        # Comments don't change the parsed project, so nothing needs to be written
+        assert rebuild["written"] == []
+        assert len(rebuild["skipped"]) == 4
+
+        customers_path = metricflow_folder / "customers.yml"
+        customers_path.write_text(customers_path.read_text().replace("Customer grain mart.", "Customers."))
+        rebuild = summaries.get(timeout=10)
+        assert rebuild["written"] == [os.path.join(out_directory, "views", "customers_view.yml")]
+        assert summaries.empty()
+    finally:
+        stop_event.set()
+        watcher.join(timeout=10)
@@ -0,0 +1,159 @@
+import datetime
+import os
+
+import pytest
+import ruamel.yaml
+
+from metricflow_to_zenlytic.metricflow_to_zenlytic import (
+    YamlDumpers,
+    convert_mf_project_to_zenlytic_project,
+    dump_yaml_to_file,
+    load_mf_project,
+)
+from metricflow_to_zenlytic.yaml_emitter import emit_yaml
+
+BASE_PATH = os.path.dirname(__file__)
+
+EDGE_CASE_STRINGS = [
+    "",
+    " ",
+    "plain text",
+    "1",
+    "1.5",
+    "-1",
+    ".5",
+    "1e3",
+    "0x1F",
+    "1:30",
+    "2024-01-01",
+    "yes",
+    "No",
+    "ON",
+    "null",
+    "~",
+    "true",
+    "<<",
+    "=",
+    "- item",
+    "key: value",
+    "ends with colon:",
+    "text # comment",
+    "#hashtag",
+    "trailing space ",
+    " leading space",
+    "it's",
+    "'quoted'",
+    '"double"',
+    "${orders.total} / nullif(${orders.count}, 0)",
+    "{flow}",
+    "[flow]",
+    "* alias",
+    "& anchor",
+    "!tag",
+    "| block",
+    "> folded",
+    "%directive",
+    "@at",
+    "`tick`",
+    "tab\tinside",
+    "café",
+    "bell\x07",
+    "line\u2028separator",
+    "case when a = 'b'\n then 1 else null end",
+    "ends with newline\n",
+    "ends with newlines\n\n",
+    "\nstarts with newline",
+    "  indented first line\nsecond",
+    "first\n  indented second",
+    "blank\n\nlines",
+    "trailing spaces  \non lines ",
+    "carriage\r\nreturn",
+    "---\ndocument marker",
+    "\n",
+    " \n \n",
+    "\tselect a\nfrom t",
+    "select a\n\tfrom t",
+]
+
+
+def _load(yaml_string: str, typ: str):
+    # csafe parses with libyaml, which is stricter about tabs than the pure python parser
+    if typ == "csafe":
+        return ruamel.yaml.YAML(typ="safe", pure=False).load(yaml_string)
+    return ruamel.yaml.YAML(typ=typ, pure=True).load(yaml_string)
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("typ", ["rt", "safe", "csafe"])
+def test_emitter_round_trips_edge_case_strings(typ):
+    document = {
+        "name": "edge_cases",
+        "values": EDGE_CASE_STRINGS,
+        "fields": [{"name": f"field_{i}", "sql": value} for i, value in enumerate(EDGE_CASE_STRINGS)],
+    }
+    for value in EDGE_CASE_STRINGS:
+        document[f"key {value!r}"] = value
+    # Anchored and aliased booleans are loaded as ScalarBoolean by the round-trip loader
+    document["meta"] = _load("zenlytic: {hidden: &h true, searchable: *h, count: &c 3}", "rt")
+
+    yaml_string = emit_yaml(document)
+    parsed = _load(yaml_string, typ)
+    assert parsed == document
+    assert "hidden: true\n" in yaml_string and "searchable: true\n" in yaml_string
+    assert "count: 3\n" in yaml_string
+    assert parsed == _load(dump_yaml_to_file(document, dumper=YamlDumpers.round_trip), typ)
+
+
+@pytest.mark.unit
+def test_emitter_scalars_and_collections():
+    document = {
+        "version": 1,
+        "hidden": True,
+        "visible": False,
+        "missing": None,
+        "ratio": 0.25,
+        "big": 1e20,
+        "infinite": float("inf"),
+        "empty_list": [],
+        "empty_mapping": {},
+        "nested": {"inner": {"values": [1, "two", None]}},
+        "fields": [{"name": "a", "timeframes": ["raw", "date"], "meta": {"owner": "data"}}, {}, "text"],
+    }
+
+    yaml_string = emit_yaml(document)
+
+    assert _load(yaml_string, "safe") == document
+    assert yaml_string.startswith("version: 1\nhidden: true\nvisible: false\nmissing: null\n")
+    assert (
+        "- name: a\n  timeframes:\n  - raw\n  - date\n  meta:\n    owner: data\n- {}\n- text\n" in yaml_string
+    )
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("value", [datetime.date(2024, 1, 1), [["nested"]], {"a\nb": 1}])
+def test_emitter_falls_back_to_ruamel(value):
+    document = {"name": "fallback", "value": value}
+    with pytest.raises(TypeError):
+        emit_yaml(document)
+
+    assert dump_yaml_to_file(document) == dump_yaml_to_file(document, dumper=YamlDumpers.round_trip)
+
+
+@pytest.mark.unit
+def test_unknown_dumper():
+    with pytest.raises(ValueError) as exc_info:
+        dump_yaml_to_file({"name": "view"}, dumper="json")
+
+    assert "Unknown YAML dumper json" in str(exc_info.value)
+
+
+@pytest.mark.e2e
+def test_e2e_dumpers_write_equal_documents():
+    project = load_mf_project(os.path.join(BASE_PATH, "examples", "metricflow"))
+    models, views = convert_mf_project_to_zenlytic_project(project, "my_model", "my_company")
+
+    for zenlytic_file in models + views:
+        fast_yaml = dump_yaml_to_file(zenlytic_file)
+        ruamel_yaml = dump_yaml_to_file(zenlytic_file, dumper=YamlDumpers.round_trip)
+        assert _load(fast_yaml, "safe") == _load(ruamel_yaml, "safe")
+        assert _load(fast_yaml, "rt") == _load(ruamel_yaml, "rt")